@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import math
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+
+class Saturated(Exception):
+    """Raised when a request cannot be admitted; retry_after is a hint in seconds."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    i = min(len(sorted_values) - 1, max(0, math.ceil(q * len(sorted_values)) - 1))
+    return sorted_values[i]
+
+
+class AdmissionController:
+    """
+    Caps the number of pipelines running at once in this worker.
+
+    Up to max_in_flight requests run; the next max_queue wait in FIFO order
+    for at most queue_timeout_s. Anything beyond that, or a waiter whose time
+    runs out, gets Saturated at once, so queued requests never wait longer
+    than the timeout and running ones are not slowed by an unbounded backlog.
+    max_in_flight <= 0 admits everything.
+
+    All state is touched only from the event loop, so no locks are needed.
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int, queue_timeout_s: float, window: int = 1024):
+        self.max_in_flight = int(max_in_flight)
+        self.max_queue = max(0, int(max_queue))
+        self.queue_timeout_s = max(0.0, float(queue_timeout_s))
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._waits_ms: Deque[float] = deque(maxlen=window)
+        self._service_s = 0.0
+        self.counts: Dict[str, int] = {
+            "admitted_total": 0,
+            "queued_total": 0,
+            "rejected_queue_full": 0,
+            "rejected_queue_timeout": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_in_flight > 0
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for w in self._waiters if not w.done())
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free: queued work spread over the running slots."""
+        per_slot = self._service_s or 1.0
+        ahead = self.queue_depth + 1
+        return max(1, math.ceil(per_slot * ahead / max(1, self.max_in_flight)))
+
+    def _reject(self, reason: str) -> Saturated:
+        self.counts[f"rejected_{reason}"] += 1
+        return Saturated(reason, self.retry_after())
+
+    def _admitted(self, waited_s: float) -> None:
+        self.counts["admitted_total"] += 1
+        self._waits_ms.append(1000.0 * waited_s)
+
+    async def acquire(self) -> float:
+        """Takes a slot, waiting in the queue if needed; returns the seconds waited."""
+        if not self.enabled:
+            self.in_flight += 1
+            self._admitted(0.0)
+            return 0.0
+        if self.in_flight < self.max_in_flight and not self.queue_depth:
+            self.in_flight += 1
+            self._admitted(0.0)
+            return 0.0
+        if self.queue_depth >= self.max_queue:
+            raise self._reject("queue_full")
+
+        t0 = time.perf_counter()
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        self.counts["queued_total"] += 1
+        try:
+            await asyncio.wait({fut}, timeout=self.queue_timeout_s)
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()
+            else:
+                fut.cancel()
+            raise
+        finally:
+            with contextlib.suppress(ValueError):
+                self._waiters.remove(fut)
+
+        if not fut.done():
+            fut.cancel()
+            raise self._reject("queue_timeout")
+        waited = time.perf_counter() - t0
+        self._admitted(waited)
+        return waited
+
+    def release(self, service_s: Optional[float] = None) -> None:
+        if service_s is not None:
+            # exponentially weighted, so Retry-After follows the current load
+            self._service_s = service_s if not self._service_s else 0.8 * self._service_s + 0.2 * service_s
+        while self._waiters:
+            w = self._waiters.popleft()
+            if not w.done():
+                # hand the slot straight to the oldest waiter; in_flight is unchanged
+                w.set_result(None)
+                return
+        self.in_flight -= 1
+
+    @contextlib.asynccontextmanager
+    async def admit(self) -> AsyncIterator[float]:
+        waited = await self.acquire()
+        t0 = time.perf_counter()
+        try:
+            yield waited
+        finally:
+            self.release(time.perf_counter() - t0)
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._waits_ms)
+        return {
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "queue_timeout_s": self.queue_timeout_s,
+            **self.counts,
+            "wait_ms_p50": round(_percentile(waits, 0.50), 3),
+            "wait_ms_p99": round(_percentile(waits, 0.99), 3),
+            "wait_ms_max": round(waits[-1], 3) if waits else 0.0,
+            "service_ms_avg": round(1000.0 * self._service_s, 3),
+            "retry_after_s": self.retry_after(),
+        }
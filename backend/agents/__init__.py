@@ -1,4 +1,4 @@
 from .jd_parser_rules import parse_jd_rules
-from .jd_classifier_llm import classify_jd_with_llm
-from .generator_llm import generate_with_llm
-from .editor_llm import edit_with_llm
+from .jd_classifier_llm import classify_jd_with_llm, classify_jd_with_llm_async
+from .generator_llm import generate_with_llm, generate_with_llm_async, generate_stream_with_llm_async
+from .editor_llm import edit_with_llm, edit_with_llm_async
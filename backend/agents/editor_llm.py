@@ -2,103 +2,169 @@ from __future__ import annotations
 
 import json
 import os
-from typing import Any, Dict, List, Optional
+import re
+from typing import Any, Dict, List, Optional, Tuple
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
-EXPECTED_KEYS = {"resume_bullets", "cover_letter", "warnings"}
+from core.llm_cache import LLMResponseCache, chat_content, chat_content_async
+from core.metrics import LLM_FALLBACKS
+from core.payload import PayloadLimits, PayloadStats, edit_payload
+from resources import get_async_openai_client, get_openai_client, get_prompt
 
+EDITABLE_CODES = {"LENGTH", "STYLE"}
+_BULLET_PATH = re.compile(r"^resume_bullets\[(\d+)\]\.text$")
 
-def _read_prompt(path: str) -> str:
-    with open(path, "r", encoding="utf-8") as f:
-        return f.read().strip()
 
-
-def _is_valid_generation_shape(obj: Any) -> bool:
-    if not isinstance(obj, dict):
-        return False
-    if set(obj.keys()) != EXPECTED_KEYS:
-        return False
-
-    if not isinstance(obj.get("resume_bullets"), list):
-        return False
-    if not isinstance(obj.get("warnings"), list):
-        return False
-
-    cl = obj.get("cover_letter")
-    if not isinstance(cl, dict):
-        return False
-    if "text" not in cl or "evidence_chunks" not in cl:
-        return False
-    if not isinstance(cl["evidence_chunks"], list):
-        return False
-
-    for b in obj["resume_bullets"]:
-        if not isinstance(b, dict):
-            return False
-        if "text" not in b or "evidence_chunks" not in b or "skills_used" not in b:
-            return False
-        if not isinstance(b["evidence_chunks"], list):
-            return False
-        if not isinstance(b["skills_used"], list):
-            return False
-
-    return True
-
-
-def _fallback(generation: Dict[str, Any], msg: str) -> Dict[str, Any]:
+def _fallback(generation: Dict[str, Any], msg: str, reason: str) -> Dict[str, Any]:
+    LLM_FALLBACKS.inc(agent="edit", reason=reason)
     out = dict(generation)
     out.setdefault("resume_bullets", [])
     out.setdefault("cover_letter", {"text": "", "evidence_chunks": []})
     out.setdefault("warnings", [])
     if not isinstance(out["warnings"], list):
         out["warnings"] = []
-    out["warnings"].append(msg)
+    out["warnings"] = out["warnings"] + [msg]
+    return out
+
+
+def edit_targets(
+    generation: Dict[str, Any],
+    validation_warnings: List[Dict[str, Any]],
+) -> Dict[int, List[str]]:
+    """
+    Bullet index -> issues the editor can fix. Only text-level warnings
+    (LENGTH, STYLE) on resume_bullets[i].text qualify; grounding and skill
+    problems are left to enforce_grounding.
+    """
+    bullets = generation.get("resume_bullets", [])
+    if not isinstance(bullets, list):
+        return {}
+
+    targets: Dict[int, List[str]] = {}
+    for w in validation_warnings or []:
+        if w.get("code") not in EDITABLE_CODES:
+            continue
+        m = _BULLET_PATH.match(str(w.get("path", "")))
+        if not m:
+            continue
+        i = int(m.group(1))
+        if i < len(bullets) and isinstance(bullets[i], dict):
+            targets.setdefault(i, []).append(str(w.get("message", "")))
+    return targets
+
+
+def _edit_messages(
+    generation: Dict[str, Any],
+    targets: Dict[int, List[str]],
+    evidence_map: Dict[str, Any],
+    limits: Optional[PayloadLimits] = None,
+    model: str = "",
+) -> Tuple[List[Dict[str, str]], PayloadStats]:
+    prompt_path = os.path.join("prompts", "edit_style.json.txt")
+    system = get_prompt(prompt_path)
+
+    bullets = generation["resume_bullets"]
+    items = [
+        {
+            "id": i,
+            "text": bullets[i].get("text", ""),
+            "evidence_chunks": bullets[i].get("evidence_chunks", []),
+            "skills_used": bullets[i].get("skills_used", []),
+            "issues": issues,
+        }
+        for i, issues in sorted(targets.items())
+    ]
+    user, stats = edit_payload(system, items, evidence_map, limits=limits, model=model)
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user},
+    ], stats
+
+
+def _merge_edits(generation: Dict[str, Any], targets: Dict[int, List[str]], edited: Any) -> Dict[str, Any]:
+    """Writes the rewritten texts back; evidence_chunks and skills_used always stay as generated."""
+    items = edited.get("bullets") if isinstance(edited, dict) else None
+    if not isinstance(items, list):
+        return _fallback(generation, "LLM editor returned unexpected schema; kept original generation.", "schema")
+
+    bullets = list(generation["resume_bullets"])
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        i, text = item.get("id"), item.get("text")
+        if isinstance(i, int) and i in targets and isinstance(text, str) and text.strip():
+            bullets[i] = {**bullets[i], "text": text.strip()}
+
+    out = dict(generation)
+    out["resume_bullets"] = bullets
     return out
 
 
+def _edit_request(messages: List[Dict[str, str]], model: str) -> Dict[str, Any]:
+    return {
+        "model": model,
+        "temperature": 0.2,
+        "messages": messages,
+        "response_format": {"type": "json_object"},
+    }
+
+
 def edit_with_llm(
     generation: Dict[str, Any],
     validation_warnings: List[Dict[str, Any]],
     evidence_map: Dict[str, Any],
     model: str,
     client: Optional[OpenAI] = None,
+    cache: Optional[LLMResponseCache] = None,
+    limits: Optional[PayloadLimits] = None,
+    payload_stats: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
-    c = client or OpenAI()
+    targets = edit_targets(generation, validation_warnings)
+    if payload_stats is not None:
+        payload_stats["targets"] = len(targets)
+    if not targets:
+        return generation
 
-    
-    prompt_path = os.path.join("prompts", "edit_style.json.txt")
-    system = _read_prompt(prompt_path)
-
-    payload = {
-        "generation": generation,
-        "validation_warnings": validation_warnings,
-        "evidence_map": evidence_map,
-    }
+    c = client or get_openai_client()
+    messages, stats = _edit_messages(generation, targets, evidence_map, limits, model)
+    if payload_stats is not None:
+        payload_stats.update(stats.as_dict())
 
     try:
-        resp = c.chat.completions.create(
-            model=model,
-            temperature=0.2,
-            messages=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": json.dumps(payload, ensure_ascii=False)},
-            ],
-            response_format={"type": "json_object"},
-        )
-        raw = resp.choices[0].message.content or "{}"
+        raw = chat_content(c, _edit_request(messages, model), cache, agent="edit")
         edited = json.loads(raw)
     except Exception:
-        return _fallback(generation, "LLM editor failed or returned invalid JSON; kept original generation.")
+        return _fallback(generation, "LLM editor failed or returned invalid JSON; kept original generation.", "error")
+
+    return _merge_edits(generation, targets, edited)
 
-    if not _is_valid_generation_shape(edited):
-        return _fallback(generation, "LLM editor returned unexpected schema; kept original generation.")
 
-    
-    for b in edited["resume_bullets"]:
-        if not isinstance(b.get("evidence_chunks"), list) or not isinstance(b.get("skills_used"), list):
-            return _fallback(generation, "LLM editor corrupted bullet schema; kept original generation.")
-    if not isinstance(edited["cover_letter"].get("evidence_chunks"), list):
-        return _fallback(generation, "LLM editor corrupted cover_letter schema; kept original generation.")
+async def edit_with_llm_async(
+    generation: Dict[str, Any],
+    validation_warnings: List[Dict[str, Any]],
+    evidence_map: Dict[str, Any],
+    model: str,
+    client: Optional[AsyncOpenAI] = None,
+    cache: Optional[LLMResponseCache] = None,
+    limits: Optional[PayloadLimits] = None,
+    payload_stats: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    targets = edit_targets(generation, validation_warnings)
+    if payload_stats is not None:
+        payload_stats["targets"] = len(targets)
+    if not targets:
+        return generation
+
+    c = client or get_async_openai_client()
+    messages, stats = _edit_messages(generation, targets, evidence_map, limits, model)
+    if payload_stats is not None:
+        payload_stats.update(stats.as_dict())
+
+    try:
+        raw = await chat_content_async(c, _edit_request(messages, model), cache, agent="edit")
+        edited = json.loads(raw)
+    except Exception:
+        return _fallback(generation, "LLM editor failed or returned invalid JSON; kept original generation.", "error")
 
-    return edited
+    return _merge_edits(generation, targets, edited)
@@ -2,14 +2,14 @@ from __future__ import annotations
 
 import json
 import os
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
-
-def _read_text(path: str) -> str:
-    with open(path, "r", encoding="utf-8") as f:
-        return f.read().strip()
+from core.json_stream import GenerationStreamParser
+from core.llm_cache import LLMResponseCache, chat_content, chat_content_async, chat_content_stream_async
+from core.payload import PayloadLimits, PayloadStats, generation_payload
+from resources import get_async_openai_client, get_openai_client, get_prompt
 
 
 def _chat_json(
@@ -18,49 +18,91 @@ def _chat_json(
     system: str,
     user: str,
     temperature: float = 0.2,
+    cache: Optional[LLMResponseCache] = None,
 ) -> Dict[str, Any]:
-    resp = client.chat.completions.create(
-        model=model,
-        temperature=temperature,
-        messages=[
+    request = {
+        "model": model,
+        "temperature": temperature,
+        "messages": [
             {"role": "system", "content": system},
             {"role": "user", "content": user},
         ],
-        response_format={"type": "json_object"},
-    )
-    content = resp.choices[0].message.content or "{}"
+        "response_format": {"type": "json_object"},
+    }
+    content = chat_content(client, request, cache, agent="generate")
     return json.loads(content)
 
 
-def generate_with_llm(
+async def _chat_json_async(
+    client: AsyncOpenAI,
+    model: str,
+    system: str,
+    user: str,
+    temperature: float = 0.2,
+    cache: Optional[LLMResponseCache] = None,
+) -> Dict[str, Any]:
+    request = {
+        "model": model,
+        "temperature": temperature,
+        "messages": [
+            {"role": "system", "content": system},
+            {"role": "user", "content": user},
+        ],
+        "response_format": {"type": "json_object"},
+    }
+    content = await chat_content_async(client, request, cache, agent="generate")
+    return json.loads(content)
+
+
+def _generate_messages(
     jd_struct: Dict[str, Any],
     match_report: Dict[str, Any],
     evidence_map: Dict[str, Any],
     user_profile_text: str,
-    model: str,
-    client: Optional[OpenAI] = None,
-    fewshot_examples: Optional[List[Dict[str, Any]]] = None,
-) -> Dict[str, Any]:
-    c = client or OpenAI()
-
-    
+    fewshot_examples: Optional[List[Dict[str, Any]]],
+    limits: Optional[PayloadLimits] = None,
+    model: str = "",
+) -> Tuple[str, str, PayloadStats]:
     prompt_path = os.path.join("prompts", "generate_resume.json.txt")
-    system = _read_text(prompt_path)
-
-    payload: Dict[str, Any] = {
-        "jd": jd_struct,  
-        "match_report": match_report,
-        "evidence_map": evidence_map,
-        "profile_text": user_profile_text,
+    system = get_prompt(prompt_path)
+
+    user, stats = generation_payload(
+        system,
+        jd_struct=jd_struct,
+        match_report=match_report,
+        evidence_map=evidence_map,
+        profile_text=user_profile_text,
+        fewshot_examples=fewshot_examples,
+        limits=limits,
+        model=model,
+    )
+    return system, user, stats
+
+
+def _clean_bullet(b: Dict[str, Any]) -> Dict[str, Any]:
+    text = str(b.get("text", "")).strip()
+    ev = b.get("evidence_chunks", [])
+    skills = b.get("skills_used", [])
+    if not isinstance(ev, list):
+        ev = []
+    if not isinstance(skills, list):
+        skills = []
+    return {
+        "text": text,
+        "evidence_chunks": [str(x) for x in ev],
+        "skills_used": [str(x) for x in skills],
     }
 
-    if fewshot_examples:
-        payload["fewshot_examples"] = fewshot_examples
 
-    user = json.dumps(payload, ensure_ascii=False)
+def _clean_cover_letter(cover: Dict[str, Any]) -> Dict[str, Any]:
+    ctext = str(cover.get("text", "")).strip()
+    cev = cover.get("evidence_chunks", [])
+    if not isinstance(cev, list):
+        cev = []
+    return {"text": ctext, "evidence_chunks": [str(x) for x in cev]}
 
-    out = _chat_json(c, model=model, system=system, user=user, temperature=0.2)
 
+def _clean_generation(out: Dict[str, Any]) -> Dict[str, Any]:
     # Defensive defaults
     out.setdefault("resume_bullets", [])
     out.setdefault("cover_letter", {"text": "", "evidence_chunks": []})
@@ -74,33 +116,99 @@ def generate_with_llm(
         out["warnings"] = []
 
     # Normalize bullet item shape
-    cleaned_bullets: List[Dict[str, Any]] = []
-    for b in out["resume_bullets"]:
-        if not isinstance(b, dict):
-            continue
-        text = str(b.get("text", "")).strip()
-        ev = b.get("evidence_chunks", [])
-        skills = b.get("skills_used", [])
-        if not isinstance(ev, list):
-            ev = []
-        if not isinstance(skills, list):
-            skills = []
-        cleaned_bullets.append(
-            {
-                "text": text,
-                "evidence_chunks": [str(x) for x in ev],
-                "skills_used": [str(x) for x in skills],
-            }
-        )
-
-    cover = out["cover_letter"]
-    ctext = str(cover.get("text", "")).strip()
-    cev = cover.get("evidence_chunks", [])
-    if not isinstance(cev, list):
-        cev = []
+    cleaned_bullets = [_clean_bullet(b) for b in out["resume_bullets"] if isinstance(b, dict)]
 
     out["resume_bullets"] = cleaned_bullets
-    out["cover_letter"] = {"text": ctext, "evidence_chunks": [str(x) for x in cev]}
+    out["cover_letter"] = _clean_cover_letter(out["cover_letter"])
     out["warnings"] = [str(x) for x in out["warnings"]]
 
     return out
+
+
+def generate_with_llm(
+    jd_struct: Dict[str, Any],
+    match_report: Dict[str, Any],
+    evidence_map: Dict[str, Any],
+    user_profile_text: str,
+    model: str,
+    client: Optional[OpenAI] = None,
+    fewshot_examples: Optional[List[Dict[str, Any]]] = None,
+    cache: Optional[LLMResponseCache] = None,
+    limits: Optional[PayloadLimits] = None,
+    payload_stats: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    c = client or get_openai_client()
+    system, user, stats = _generate_messages(
+        jd_struct, match_report, evidence_map, user_profile_text, fewshot_examples, limits, model
+    )
+    if payload_stats is not None:
+        payload_stats.update(stats.as_dict())
+    out = _chat_json(c, model=model, system=system, user=user, temperature=0.2, cache=cache)
+    return _clean_generation(out)
+
+
+async def generate_with_llm_async(
+    jd_struct: Dict[str, Any],
+    match_report: Dict[str, Any],
+    evidence_map: Dict[str, Any],
+    user_profile_text: str,
+    model: str,
+    client: Optional[AsyncOpenAI] = None,
+    fewshot_examples: Optional[List[Dict[str, Any]]] = None,
+    cache: Optional[LLMResponseCache] = None,
+    limits: Optional[PayloadLimits] = None,
+    payload_stats: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    c = client or get_async_openai_client()
+    system, user, stats = _generate_messages(
+        jd_struct, match_report, evidence_map, user_profile_text, fewshot_examples, limits, model
+    )
+    if payload_stats is not None:
+        payload_stats.update(stats.as_dict())
+    out = await _chat_json_async(c, model=model, system=system, user=user, temperature=0.2, cache=cache)
+    return _clean_generation(out)
+
+
+async def generate_stream_with_llm_async(
+    jd_struct: Dict[str, Any],
+    match_report: Dict[str, Any],
+    evidence_map: Dict[str, Any],
+    user_profile_text: str,
+    model: str,
+    client: Optional[AsyncOpenAI] = None,
+    fewshot_examples: Optional[List[Dict[str, Any]]] = None,
+    cache: Optional[LLMResponseCache] = None,
+    limits: Optional[PayloadLimits] = None,
+    payload_stats: Optional[Dict[str, Any]] = None,
+) -> AsyncIterator[Tuple[str, Optional[int], Dict[str, Any]]]:
+    """
+    Same request as generate_with_llm_async, streamed. Yields ("bullet",
+    index, bullet) as each resume bullet closes, ("cover_letter", None,
+    cover_letter) when the cover letter does, and finally ("generation",
+    None, generation) with the complete cleaned result.
+    """
+    c = client or get_async_openai_client()
+    system, user, stats = _generate_messages(
+        jd_struct, match_report, evidence_map, user_profile_text, fewshot_examples, limits, model
+    )
+    if payload_stats is not None:
+        payload_stats.update(stats.as_dict())
+    request = {
+        "model": model,
+        "temperature": 0.2,
+        "messages": [
+            {"role": "system", "content": system},
+            {"role": "user", "content": user},
+        ],
+        "response_format": {"type": "json_object"},
+    }
+
+    parser = GenerationStreamParser()
+    async for delta in chat_content_stream_async(c, request, cache, agent="generate"):
+        for kind, index, item in parser.feed(delta):
+            if kind == "bullet":
+                yield kind, index, _clean_bullet(item)
+            else:
+                yield kind, None, _clean_cover_letter(item)
+
+    yield "generation", None, _clean_generation(json.loads(parser.text))
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import json
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+
+from core.llm_cache import LLMResponseCache, chat_content, chat_content_async
+from resources import get_async_openai_client, get_openai_client
 
 
 def _chat_json(
@@ -12,28 +15,43 @@ def _chat_json(
     system: str,
     user: str,
     temperature: float = 0.1,
+    cache: Optional[LLMResponseCache] = None,
 ) -> Dict[str, Any]:
-    resp = client.chat.completions.create(
-        model=model,
-        temperature=temperature,
-        messages=[
+    request = {
+        "model": model,
+        "temperature": temperature,
+        "messages": [
             {"role": "system", "content": system},
             {"role": "user", "content": user},
         ],
-        response_format={"type": "json_object"},
-    )
-    content = resp.choices[0].message.content or "{}"
+        "response_format": {"type": "json_object"},
+    }
+    content = chat_content(client, request, cache, agent="classify")
     return json.loads(content)
 
 
-def classify_jd_with_llm(
-    jd_text: str,
-    extracted: Dict[str, Any],
+async def _chat_json_async(
+    client: AsyncOpenAI,
     model: str,
-    client: Optional[OpenAI] = None,
+    system: str,
+    user: str,
+    temperature: float = 0.1,
+    cache: Optional[LLMResponseCache] = None,
 ) -> Dict[str, Any]:
-    c = client or OpenAI()
+    request = {
+        "model": model,
+        "temperature": temperature,
+        "messages": [
+            {"role": "system", "content": system},
+            {"role": "user", "content": user},
+        ],
+        "response_format": {"type": "json_object"},
+    }
+    content = await chat_content_async(client, request, cache, agent="classify")
+    return json.loads(content)
 
+
+def _classify_messages(jd_text: str, extracted: Dict[str, Any]) -> Tuple[str, str]:
     skills = {
         "must_have_skills": extracted.get("must_have_skills", []),
         "nice_to_have_skills": extracted.get("nice_to_have_skills", []),
@@ -65,9 +83,10 @@ def classify_jd_with_llm(
         },
         ensure_ascii=False,
     )
+    return system, user
 
-    out = _chat_json(c, model=model, system=system, user=user, temperature=0.1)
 
+def _coerce_jd_struct(out: Dict[str, Any], extracted: Dict[str, Any]) -> Dict[str, Any]:
     out.setdefault("must_have_skills", extracted.get("must_have_skills", []))
     out.setdefault("nice_to_have_skills", extracted.get("nice_to_have_skills", []))
     out.setdefault("responsibilities", extracted.get("responsibilities", []))
@@ -88,3 +107,29 @@ def classify_jd_with_llm(
     out["keywords"] = [str(x) for x in out["keywords"]]
 
     return out
+
+
+def classify_jd_with_llm(
+    jd_text: str,
+    extracted: Dict[str, Any],
+    model: str,
+    client: Optional[OpenAI] = None,
+    cache: Optional[LLMResponseCache] = None,
+) -> Dict[str, Any]:
+    c = client or get_openai_client()
+    system, user = _classify_messages(jd_text, extracted)
+    out = _chat_json(c, model=model, system=system, user=user, temperature=0.1, cache=cache)
+    return _coerce_jd_struct(out, extracted)
+
+
+async def classify_jd_with_llm_async(
+    jd_text: str,
+    extracted: Dict[str, Any],
+    model: str,
+    client: Optional[AsyncOpenAI] = None,
+    cache: Optional[LLMResponseCache] = None,
+) -> Dict[str, Any]:
+    c = client or get_async_openai_client()
+    system, user = _classify_messages(jd_text, extracted)
+    out = await _chat_json_async(c, model=model, system=system, user=user, temperature=0.1, cache=cache)
+    return _coerce_jd_struct(out, extracted)
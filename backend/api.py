@@ -1,12 +1,30 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional
 
-from fastapi import FastAPI
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+from starlette.background import BackgroundTask
 
+from admission import Saturated
 from config import AppConfig
-from orchestrator import run_pipeline
+from core.metrics import METRICS, REQUEST_ERRORS, REQUESTS, stats_samples
+from core.multi_profile_index import MultiProfileIndex
+from job_queue import WorkerPool, job_payload
+from orchestrator import rank_profiles, run_batch_async, run_pipeline, run_pipeline_async, run_pipeline_stream
+from resources import (
+    get_admission,
+    get_artifact_store,
+    get_index_cache,
+    get_job_queue,
+    get_llm_cache,
+    http_pool_stats,
+)
 from fastapi.middleware.cors import CORSMiddleware
 
 class RunRequest(BaseModel):
@@ -19,10 +37,66 @@ class RunRequest(BaseModel):
     use_embeddings: Optional[bool] = False
     use_llm_jd_classifier: Optional[bool] = False
     use_llm_editor: Optional[bool] = True
+    include_timings: Optional[bool] = False
+    bypass_llm_cache: Optional[bool] = False
+    export_outputs: Optional[bool] = False
 
 
+class RunBatchRequest(BaseModel):
+    profile_text: str
+    job_descriptions: List[str]
+    use_tfidf: Optional[bool] = True
+    use_bm25: Optional[bool] = True
+    use_embeddings: Optional[bool] = False
+    use_llm_jd_classifier: Optional[bool] = False
+    use_llm_editor: Optional[bool] = True
+    include_timings: Optional[bool] = False
+    bypass_llm_cache: Optional[bool] = False
+    max_concurrency: Optional[int] = Field(default=None, ge=1)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    cfg = AppConfig()
+    pool = WorkerPool(cfg.job_workers).start() if cfg.job_workers > 0 else None
+    try:
+        yield
+    finally:
+        if pool is not None:
+            await asyncio.to_thread(pool.stop)
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.exception_handler(Saturated)
+async def saturated_handler(request: Request, exc: Saturated) -> JSONResponse:
+    REQUEST_ERRORS.inc(endpoint=request.url.path, error=exc.reason)
+    return JSONResponse(
+        status_code=429,
+        content={"detail": f"server busy ({exc.reason}), retry later", "retry_after_s": exc.retry_after},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+class _Slot:
+    """An admission slot held past the endpoint, e.g. for a streaming response; release() is idempotent."""
+
+    def __init__(self) -> None:
+        self.admission = get_admission(AppConfig())
+        self._t0 = 0.0
+        self._held = False
 
-app = FastAPI()
+    async def acquire(self) -> "_Slot":
+        await self.admission.acquire()
+        self._t0 = time.perf_counter()
+        self._held = True
+        return self
+
+    def release(self) -> None:
+        if self._held:
+            self._held = False
+            self.admission.release(time.perf_counter() - self._t0)
 
 
 @app.get("/health")
@@ -32,16 +106,204 @@ def health() -> Dict[str, Any]:
 
 
 
-@app.post("/run")
-def run(req: RunRequest) -> Dict[str, Any]:
-    cfg = AppConfig(
+class RankProfilesRequest(BaseModel):
+    job_description: str
+    top_n: Optional[int] = Field(default=None, ge=1)
+
+
+def _cfg_from_request(req: RunRequest | RunBatchRequest) -> AppConfig:
+    return AppConfig(
         use_tfidf=bool(req.use_tfidf),
         use_bm25=bool(req.use_bm25),
         use_embeddings=bool(req.use_embeddings),
         use_llm_jd_classifier=bool(req.use_llm_jd_classifier),
         use_llm_editor=bool(req.use_llm_editor),
+        collect_timings=bool(req.include_timings),
+        bypass_llm_cache=bool(req.bypass_llm_cache),
+        export_outputs=bool(getattr(req, "export_outputs", False)),
+    )
+
+
+def _count_request(endpoint: str, req: RunRequest | RunBatchRequest) -> None:
+    flags = ("use_tfidf", "use_bm25", "use_embeddings", "use_llm_jd_classifier", "use_llm_editor")
+    REQUESTS.inc(endpoint=endpoint, **{f: str(bool(getattr(req, f))).lower() for f in flags})
+
+
+def _encode_event(item: Dict[str, Any], fmt: str) -> str:
+    if fmt == "sse":
+        return f"event: {item['event']}\ndata: {json.dumps(item['data'], ensure_ascii=False)}\n\n"
+    return json.dumps(item, ensure_ascii=False) + "\n"
+
+
+@app.post("/run")
+async def run(req: RunRequest) -> Dict[str, Any]:
+    _count_request("/run", req)
+    async with get_admission(AppConfig()).admit():
+        return await run_pipeline_async(req.job_description, req.profile_text, cfg=_cfg_from_request(req))
+
+
+@app.post("/run_stream")
+async def run_stream(
+    req: RunRequest,
+    fmt: Literal["sse", "ndjson"] = Query("sse", alias="format"),
+) -> StreamingResponse:
+    _count_request("/run_stream", req)
+    slot = await _Slot().acquire()
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for item in run_pipeline_stream(req.job_description, req.profile_text, cfg=_cfg_from_request(req)):
+                yield _encode_event(item, fmt)
+        except Exception as e:
+            REQUEST_ERRORS.inc(endpoint="/run_stream", error=type(e).__name__)
+            yield _encode_event({"event": "error", "data": {"message": f"{type(e).__name__}: {e}"}}, fmt)
+        finally:
+            slot.release()
+
+    media_type = "text/event-stream" if fmt == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        events(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache"},
+        background=BackgroundTask(slot.release),
+    )
+
+
+@app.post("/run_batch")
+async def run_batch(req: RunBatchRequest) -> StreamingResponse:
+    _count_request("/run_batch", req)
+    slot = await _Slot().acquire()
+
+    async def lines() -> AsyncIterator[str]:
+        try:
+            async for item in run_batch_async(
+                req.profile_text,
+                req.job_descriptions,
+                cfg=_cfg_from_request(req),
+                max_concurrency=req.max_concurrency,
+            ):
+                yield json.dumps(item, ensure_ascii=False) + "\n"
+        except Exception as e:
+            # per-JD failures are items of their own; this is the batch as a whole failing
+            REQUEST_ERRORS.inc(endpoint="/run_batch", error=type(e).__name__)
+            yield json.dumps({"error": f"{type(e).__name__}: {e}"}, ensure_ascii=False) + "\n"
+        finally:
+            slot.release()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson", background=BackgroundTask(slot.release))
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(req: RunRequest) -> Dict[str, Any]:
+    _count_request("/jobs", req)
+    payload = job_payload(req.job_description, req.profile_text, _cfg_from_request(req))
+    job_id = await asyncio.to_thread(get_job_queue(AppConfig()).submit, payload)
+    return {"job_id": job_id, "status": "queued"}
+
+
+@app.get("/jobs/stats")
+async def job_stats() -> Dict[str, Any]:
+    return await asyncio.to_thread(get_job_queue(AppConfig()).stats)
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str) -> Dict[str, Any]:
+    job = await asyncio.to_thread(get_job_queue(AppConfig()).get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"unknown or expired job {job_id}")
+    return job
+
+
+@app.get("/runs/{run_id}")
+def get_run(run_id: str) -> Dict[str, Any]:
+    out = get_artifact_store(AppConfig()).get(run_id)
+    if out is None:
+        raise HTTPException(status_code=404, detail=f"unknown run {run_id}")
+    return out
+
+
+@app.get("/runs/{run_id}/package.zip")
+def get_run_package(run_id: str) -> Response:
+    data = get_artifact_store(AppConfig()).package(run_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail=f"unknown run {run_id}")
+    return Response(
+        content=data,
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="package-{run_id}.zip"'},
     )
-    return run_pipeline(req.job_description, req.profile_text, cfg=cfg)
+
+
+@app.get("/cache/stats")
+def cache_stats() -> Dict[str, Any]:
+    cfg = AppConfig()
+    index_cache = get_index_cache(cfg)
+    llm_cache = get_llm_cache(cfg)
+    return {
+        "index_cache": dict(index_cache.stats) if index_cache else None,
+        "llm_cache": dict(llm_cache.stats) if llm_cache else None,
+    }
+
+
+@app.get("/admission/stats")
+async def admission_stats() -> Dict[str, Any]:
+    return get_admission(AppConfig()).stats()
+
+
+@app.get("/http/stats")
+def http_stats() -> Dict[str, Any]:
+    return http_pool_stats()
+
+
+def _resource_samples() -> List[Any]:
+    cfg = AppConfig()
+    index_cache = get_index_cache(cfg)
+    llm_cache = get_llm_cache(cfg)
+    samples = stats_samples(get_artifact_store(cfg).stats, resource="artifact_store")
+    samples += stats_samples(dict(index_cache.stats) if index_cache else None, resource="index_cache")
+    samples += stats_samples(dict(llm_cache.stats) if llm_cache else None, resource="llm_cache")
+    for name, pool in http_pool_stats().items():
+        samples += stats_samples(pool, resource=f"http_pool_{name}")
+    return samples
+
+
+METRICS.gauge_callback(
+    "cv_admission", "Admission controller state, as in /admission/stats.",
+    lambda: stats_samples(get_admission(AppConfig()).stats()),
+)
+METRICS.gauge_callback("cv_resource", "Cache, artifact store and HTTP pool counters.", _resource_samples)
+
+
+@app.get("/metrics")
+async def metrics() -> Response:
+    """
+    Prometheus text format. Metrics are per process: job workers and other
+    uvicorn workers keep their own and are not included here. Rendered on the
+    event loop, since the admission gauges read controller state that only
+    the loop may touch.
+    """
+    return Response(content=METRICS.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.post("/recruiter/rank")
+def recruiter_rank(req: RankProfilesRequest) -> Dict[str, Any]:
+    cfg = AppConfig()
+    if not MultiProfileIndex.exists(cfg.profile_index_dir):
+        raise HTTPException(
+            status_code=409,
+            detail=(
+                f"no profile index at {cfg.profile_index_dir}; "
+                "build one with `python -m core.multi_profile_index <profiles_dir>`"
+            ),
+        )
+    return rank_profiles(req.job_description, cfg=cfg, top_n=req.top_n)
+
+
+@app.post("/run_sync")
+async def run_sync(req: RunRequest) -> Dict[str, Any]:
+    _count_request("/run_sync", req)
+    async with get_admission(AppConfig()).admit():
+        return await asyncio.to_thread(run_pipeline, req.job_description, req.profile_text, _cfg_from_request(req))
 
 
 app.add_middleware(
@@ -4,6 +4,7 @@ import streamlit as st
 
 from config import AppConfig
 from orchestrator import run_pipeline
+from resources import get_artifact_store
 from core.pdf_extract import extract_text_from_pdf_bytes
 
 
@@ -38,7 +39,7 @@ with col2:
     else:
         profile_text = st.text_area("Profile / Resume", height=360)
 
-opt_col1, opt_col2, opt_col3, opt_col4, opt_col5 = st.columns(5)
+opt_col1, opt_col2, opt_col3, opt_col4, opt_col5, opt_col6 = st.columns(6)
 with opt_col1:
     use_tfidf = st.checkbox("TF-IDF", value=True)
 with opt_col2:
@@ -49,6 +50,8 @@ with opt_col4:
     use_llm_jd_classifier = st.checkbox("LLM JD Classify", value=False)
 with opt_col5:
     use_llm_editor = st.checkbox("LLM Editor", value=True)
+with opt_col6:
+    collect_timings = st.checkbox("Timings", value=False)
 
 run_btn = st.button("Run", type="primary")
 
@@ -70,11 +73,19 @@ if run_btn:
         use_embeddings=use_embeddings,
         use_llm_jd_classifier=use_llm_jd_classifier,
         use_llm_editor=use_llm_editor,
+        collect_timings=collect_timings,
     )
 
     out = run_pipeline(final_jd_text, profile_text, cfg=cfg)
 
-    tabs = st.tabs(["Match", "Evidence", "Resume Bullets", "Cover Letter", "Warnings", "JSON"])
+    st.download_button(
+        "Download package (.zip)",
+        data=get_artifact_store(cfg).package(out["run_id"]) or b"",
+        file_name=f"package-{out['run_id']}.zip",
+        mime="application/zip",
+    )
+
+    tabs = st.tabs(["Match", "Evidence", "Resume Bullets", "Cover Letter", "Warnings", "Timings", "JSON"])
 
     with tabs[0]:
         st.metric("Match Score (Overall)", out["match_report"]["match_score_overall"])
@@ -108,4 +119,17 @@ if run_btn:
         st.write(out["generation"].get("warnings", []))
 
     with tabs[5]:
+        st.subheader("Stage Timings")
+        timings = out.get("timings")
+        if timings:
+            st.dataframe(timings["stages"], use_container_width=True)
+            st.caption(
+                f"elapsed: {timings['elapsed_ms']:.1f} ms, "
+                f"stage wall total: {timings['total_wall_ms']:.1f} ms, "
+                f"stage cpu total: {timings['total_cpu_ms']:.1f} ms"
+            )
+        else:
+            st.write("Enable 'Timings' to collect a per-stage breakdown.")
+
+    with tabs[6]:
         st.json(out)
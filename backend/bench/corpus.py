@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from typing import Any, Dict, List, Set
+
+import yaml
+
+from config import AppConfig
+from core.preprocess import normalize_text
+from core.skill_taxonomy import SkillTaxonomy
+
+# the headers chunk_profile recognises; more sections than this would merge
+SECTION_TITLES = ["Summary", "Experience", "Projects", "Skills", "Education"]
+
+
+@dataclass(frozen=True)
+class CorpusSpec:
+    """
+    Size of a synthetic profile/JD pair.
+
+    sections is capped at the five headers chunk_profile knows. Each section
+    is long enough for about chunks_per_section chunks at the configured
+    chunk size. taxonomy_size 0 keeps every skill in skills.yaml; smaller
+    samples it, larger pads it with made-up skills. requirements is capped at
+    the taxonomy size.
+    """
+
+    sections: int = 4
+    chunks_per_section: int = 3
+    requirements: int = 12
+    taxonomy_size: int = 0
+    nice_ratio: float = 0.3
+    seed: int = 13
+
+
+@dataclass
+class Corpus:
+    spec: CorpusSpec
+    skills: Dict[str, Dict[str, List[str]]]
+    taxonomy: SkillTaxonomy
+    requirements: List[str]
+    profile_text: str
+    jd_text: str
+
+    def write_skills_yaml(self, path: str) -> None:
+        """Writes the corpus taxonomy in skills.yaml format, for runs that load it from cfg."""
+        with open(path, "w", encoding="utf-8") as f:
+            yaml.safe_dump(self.skills, f, sort_keys=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "skills": len(self.taxonomy.entries),
+            "aliases": len(self.taxonomy.alias_to_canonical),
+            "requirements": len(self.requirements),
+            "profile_chars": len(self.profile_text),
+            "jd_chars": len(self.jd_text),
+        }
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choice("bcdfghjklmnpqrstvwxz") + rng.choice("aeiou") for _ in range(rng.randint(2, 4)))
+
+
+def _filler(rng: random.Random, n: int, reserved: Set[str]) -> List[str]:
+    """Made-up words that cannot collide with a skill alias."""
+    words: Set[str] = set()
+    while len(words) < n:
+        w = _word(rng)
+        if w not in reserved:
+            words.add(w)
+    return sorted(words)
+
+
+def _skills(spec: CorpusSpec, rng: random.Random, skills_yaml_path: str) -> Dict[str, Dict[str, List[str]]]:
+    with open(skills_yaml_path, "r", encoding="utf-8") as f:
+        raw = yaml.safe_load(f) or {}
+    skills = {
+        str(k): {"aliases": list(v.get("aliases") or []), "related": list(v.get("related") or [])}
+        for k, v in raw.items()
+    }
+    size = spec.taxonomy_size or len(skills)
+    if size < len(skills):
+        return {k: skills[k] for k in sorted(rng.sample(sorted(skills), size))}
+
+    taken = {normalize_text(t) for k, v in skills.items() for t in [k, *v["aliases"]]}
+    while len(skills) < size:
+        name = f"{_word(rng)} {_word(rng)}"
+        aliases = [_word(rng) + "x" for _ in range(rng.randint(0, 2))]
+        if name in taken or taken & set(aliases):
+            continue
+        taken |= {name, *aliases}
+        skills[name] = {"aliases": aliases, "related": []}
+    return skills
+
+
+def _sentence(rng: random.Random, filler: List[str], skills: List[str], n_words: int) -> str:
+    parts = [rng.choice(filler) for _ in range(n_words)]
+    for s in skills:
+        parts.insert(rng.randrange(len(parts) + 1), s)
+    return " ".join(parts).capitalize() + "."
+
+
+def _profile(
+    spec: CorpusSpec,
+    rng: random.Random,
+    taxonomy: SkillTaxonomy,
+    requirements: List[str],
+    filler: List[str],
+    cfg: AppConfig,
+) -> str:
+    names = list(taxonomy.alias_to_canonical)
+    section_chars = spec.chunks_per_section * max(1, cfg.chunk_chars - cfg.overlap_chars)
+    out: List[str] = []
+    for title in SECTION_TITLES[: max(1, min(spec.sections, len(SECTION_TITLES)))]:
+        out.append(title)
+        body: List[str] = []
+        size = 0
+        while size < section_chars:
+            # about two thirds of the mentions hit a requirement, so most of them find evidence
+            pool = requirements if requirements and rng.random() < 0.67 else names
+            s = _sentence(rng, filler, [rng.choice(pool) for _ in range(rng.randint(1, 2))], rng.randint(8, 16))
+            body.append(s)
+            size += len(s) + 1
+            if rng.random() < 0.25:
+                body.append("")
+        out.append("\n".join(body))
+        out.append("")
+    return "\n".join(out)
+
+
+def _jd(spec: CorpusSpec, rng: random.Random, requirements: List[str], filler: List[str]) -> str:
+    n_nice = int(round(len(requirements) * spec.nice_ratio))
+    must, nice = requirements[: len(requirements) - n_nice], requirements[len(requirements) - n_nice :]
+    lines = ["Company: Benchmark Labs", "Role: Software Engineer", ""]
+    for i in range(0, len(must), 3):
+        lines.append(f"Strong experience with {', '.join(must[i : i + 3])} is required.")
+    for i in range(0, len(nice), 3):
+        lines.append(f"Experience with {', '.join(nice[i : i + 3])} is a plus.")
+    lines.append("")
+    for _ in range(max(3, len(requirements) // 3)):
+        lines.append("- " + _sentence(rng, filler, [], rng.randint(6, 12)))
+    return "\n".join(lines)
+
+
+def build_corpus(spec: CorpusSpec, cfg: AppConfig | None = None) -> Corpus:
+    """A deterministic profile/JD pair for spec, built from the skills in cfg.skills_yaml_path."""
+    cfg = cfg or AppConfig()
+    rng = random.Random(spec.seed)
+    skills = _skills(spec, rng, cfg.skills_yaml_path)
+    taxonomy = SkillTaxonomy.from_dict(skills)
+    reserved = {w for alias in taxonomy.alias_to_canonical for w in alias.split()}
+    filler = _filler(rng, 600, reserved)
+    requirements = rng.sample(taxonomy.all_canonicals(), min(spec.requirements, len(taxonomy.entries)))
+    return Corpus(
+        spec=spec,
+        skills=skills,
+        taxonomy=taxonomy,
+        requirements=requirements,
+        profile_text=_profile(spec, rng, taxonomy, requirements, filler, cfg),
+        jd_text=_jd(spec, rng, requirements, filler),
+    )
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+from bench.stub_openai import fake_chat_content, fake_embedding, fake_usage
+
+
+def namespace(obj: Any) -> Any:
+    """Nested dicts as attribute objects, the shape the OpenAI SDK returns."""
+    if isinstance(obj, dict):
+        return SimpleNamespace(**{k: namespace(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return [namespace(v) for v in obj]
+    return obj
+
+
+class _Completions:
+    def __init__(self, owner: "FakeOpenAI"):
+        self._owner = owner
+
+    def create(self, model: str, messages: List[Dict[str, Any]], **kwargs: Any) -> Any:
+        self._owner.calls["chat"] += 1
+        content = fake_chat_content(messages)
+        self._owner.wait(self._owner.latency_ms)
+        return namespace(
+            {
+                "model": model,
+                "choices": [
+                    {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+                ],
+                "usage": fake_usage(messages, content),
+            }
+        )
+
+
+class _Embeddings:
+    def __init__(self, owner: "FakeOpenAI"):
+        self._owner = owner
+
+    def create(self, model: str, input: Any, **kwargs: Any) -> Any:
+        texts = [input] if isinstance(input, str) else list(input)
+        self._owner.calls["embed"] += 1
+        self._owner.wait(self._owner.embed_latency_ms)
+        return namespace(
+            {
+                "model": model,
+                "data": [
+                    {"index": i, "embedding": fake_embedding(str(t), self._owner.dim)} for i, t in enumerate(texts)
+                ],
+            }
+        )
+
+
+class FakeOpenAI:
+    """
+    In-process stand-in for the sync OpenAI client, with the same replies as
+    bench.stub_openai but no HTTP in between, so end-to-end timings measure
+    the pipeline itself. latency_ms is slept per call (0 by default).
+    """
+
+    def __init__(self, latency_ms: float = 0.0, embed_latency_ms: float = 0.0, dim: int = 256):
+        self.latency_ms = latency_ms
+        self.embed_latency_ms = embed_latency_ms
+        self.dim = dim
+        self.calls: Dict[str, int] = {"chat": 0, "embed": 0}
+        self.chat = SimpleNamespace(completions=_Completions(self))
+        self.embeddings = _Embeddings(self)
+
+    @staticmethod
+    def wait(ms: float) -> None:
+        if ms > 0:
+            time.sleep(ms / 1000.0)
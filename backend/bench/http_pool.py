@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from openai import OpenAI
+
+from bench.stub_openai import serve
+from config import AppConfig
+from resources import http_pool_stats, get_openai_client
+
+_MESSAGES = [
+    {"role": "system", "content": "stub"},
+    {"role": "user", "content": json.dumps({"job_description": "Python", "candidate_skill_lists": {}})},
+]
+
+
+def _run(make_client: Callable[[], OpenAI], requests: int, concurrency: int) -> float:
+    def one(_: int) -> None:
+        make_client().chat.completions.create(
+            model="stub",
+            messages=_MESSAGES,
+            response_format={"type": "json_object"},
+        )
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Compare the shared pooled OpenAI client with a client per call.")
+    ap.add_argument("--requests", type=int, default=200)
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--latency-ms", type=float, default=20.0)
+    ap.add_argument("--max-connections", type=int, default=AppConfig().http_max_connections)
+    args = ap.parse_args()
+
+    # both clients only ever talk to the local stub, which accepts any key
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+    server = serve(port=0, latency_ms=args.latency_ms)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    cfg = AppConfig(openai_base_url=base_url, http_max_connections=args.max_connections)
+
+    fresh_s = _run(lambda: OpenAI(base_url=base_url, api_key="stub"), args.requests, args.concurrency)
+    shared = get_openai_client(cfg)
+    pooled_s = _run(lambda: shared, args.requests, args.concurrency)
+    server.shutdown()
+
+    report: Dict[str, Any] = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "latency_ms": args.latency_ms,
+        "client_per_call_s": round(fresh_s, 3),
+        "shared_pool_s": round(pooled_s, 3),
+        "pool": http_pool_stats()["sync"],
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
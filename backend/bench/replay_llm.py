@@ -0,0 +1,631 @@
+"""
+Record/replay stand-ins for the OpenAI clients.
+
+ReplayOpenAI and AsyncReplayOpenAI answer chat.completions.create and
+embeddings.create, so they can be passed anywhere the agents or
+_embed_fn_factory take a client, or installed for the whole process with
+resources.use_openai_clients.
+
+mode="record" forwards every call to a real client and appends the response
+and its latency to the cassette, a JSON-lines file. mode="replay" answers
+from the cassette. A request that is not in the cassette gets a synthesized
+reply that fits the agent's schema (on_miss="synthesize"), or raises
+CassetteMiss (on_miss="error"). mode="auto" replays what it has and records
+the rest, so it needs a real client.
+
+Replayed and synthesized calls sleep for a delay drawn from a LatencyModel:
+"recorded" (each entry's own latency; synthesized calls draw from all the
+recorded ones), "none", "fixed:MS", "uniform:LO,HI", "normal:MEAN,SD" or
+"lognormal:MEDIAN,SIGMA". Streamed replies spread that delay over the chunks,
+with the first after ttft_ratio of it.
+
+    python -m bench.replay_llm record --cassette outputs/llm.cassette.jsonl --size small
+    python -m bench.replay_llm load --cassette outputs/llm.cassette.jsonl --requests 64 --concurrency 8 \\
+        --latency lognormal:900,0.4 --embed-latency fixed:60
+    python -m bench.replay_llm stats --cassette outputs/llm.cassette.jsonl
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from dataclasses import replace
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from bench.fake_llm import namespace
+from bench.stub_openai import fake_chat_content, fake_embedding, fake_usage
+from core.llm_cache import llm_cache_key
+
+MODES = ("replay", "record", "auto")
+
+
+class CassetteMiss(LookupError):
+    """A replay-only client got a request that is not in its cassette."""
+
+
+def chat_key(request: Dict[str, Any]) -> str:
+    return llm_cache_key(
+        request.get("model", ""),
+        request.get("temperature", 1.0),
+        request.get("messages") or [],
+        request.get("response_format"),
+    )
+
+
+def embed_key(model: str, text: str) -> str:
+    return hashlib.sha256(json.dumps([model, text], ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class LatencyModel:
+    """Per-call delay in ms; see the module docstring for the spec strings parse() accepts."""
+
+    KINDS = ("recorded", "none", "fixed", "uniform", "normal", "lognormal")
+
+    def __init__(self, kind: str = "recorded", params: Sequence[float] = (), scale: float = 1.0, seed: int = 0):
+        if kind not in self.KINDS:
+            raise ValueError(f"unknown latency model {kind!r}; expected one of {', '.join(self.KINDS)}")
+        self.kind = kind
+        self.params = tuple(float(p) for p in params)
+        self.scale = float(scale)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def parse(cls, spec: str, scale: float = 1.0, seed: int = 0) -> "LatencyModel":
+        kind, _, rest = (spec or "recorded").partition(":")
+        params = [float(p) for p in rest.split(",") if p.strip()]
+        need = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}.get(kind, 0)
+        if len(params) != need:
+            raise ValueError(f"latency model {kind!r} takes {need} parameter(s), got {spec!r}")
+        return cls(kind, params, scale, seed)
+
+    def sample(self, recorded: Optional[float], pool: Sequence[float]) -> float:
+        p = self.params
+        with self._lock:
+            if self.kind == "none":
+                ms = 0.0
+            elif self.kind == "recorded":
+                ms = recorded if recorded is not None else (self._rng.choice(pool) if pool else 0.0)
+            elif self.kind == "fixed":
+                ms = p[0]
+            elif self.kind == "uniform":
+                ms = self._rng.uniform(p[0], p[1])
+            elif self.kind == "normal":
+                ms = self._rng.gauss(p[0], p[1])
+            else:
+                ms = p[0] * math.exp(p[1] * self._rng.gauss(0.0, 1.0))
+        return max(0.0, ms * self.scale)
+
+
+class Cassette:
+    """
+    Recorded calls, one JSON object per line: {"kind": "chat", "key", "model",
+    "content", "usage", "latency_ms"} or {"kind": "embed", "key", "model",
+    "embedding", "latency_ms", "batch"}. A key recorded more than once is
+    replayed round-robin. New entries are appended as they are recorded.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._next: Dict[str, int] = {}
+        self._latencies: Dict[str, List[float]] = {"chat": [], "embed": []}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        self._add(json.loads(line))
+
+    def _add(self, entry: Dict[str, Any]) -> None:
+        self._entries.setdefault(entry["key"], []).append(entry)
+        if entry.get("latency_ms") is not None:
+            self._latencies.setdefault(entry["kind"], []).append(float(entry["latency_ms"]))
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._entries.values())
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            items = self._entries.get(key)
+            if not items:
+                return None
+            i = self._next.get(key, 0)
+            self._next[key] = i + 1
+            return items[i % len(items)]
+
+    def put(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._add(entry)
+            if self.path:
+                if os.path.dirname(self.path):
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def latencies(self, kind: str) -> List[float]:
+        with self._lock:
+            return list(self._latencies.get(kind, []))
+
+    def embed_dim(self) -> Optional[int]:
+        with self._lock:
+            for items in self._entries.values():
+                if items[0]["kind"] == "embed":
+                    return len(items[0]["embedding"])
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"entries": len(self), "keys": len(self._entries)}
+        for kind in ("chat", "embed"):
+            lat = sorted(self.latencies(kind))
+            if lat:
+                out[f"{kind}_latency_ms"] = {
+                    "n": len(lat),
+                    "p50": round(lat[len(lat) // 2], 1),
+                    "p95": round(lat[min(len(lat) - 1, int(0.95 * len(lat)))], 1),
+                    "max": round(lat[-1], 1),
+                }
+        return out
+
+
+def _usage_dict(usage: Any) -> Optional[Dict[str, int]]:
+    if usage is None:
+        return None
+    return {k: int(getattr(usage, k, 0) or 0) for k in ("prompt_tokens", "completion_tokens", "total_tokens")}
+
+
+def _chat_response(entry: Dict[str, Any]) -> Any:
+    return namespace(
+        {
+            "model": entry.get("model", ""),
+            "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": entry["content"]}, "finish_reason": "stop"}
+            ],
+            "usage": entry.get("usage"),
+        }
+    )
+
+
+def _embed_response(model: str, vectors: List[List[float]]) -> Any:
+    return namespace({"model": model, "data": [{"index": i, "embedding": v} for i, v in enumerate(vectors)]})
+
+
+def _stream_pieces(content: str, chunk_chars: int) -> List[str]:
+    return [content[i : i + chunk_chars] for i in range(0, len(content), chunk_chars)] or [""]
+
+
+class _Replay:
+    """Lookup, synthesis, recording and delays shared by the sync and async clients."""
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        mode: str,
+        real: Any,
+        latency: Optional[LatencyModel],
+        embed_latency: Optional[LatencyModel],
+        on_miss: str,
+        dim: Optional[int],
+    ):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {', '.join(MODES)}")
+        if mode != "replay" and real is None:
+            raise ValueError(f"mode={mode!r} needs a real client to record from")
+        self.cassette = cassette
+        self.mode = mode
+        self.real = real
+        self.latency = latency or LatencyModel()
+        self.embed_latency = embed_latency or self.latency
+        self.on_miss = on_miss
+        self.dim = dim or cassette.embed_dim() or 256
+        self.calls: Dict[str, int] = {"chat": 0, "embed": 0}
+        self.stats: Dict[str, int] = {"hits": 0, "recorded": 0, "synthesized": 0}
+        self._lock = threading.Lock()
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[name] += n
+
+    def call(self, kind: str) -> None:
+        with self._lock:
+            self.calls[kind] += 1
+
+    def should_record(self) -> bool:
+        return self.mode != "replay"
+
+    def lookup_chat(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.mode == "record":
+            return None
+        entry = self.cassette.get(key)
+        if entry is not None:
+            self.count("hits")
+        return entry
+
+    def synth_chat(self, key: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        if self.on_miss != "synthesize":
+            raise CassetteMiss(f"no recorded reply for chat request {key[:12]}")
+        self.count("synthesized")
+        messages = request.get("messages") or []
+        content = fake_chat_content(messages)
+        return {
+            "kind": "chat",
+            "key": key,
+            "model": request.get("model", ""),
+            "content": content,
+            "usage": fake_usage(messages, content),
+            "latency_ms": None,
+        }
+
+    def record_chat(self, key: str, request: Dict[str, Any], resp: Any, latency_ms: float) -> Dict[str, Any]:
+        entry = {
+            "kind": "chat",
+            "key": key,
+            "model": request.get("model", ""),
+            "content": resp.choices[0].message.content or "",
+            "usage": _usage_dict(getattr(resp, "usage", None)),
+            "latency_ms": round(latency_ms, 3),
+        }
+        self.cassette.put(entry)
+        self.count("recorded")
+        return entry
+
+    def chat_delay_s(self, entry: Dict[str, Any]) -> float:
+        return self.latency.sample(entry.get("latency_ms"), self.cassette.latencies("chat")) / 1000.0
+
+    def lookup_embed(self, model: str, texts: List[str]) -> Tuple[List[Optional[List[float]]], List[Optional[float]]]:
+        vectors: List[Optional[List[float]]] = []
+        latencies: List[Optional[float]] = []
+        for t in texts:
+            entry = None if self.mode == "record" else self.cassette.get(embed_key(model, t))
+            vectors.append(entry["embedding"] if entry else None)
+            latencies.append(entry.get("latency_ms") if entry else None)
+        self.count("hits", sum(1 for v in vectors if v is not None))
+        return vectors, latencies
+
+    def synth_embed(self, model: str, texts: List[str]) -> List[List[float]]:
+        if self.on_miss != "synthesize":
+            raise CassetteMiss(f"no recorded embedding for {len(texts)} text(s)")
+        self.count("synthesized", len(texts))
+        return [fake_embedding(t, self.dim) for t in texts]
+
+    def record_embed(self, model: str, texts: List[str], resp: Any, latency_ms: float) -> List[List[float]]:
+        vectors = [list(d.embedding) for d in resp.data]
+        for t, v in zip(texts, vectors):
+            self.cassette.put(
+                {
+                    "kind": "embed",
+                    "key": embed_key(model, t),
+                    "model": model,
+                    "embedding": v,
+                    "latency_ms": round(latency_ms, 3),
+                    "batch": len(texts),
+                }
+            )
+        self.count("recorded", len(texts))
+        return vectors
+
+    def embed_delay_s(self, latencies: List[Optional[float]]) -> float:
+        # one request for the whole batch: replay the slowest recorded call in it
+        known = [ms for ms in latencies if ms is not None]
+        return self.embed_latency.sample(max(known) if known else None, self.cassette.latencies("embed")) / 1000.0
+
+    @staticmethod
+    def merge(vectors: List[Optional[List[float]]], missing: List[int], filled: List[List[float]]) -> List[List[float]]:
+        out = list(vectors)
+        for i, v in zip(missing, filled):
+            out[i] = v
+        return out  # type: ignore[return-value]
+
+
+def _chat_request(kwargs: Dict[str, Any]) -> Tuple[Dict[str, Any], bool, bool]:
+    request = dict(kwargs)
+    stream = bool(request.pop("stream", False))
+    include_usage = bool((request.pop("stream_options", None) or {}).get("include_usage"))
+    return request, stream, include_usage
+
+
+class _Completions:
+    def __init__(self, core: _Replay):
+        self._core = core
+
+    def create(self, **kwargs: Any) -> Any:
+        core = self._core
+        request, _, _ = _chat_request(kwargs)
+        core.call("chat")
+        key = chat_key(request)
+        entry = core.lookup_chat(key)
+        if entry is None and core.should_record():
+            t0 = time.perf_counter()
+            resp = core.real.chat.completions.create(**request)
+            return _chat_response(core.record_chat(key, request, resp, 1000.0 * (time.perf_counter() - t0)))
+        entry = entry or core.synth_chat(key, request)
+        time.sleep(core.chat_delay_s(entry))
+        return _chat_response(entry)
+
+
+class _Embeddings:
+    def __init__(self, core: _Replay):
+        self._core = core
+
+    def create(self, model: str, input: Any, **kwargs: Any) -> Any:
+        core = self._core
+        texts = [input] if isinstance(input, str) else [str(t) for t in input]
+        core.call("embed")
+        vectors, latencies = core.lookup_embed(model, texts)
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        if missing and core.should_record():
+            todo = [texts[i] for i in missing]
+            t0 = time.perf_counter()
+            resp = core.real.embeddings.create(model=model, input=todo)
+            filled = core.record_embed(model, todo, resp, 1000.0 * (time.perf_counter() - t0))
+            return _embed_response(model, core.merge(vectors, missing, filled))
+        if missing:
+            vectors = core.merge(vectors, missing, core.synth_embed(model, [texts[i] for i in missing]))
+        time.sleep(core.embed_delay_s(latencies))
+        return _embed_response(model, vectors)  # type: ignore[arg-type]
+
+
+class ReplayOpenAI:
+    """Sync client; real is the OpenAI client to record from (record and auto modes)."""
+
+    def __init__(
+        self,
+        cassette: Cassette | str | None = None,
+        mode: str = "replay",
+        real: Any = None,
+        latency: Optional[LatencyModel] = None,
+        embed_latency: Optional[LatencyModel] = None,
+        on_miss: str = "synthesize",
+        dim: Optional[int] = None,
+    ):
+        if not isinstance(cassette, Cassette):
+            cassette = Cassette(cassette)
+        self._core = _Replay(cassette, mode, real, latency, embed_latency, on_miss, dim)
+        self.cassette = cassette
+        self.chat = SimpleNamespace(completions=_Completions(self._core))
+        self.embeddings = _Embeddings(self._core)
+
+    @property
+    def calls(self) -> Dict[str, int]:
+        return self._core.calls
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return self._core.stats
+
+
+class _AsyncStream:
+    """Async iterator of chat.completion.chunk-shaped objects, paced like a streamed reply."""
+
+    def __init__(self, entry: Dict[str, Any], delay_s: float, ttft_ratio: float, chunk_chars: int, usage: bool):
+        self._pieces = _stream_pieces(entry["content"], chunk_chars)
+        self._usage = entry.get("usage") if usage else None
+        self._ttft_s = delay_s * ttft_ratio
+        self._gap_s = (delay_s - self._ttft_s) / len(self._pieces)
+        self._i = 0
+        self._model = entry.get("model", "")
+
+    def __aiter__(self) -> "_AsyncStream":
+        return self
+
+    async def __anext__(self) -> Any:
+        i = self._i
+        self._i += 1
+        if i < len(self._pieces):
+            await asyncio.sleep(self._ttft_s if i == 0 else self._gap_s)
+            delta = {"content": self._pieces[i]}
+            finish = "stop" if i == len(self._pieces) - 1 else None
+            choice = {"index": 0, "delta": delta, "finish_reason": finish}
+            return namespace({"model": self._model, "choices": [choice], "usage": None})
+        if i == len(self._pieces) and self._usage:
+            return namespace({"model": self._model, "choices": [], "usage": self._usage})
+        raise StopAsyncIteration
+
+
+class _AsyncCompletions:
+    def __init__(self, core: _Replay, ttft_ratio: float, chunk_chars: int):
+        self._core = core
+        self._ttft_ratio = ttft_ratio
+        self._chunk_chars = chunk_chars
+
+    async def create(self, **kwargs: Any) -> Any:
+        core = self._core
+        request, stream, include_usage = _chat_request(kwargs)
+        core.call("chat")
+        key = chat_key(request)
+        entry = core.lookup_chat(key)
+        if entry is None and core.should_record():
+            # recorded without streaming; replays stream it back
+            t0 = time.perf_counter()
+            resp = await core.real.chat.completions.create(**request)
+            entry = core.record_chat(key, request, resp, 1000.0 * (time.perf_counter() - t0))
+            return _AsyncStream(entry, 0.0, 0.0, self._chunk_chars, include_usage) if stream else _chat_response(entry)
+        entry = entry or core.synth_chat(key, request)
+        delay_s = core.chat_delay_s(entry)
+        if stream:
+            return _AsyncStream(entry, delay_s, self._ttft_ratio, self._chunk_chars, include_usage)
+        await asyncio.sleep(delay_s)
+        return _chat_response(entry)
+
+
+class _AsyncEmbeddings:
+    def __init__(self, core: _Replay):
+        self._core = core
+
+    async def create(self, model: str, input: Any, **kwargs: Any) -> Any:
+        core = self._core
+        texts = [input] if isinstance(input, str) else [str(t) for t in input]
+        core.call("embed")
+        vectors, latencies = core.lookup_embed(model, texts)
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        if missing and core.should_record():
+            todo = [texts[i] for i in missing]
+            t0 = time.perf_counter()
+            resp = await core.real.embeddings.create(model=model, input=todo)
+            filled = core.record_embed(model, todo, resp, 1000.0 * (time.perf_counter() - t0))
+            return _embed_response(model, core.merge(vectors, missing, filled))
+        if missing:
+            vectors = core.merge(vectors, missing, core.synth_embed(model, [texts[i] for i in missing]))
+        await asyncio.sleep(core.embed_delay_s(latencies))
+        return _embed_response(model, vectors)  # type: ignore[arg-type]
+
+
+class AsyncReplayOpenAI:
+    """Async client with the same cassette semantics; stream=True replies are chunked and paced."""
+
+    def __init__(
+        self,
+        cassette: Cassette | str | None = None,
+        mode: str = "replay",
+        real: Any = None,
+        latency: Optional[LatencyModel] = None,
+        embed_latency: Optional[LatencyModel] = None,
+        on_miss: str = "synthesize",
+        dim: Optional[int] = None,
+        ttft_ratio: float = 0.2,
+        stream_chunk_chars: int = 16,
+    ):
+        if not isinstance(cassette, Cassette):
+            cassette = Cassette(cassette)
+        self._core = _Replay(cassette, mode, real, latency, embed_latency, on_miss, dim)
+        self.cassette = cassette
+        completions = _AsyncCompletions(self._core, min(1.0, max(0.0, ttft_ratio)), max(1, stream_chunk_chars))
+        self.chat = SimpleNamespace(completions=completions)
+        self.embeddings = _AsyncEmbeddings(self._core)
+
+    @property
+    def calls(self) -> Dict[str, int]:
+        return self._core.calls
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return self._core.stats
+
+
+def _inputs(args: argparse.Namespace, tmp: str) -> Tuple[str, str, Any]:
+    """(jd_text, profile_text, cfg) from files, or a synthetic corpus of the given size."""
+    from bench.corpus import build_corpus
+    from bench.suite import SIZES
+    from config import AppConfig
+
+    cfg = AppConfig(
+        use_embeddings=args.embeddings,
+        use_llm_jd_classifier=True,
+        use_llm_editor=True,
+        bypass_llm_cache=True,
+        use_embed_store=False,
+    )
+    if args.jd and args.profile:
+        with open(args.jd, "r", encoding="utf-8") as f:
+            jd = f.read()
+        with open(args.profile, "r", encoding="utf-8") as f:
+            profile = f.read()
+        return jd, profile, cfg
+    corpus = build_corpus(SIZES[args.size], cfg)
+    path = os.path.join(tmp, "skills.yaml")
+    corpus.write_skills_yaml(path)
+    return corpus.jd_text, corpus.profile_text, replace(cfg, skills_yaml_path=path, skills_snapshot_path="")
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    s = sorted(samples)
+    out = {"mean": round(statistics.mean(s), 1)}
+    for q in (0.50, 0.95, 0.99):
+        out[f"p{int(100 * q)}"] = round(s[min(len(s) - 1, max(0, math.ceil(q * len(s)) - 1))], 1)
+    return out
+
+
+def _record(args: argparse.Namespace) -> Dict[str, Any]:
+    from orchestrator import run_pipeline
+    from resources import get_openai_client, use_openai_clients
+
+    with tempfile.TemporaryDirectory() as tmp:
+        jd, profile, cfg = _inputs(args, tmp)
+        client = ReplayOpenAI(args.cassette, mode="auto", real=get_openai_client(cfg))
+        use_openai_clients(client)
+        run_pipeline(jd, profile, cfg)
+    return {"stats": client.stats, "cassette": client.cassette.stats()}
+
+
+def _load(args: argparse.Namespace) -> Dict[str, Any]:
+    from orchestrator import run_pipeline_async
+    from resources import use_openai_clients
+
+    latency = LatencyModel.parse(args.latency, args.latency_scale, args.seed)
+    embed_latency = LatencyModel.parse(args.embed_latency, args.latency_scale, args.seed + 1)
+    cassette = Cassette(args.cassette)
+    sync_client = ReplayOpenAI(cassette, latency=latency, embed_latency=embed_latency)
+    client = AsyncReplayOpenAI(cassette, latency=latency, embed_latency=embed_latency)
+    use_openai_clients(sync_client, client)
+
+    async def run(jd: str, profile: str, cfg: Any) -> Tuple[List[float], float]:
+        sem = asyncio.Semaphore(args.concurrency)
+        times: List[float] = []
+
+        async def one() -> None:
+            async with sem:
+                t0 = time.perf_counter()
+                await run_pipeline_async(jd, profile, cfg)
+                times.append(1000.0 * (time.perf_counter() - t0))
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*[one() for _ in range(args.requests)])
+        return times, time.perf_counter() - t0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        jd, profile, cfg = _inputs(args, tmp)
+        times, wall_s = asyncio.run(run(jd, profile, cfg))
+    return {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "latency": args.latency,
+        "embed_latency": args.embed_latency,
+        "wall_s": round(wall_s, 3),
+        "throughput_rps": round(args.requests / wall_s, 2) if wall_s else None,
+        "latency_ms": _percentiles(times),
+        "replay": {k: client.stats[k] + sync_client.stats[k] for k in client.stats},
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Record LLM traffic to a cassette, or replay it under load.")
+    sub = ap.add_subparsers(dest="command", required=True)
+    for name in ("record", "load", "stats"):
+        p = sub.add_parser(name)
+        p.add_argument("--cassette", required=True)
+        if name == "stats":
+            continue
+        p.add_argument("--jd", default=None, help="job description file (with --profile)")
+        p.add_argument("--profile", default=None, help="profile text file (with --jd)")
+        p.add_argument("--size", default="small", help="synthetic corpus size when no files are given")
+        p.add_argument("--embeddings", action="store_true")
+        if name == "load":
+            p.add_argument("--requests", type=int, default=32)
+            p.add_argument("--concurrency", type=int, default=8)
+            p.add_argument("--latency", default="recorded")
+            p.add_argument("--embed-latency", default="recorded")
+            p.add_argument("--latency-scale", type=float, default=1.0)
+            p.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    if args.command == "stats":
+        report = Cassette(args.cassette).stats()
+    elif args.command == "record":
+        report = _record(args)
+    else:
+        report = _load(args)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Dict, List, Set
+
+from core.preprocess import normalize_text
+from core.skill_taxonomy import SkillEntry, SkillTaxonomy
+
+
+def _naive_extract(alias_to_canonical: Dict[str, str], text: str) -> Set[str]:
+    t = normalize_text(text)
+    found: Set[str] = set()
+    padded = f" {t} "
+    for alias_norm, canon in alias_to_canonical.items():
+        if not alias_norm:
+            continue
+        if f" {alias_norm} " in padded:
+            found.add(canon)
+    return found
+
+
+def _vocab(rng: random.Random, n: int) -> List[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words: Set[str] = set()
+    while len(words) < n:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(2, 8))))
+    return sorted(words)
+
+
+def synthetic_taxonomy(n_aliases: int, seed: int = 7) -> SkillTaxonomy:
+    rng = random.Random(seed)
+    vocab = _vocab(rng, max(200, n_aliases // 2))
+    entries: Dict[str, SkillEntry] = {}
+    n_skills = max(1, n_aliases // 4)
+    for i in range(n_skills):
+        canon = " ".join(rng.sample(vocab, rng.randint(1, 2)))
+        aliases = {" ".join(rng.sample(vocab, rng.randint(1, 3))) for _ in range(3)}
+        entries[canon] = SkillEntry(canonical=canon, aliases=aliases, related=set())
+    return SkillTaxonomy(entries)
+
+
+def synthetic_sentences(taxonomy: SkillTaxonomy, n: int, words: int = 40, seed: int = 11) -> List[str]:
+    rng = random.Random(seed)
+    aliases = list(taxonomy.alias_to_canonical.keys())
+    filler = _vocab(rng, 500)
+    out: List[str] = []
+    for _ in range(n):
+        parts = [rng.choice(filler) for _ in range(words)]
+        for _ in range(3):
+            parts.insert(rng.randrange(len(parts) + 1), rng.choice(aliases))
+        out.append(" ".join(parts))
+    return out
+
+
+def run(sizes: List[int], n_sentences: int) -> None:
+    print(f"{'aliases':>9} {'nodes':>9} {'naive ms':>10} {'matcher ms':>11} {'speedup':>8}")
+    for n in sizes:
+        taxonomy = synthetic_taxonomy(n)
+        sentences = synthetic_sentences(taxonomy, n_sentences)
+
+        t0 = time.perf_counter()
+        naive = [_naive_extract(taxonomy.alias_to_canonical, s) for s in sentences]
+        t_naive = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        fast = [taxonomy.extract_skills(s) for s in sentences]
+        t_fast = time.perf_counter() - t0
+
+        if naive != fast:
+            raise AssertionError(f"matcher results differ from naive scan at {n} aliases")
+
+        speedup = t_naive / t_fast if t_fast > 0 else float("inf")
+        print(
+            f"{len(taxonomy.alias_to_canonical):>9} {taxonomy.matcher.size:>9} "
+            f"{1000 * t_naive:>10.1f} {1000 * t_fast:>11.1f} {speedup:>7.1f}x"
+        )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Compare SkillMatcher against the naive alias scan.")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 50000])
+    ap.add_argument("--sentences", type=int, default=200)
+    args = ap.parse_args()
+    run(args.sizes, args.sentences)
+
+
+if __name__ == "__main__":
+    main()
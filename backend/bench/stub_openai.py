@@ -0,0 +1,294 @@
+"""
+Local stand-in for the OpenAI chat-completions and embeddings endpoints.
+
+Replies are schema-valid for the classify, generate and edit agents and are
+delayed by a configurable latency, so pooling and concurrency can be tested
+offline. Chat requests with "stream": true get server-sent chunks: the first
+after ttft_ms, the rest spread over the remaining latency.
+
+    python -m bench.stub_openai --port 8100 --latency-ms 300 --jitter-ms 100
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=stub uvicorn api:app
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _approx_tokens(text: str) -> int:
+    return len(text or "") // 4 + 1
+
+
+def fake_usage(messages: List[Dict[str, Any]], content: str) -> Dict[str, int]:
+    prompt_tokens = sum(_approx_tokens(str(m.get("content", ""))) for m in messages)
+    completion_tokens = _approx_tokens(content)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def _evidence_ids(payload: Dict[str, Any]) -> List[Tuple[str, List[str]]]:
+    out: List[Tuple[str, List[str]]] = []
+    for req, item in (payload.get("evidence") or {}).items():
+        if isinstance(item, dict):
+            out.append((req, [str(i) for i in item.get("chunk_ids") or [] if i]))
+    for req, item in (payload.get("evidence_map") or {}).items():
+        if not isinstance(item, dict):
+            continue
+        ids = [c.get("chunk_id") if isinstance(c, dict) else c for c in item.get("chunks") or []]
+        out.append((req, [str(i) for i in ids if i]))
+    return out
+
+
+def fake_chat_content(messages: List[Dict[str, Any]]) -> str:
+    """JSON reply for whichever agent sent the messages (classify, generate or edit)."""
+    try:
+        payload = json.loads(messages[-1].get("content") or "{}")
+    except (ValueError, AttributeError, IndexError):
+        payload = {}
+    if not isinstance(payload, dict):
+        payload = {}
+
+    if "bullets" in payload:
+        edited = []
+        for b in payload.get("bullets") or []:
+            if isinstance(b, dict):
+                words = str(b.get("text", "")).split()
+                edited.append({"id": b.get("id"), "text": " ".join(words[:20])})
+        return json.dumps({"bullets": edited}, ensure_ascii=False)
+
+    if "job_description" in payload:
+        skills = payload.get("candidate_skill_lists") or {}
+        return json.dumps(
+            {
+                "must_have_skills": skills.get("must_have_skills", []),
+                "nice_to_have_skills": skills.get("nice_to_have_skills", []),
+                "responsibilities": [],
+                "keywords": skills.get("keywords", []),
+            }
+        )
+
+    bullets = []
+    cover_ids: List[str] = []
+    for req, ids in _evidence_ids(payload):
+        if not ids:
+            continue
+        bullets.append(
+            {"text": f"Applied {req} in production work.", "evidence_chunks": ids[:1], "skills_used": [req]}
+        )
+        cover_ids.extend(ids[:1])
+    return json.dumps(
+        {
+            "resume_bullets": bullets[:6],
+            "cover_letter": {
+                "text": "I would like to apply for this role.",
+                "evidence_chunks": sorted(set(cover_ids)),
+            },
+            "warnings": [],
+        }
+    )
+
+
+def fake_embedding(text: str, dim: int) -> List[float]:
+    raw = b""
+    counter = 0
+    while len(raw) < dim:
+        raw += hashlib.sha256(f"{counter}:{text}".encode("utf-8")).digest()
+        counter += 1
+    return [(b - 127.5) / 127.5 for b in raw[:dim]]
+
+
+class StubConfig:
+    def __init__(
+        self,
+        latency_ms: float,
+        jitter_ms: float,
+        embed_latency_ms: float,
+        dim: int,
+        seed: int,
+        ttft_ms: Optional[float] = None,
+        stream_chunk_chars: int = 16,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.embed_latency_ms = embed_latency_ms
+        self.dim = dim
+        self.ttft_ms = latency_ms / 5 if ttft_ms is None else ttft_ms
+        self.stream_chunk_chars = max(1, int(stream_chunk_chars))
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self, base_ms: float) -> None:
+        with self._lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        time.sleep(max(0.0, base_ms + jitter) / 1000.0)
+
+
+def make_handler(cfg: StubConfig):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt: str, *args: Any) -> None:
+            pass
+
+        def _send(self, status: int, body: Dict[str, Any]) -> None:
+            raw = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def _read_json(self) -> Dict[str, Any]:
+            n = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(n) or b"{}")
+
+        def do_POST(self) -> None:
+            path = self.path.rstrip("/")
+            try:
+                body = self._read_json()
+            except ValueError:
+                self._send(400, {"error": {"message": "invalid JSON body"}})
+                return
+
+            if path.endswith("/chat/completions") and body.get("stream"):
+                self._stream_chat(body)
+            elif path.endswith("/chat/completions"):
+                self._send(200, self._chat(body))
+            elif path.endswith("/embeddings"):
+                self._send(200, self._embeddings(body))
+            else:
+                self._send(404, {"error": {"message": f"unknown path {self.path}"}})
+
+        def _chat(self, body: Dict[str, Any]) -> Dict[str, Any]:
+            messages = body.get("messages") or []
+            content = fake_chat_content(messages)
+            cfg.delay(cfg.latency_ms)
+            return {
+                "id": f"chatcmpl-stub-{int(time.time() * 1000)}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [
+                    {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+                ],
+                "usage": fake_usage(messages, content),
+            }
+
+        def _write_chunk(self, data: bytes) -> None:
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+
+        def _stream_chat(self, body: Dict[str, Any]) -> None:
+            content = fake_chat_content(body.get("messages") or [])
+            n = cfg.stream_chunk_chars
+            pieces = [content[i : i + n] for i in range(0, len(content), n)] or [""]
+            gap_ms = max(0.0, cfg.latency_ms - cfg.ttft_ms) / len(pieces)
+            base = {
+                "id": f"chatcmpl-stub-{int(time.time() * 1000)}",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+            }
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            cfg.delay(cfg.ttft_ms)
+            for i, piece in enumerate(pieces):
+                if i:
+                    time.sleep(gap_ms / 1000.0)
+                delta = {"role": "assistant", "content": piece} if i == 0 else {"content": piece}
+                event = {**base, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+                self._write_chunk(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            done = {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+            self._write_chunk(f"data: {json.dumps(done)}\n\n".encode("utf-8"))
+            if (body.get("stream_options") or {}).get("include_usage"):
+                usage = {**base, "choices": [], "usage": fake_usage(body.get("messages") or [], content)}
+                self._write_chunk(f"data: {json.dumps(usage)}\n\n".encode("utf-8"))
+            self._write_chunk(b"data: [DONE]\n\n")
+            self._write_chunk(b"")
+
+        def _embeddings(self, body: Dict[str, Any]) -> Dict[str, Any]:
+            inputs = body.get("input") or []
+            if isinstance(inputs, str):
+                inputs = [inputs]
+            cfg.delay(cfg.embed_latency_ms)
+            tokens = sum(_approx_tokens(str(t)) for t in inputs)
+            return {
+                "object": "list",
+                "data": [
+                    {"object": "embedding", "index": i, "embedding": fake_embedding(str(t), cfg.dim)}
+                    for i, t in enumerate(inputs)
+                ],
+                "model": body.get("model", "stub"),
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+            }
+
+    return Handler
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8100,
+    latency_ms: float = 200.0,
+    jitter_ms: float = 0.0,
+    embed_latency_ms: Optional[float] = None,
+    dim: int = 256,
+    seed: int = 0,
+    ttft_ms: Optional[float] = None,
+    stream_chunk_chars: int = 16,
+) -> ThreadingHTTPServer:
+    """Starts the stub on a daemon thread and returns the server (call shutdown() to stop)."""
+    if embed_latency_ms is None:
+        embed_latency_ms = latency_ms / 4
+    cfg = StubConfig(latency_ms, jitter_ms, embed_latency_ms, dim, seed, ttft_ms, stream_chunk_chars)
+    server = ThreadingHTTPServer((host, port), make_handler(cfg))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="stub-openai", daemon=True).start()
+    return server
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Local stand-in for the OpenAI chat-completions and embeddings API.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8100)
+    ap.add_argument("--latency-ms", type=float, default=200.0)
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--embed-latency-ms", type=float, default=None)
+    ap.add_argument("--dim", type=int, default=256)
+    ap.add_argument("--ttft-ms", type=float, default=None, help="time to first streamed chunk (default latency/5)")
+    ap.add_argument("--stream-chunk-chars", type=int, default=16)
+    args = ap.parse_args()
+
+    server = serve(
+        args.host,
+        args.port,
+        args.latency_ms,
+        args.jitter_ms,
+        args.embed_latency_ms,
+        args.dim,
+        ttft_ms=args.ttft_ms,
+        stream_chunk_chars=args.stream_chunk_chars,
+    )
+    print(f"stub OpenAI API on http://{args.host}:{server.server_address[1]}/v1 (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
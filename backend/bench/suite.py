@@ -0,0 +1,318 @@
+"""
+Times the core pipeline stages on synthetic profile/JD pairs and compares the
+result with a stored baseline.
+
+Each stage runs in isolation on prebuilt inputs (chunk_profile, tokenize,
+extract_skills, TF-IDF/BM25/embedding index build and query, rank_requirement,
+evidence build, validate_generation). run_pipeline is also timed end to end
+with an in-process fake LLM, so the numbers do not depend on the network.
+Embedding vectors are precomputed, so the embed stages time only the index.
+
+    python -m bench.suite --sizes small medium --out outputs/bench/latest.json
+    python -m bench.suite --baseline bench/baseline.json --save-baseline   # record
+    python -m bench.suite --baseline bench/baseline.json                   # compare
+
+A stage regresses when its median is more than --threshold slower than in
+the baseline and by at least --min-delta-ms. Timings depend on the machine,
+so record the baseline where the comparison runs. The exit code is 1 if
+anything regressed.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, replace
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from bench.corpus import Corpus, CorpusSpec, build_corpus
+from bench.fake_llm import FakeOpenAI
+from bench.stub_openai import fake_embedding
+from config import AppConfig
+from core.chunking import chunk_profile
+from core.evidence import EvidenceMapBuilder
+from core.preprocess import tokenize
+from core.ranker import HybridRanker
+from core.retrieval_bm25 import BM25Index
+from core.retrieval_embed import EmbedIndex
+from core.retrieval_tfidf import TfidfIndex
+from core.validators import validate_generation
+from orchestrator import run_pipeline
+from resources import get_stopwords, use_openai_clients
+
+SIZES: Dict[str, CorpusSpec] = {
+    "small": CorpusSpec(sections=3, chunks_per_section=2, requirements=8),
+    "medium": CorpusSpec(sections=5, chunks_per_section=6, requirements=24, taxonomy_size=500),
+    "large": CorpusSpec(sections=5, chunks_per_section=20, requirements=60, taxonomy_size=5000),
+}
+
+EMBED_DIM = 256
+
+
+def measure(fn: Callable[[], Any], repeat: int, warmup: int = 1) -> Dict[str, Any]:
+    for _ in range(warmup):
+        fn()
+    samples: List[float] = []
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(1000.0 * (time.perf_counter() - t0))
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "min_ms": round(min(samples), 4),
+        "max_ms": round(max(samples), 4),
+        "runs": len(samples),
+    }
+
+
+def _vector_lookup(texts: List[str]) -> Callable[[List[str]], np.ndarray]:
+    vecs = {t: fake_embedding(t, EMBED_DIM) for t in texts}
+    return lambda batch: np.array([vecs[t] for t in batch], dtype=np.float32)
+
+
+def _hits(hits: List[Any]) -> List[tuple]:
+    return [(h.chunk_id, float(h.score)) for h in hits]
+
+
+def stage_timings(corpus: Corpus, cfg: AppConfig, repeat: int) -> Dict[str, Dict[str, Any]]:
+    stopwords = get_stopwords(cfg.stopwords_path)
+    taxonomy = corpus.taxonomy
+    reqs = corpus.requirements
+    top_k = cfg.top_k_retrieval
+
+    def chunk() -> Any:
+        return chunk_profile(corpus.profile_text, stopwords, cfg.chunk_chars, cfg.overlap_chars)
+
+    chunks = chunk()
+    texts = [c.text for c in chunks] + [corpus.jd_text]
+    embed_fn = _vector_lookup(EmbedIndex.chunk_texts(chunks) + [q for _, q in EmbedIndex.prepare_queries(reqs)])
+
+    tfidf = TfidfIndex.build(chunks)
+    bm25 = BM25Index.build(chunks)
+    embed = EmbedIndex.build(chunks, embed_fn=embed_fn, normalize=True)
+    tfidf_all = tfidf.query_many(reqs, top_k=top_k)
+    bm25_all = bm25.query_many(reqs, top_k=top_k)
+    embed_all = embed.query_many(reqs, embed_fn=embed_fn, top_k=top_k)
+
+    ranker = HybridRanker(
+        w_bm25=cfg.w_bm25,
+        w_tfidf=cfg.w_tfidf,
+        w_embed=cfg.w_embed,
+        match_threshold=cfg.match_threshold,
+        top_k_chunks=cfg.top_k_chunks,
+        score_weight_must=cfg.score_weight_must,
+    )
+    hits = [(r, _hits(t), _hits(b), _hits(e)) for r, t, b, e in zip(reqs, tfidf_all, bm25_all, embed_all)]
+
+    def rank() -> Any:
+        return [ranker.rank_requirement(*h) for h in hits]
+
+    matches = rank()
+    builder = EvidenceMapBuilder(taxonomy)
+    evidence_map = {
+        req: {"matched": item.matched, "score": item.score, "chunks": item.chunks}
+        for req, item in builder.build(matches, chunks).items()
+    }
+    bullets = [
+        {
+            "text": f"Applied {req} in production work.",
+            "evidence_chunks": [item["chunks"][0]["chunk_id"]],
+            "skills_used": [req],
+        }
+        for req, item in evidence_map.items()
+        if item["chunks"]
+    ]
+    cover_ids = bullets[0]["evidence_chunks"] if bullets else []
+    generation = {
+        "resume_bullets": bullets,
+        "cover_letter": {"text": "I would like to apply.", "evidence_chunks": cover_ids},
+        "warnings": [],
+    }
+
+    stages: Dict[str, Callable[[], Any]] = {
+        "chunk_profile": chunk,
+        "tokenize": lambda: tokenize(corpus.profile_text, stopwords=stopwords),
+        "extract_skills": lambda: [taxonomy.extract_skills(t) for t in texts],
+        "tfidf_build": lambda: TfidfIndex.build(chunks),
+        "tfidf_query": lambda: tfidf.query_many(reqs, top_k=top_k),
+        "bm25_build": lambda: BM25Index.build(chunks),
+        "bm25_query": lambda: bm25.query_many(reqs, top_k=top_k),
+        "embed_build": lambda: EmbedIndex.build(chunks, embed_fn=embed_fn, normalize=True),
+        "embed_query": lambda: embed.query_many(reqs, embed_fn=embed_fn, top_k=top_k),
+        "rank_requirement": rank,
+        "evidence_build": lambda: builder.build(matches, chunks),
+        "validate_generation": lambda: validate_generation(generation, evidence_map, taxonomy, cfg.max_bullet_words),
+    }
+    out = {name: measure(fn, repeat) for name, fn in stages.items()}
+    out["_inputs"] = {"chunks": len(chunks), "bullets": len(bullets)}
+    return out
+
+
+def end_to_end(corpus: Corpus, cfg: AppConfig, repeat: int, client: FakeOpenAI) -> Dict[str, Any]:
+    """run_pipeline with every cache off, so each run does the full work."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "skills.yaml")
+        corpus.write_skills_yaml(path)
+        run_cfg = replace(
+            cfg,
+            skills_yaml_path=path,
+            skills_snapshot_path="",
+            use_index_cache=False,
+            use_embed_store=False,
+            bypass_llm_cache=True,
+            export_outputs=False,
+        )
+        before = dict(client.calls)
+        result = measure(lambda: run_pipeline(corpus.jd_text, corpus.profile_text, run_cfg), repeat)
+    runs = result["runs"] + 1
+    result["llm_calls_per_run"] = {k: round((client.calls[k] - before[k]) / runs, 2) for k in client.calls}
+    return result
+
+
+def run_suite(
+    specs: Dict[str, CorpusSpec],
+    repeat: int,
+    e2e_repeat: int,
+    cfg: Optional[AppConfig] = None,
+) -> Dict[str, Any]:
+    cfg = cfg or AppConfig()
+    client = FakeOpenAI(dim=EMBED_DIM)
+    use_openai_clients(client)
+
+    cases: Dict[str, Any] = {}
+    for name, spec in specs.items():
+        corpus = build_corpus(spec, cfg)
+        stages = stage_timings(corpus, cfg, repeat)
+        inputs = stages.pop("_inputs")
+        if e2e_repeat > 0:
+            stages["run_pipeline"] = end_to_end(corpus, cfg, e2e_repeat, client)
+        cases[name] = {"spec": asdict(spec), "corpus": {**corpus.stats(), **inputs}, "stages": stages}
+
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "e2e_repeat": e2e_repeat,
+            "e2e_flags": {
+                "use_embeddings": cfg.use_embeddings,
+                "use_llm_jd_classifier": cfg.use_llm_jd_classifier,
+                "use_llm_editor": cfg.use_llm_editor,
+            },
+        },
+        "cases": cases,
+    }
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = 0.25,
+    min_delta_ms: float = 0.5,
+) -> List[Dict[str, Any]]:
+    """Stages whose median got slower than the baseline by more than threshold (and min_delta_ms)."""
+    regressions: List[Dict[str, Any]] = []
+    for case, res in current.get("cases", {}).items():
+        base = baseline.get("cases", {}).get(case)
+        # a different corpus is a different benchmark, not a regression
+        if not base or base.get("spec") != res.get("spec"):
+            continue
+        for stage, m in res["stages"].items():
+            b = base["stages"].get(stage)
+            if not b:
+                continue
+            cur_ms, base_ms = m["median_ms"], b["median_ms"]
+            if cur_ms - base_ms >= min_delta_ms and cur_ms > base_ms * (1.0 + threshold):
+                regressions.append(
+                    {
+                        "case": case,
+                        "stage": stage,
+                        "baseline_ms": base_ms,
+                        "current_ms": cur_ms,
+                        "ratio": round(cur_ms / base_ms, 3) if base_ms else None,
+                    }
+                )
+    return regressions
+
+
+def _write_json(path: str, data: Dict[str, Any]) -> None:
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def _print_table(results: Dict[str, Any]) -> None:
+    for case, res in results["cases"].items():
+        c = res["corpus"]
+        print(f"[{case}] chunks={c['chunks']} requirements={c['requirements']} aliases={c['aliases']}")
+        for stage, m in res["stages"].items():
+            print(f"  {stage:<20} {m['median_ms']:>10.3f} ms  (min {m['min_ms']:.3f})")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Time the core pipeline stages on synthetic data.")
+    ap.add_argument("--sizes", nargs="+", default=["small", "medium"], choices=sorted(SIZES))
+    ap.add_argument("--sections", type=int, default=None, help="custom case; unset fields use CorpusSpec defaults")
+    ap.add_argument("--chunks-per-section", type=int, default=None)
+    ap.add_argument("--requirements", type=int, default=None)
+    ap.add_argument("--taxonomy-size", type=int, default=None)
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--e2e-repeat", type=int, default=5, help="0 skips run_pipeline")
+    ap.add_argument("--embeddings", action="store_true", help="use embeddings in the end-to-end runs")
+    ap.add_argument("--out", default="outputs/bench/latest.json")
+    ap.add_argument("--baseline", default="bench/baseline.json")
+    ap.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    ap.add_argument("--threshold", type=float, default=0.25)
+    ap.add_argument("--min-delta-ms", type=float, default=0.5)
+    args = ap.parse_args()
+
+    specs = {name: SIZES[name] for name in args.sizes}
+    custom = {
+        "sections": args.sections,
+        "chunks_per_section": args.chunks_per_section,
+        "requirements": args.requirements,
+        "taxonomy_size": args.taxonomy_size,
+        "seed": args.seed,
+    }
+    if any(v is not None for v in custom.values()):
+        specs["custom"] = replace(CorpusSpec(), **{k: v for k, v in custom.items() if v is not None})
+
+    cfg = AppConfig(use_embeddings=args.embeddings, use_llm_jd_classifier=True, use_llm_editor=True)
+    results = run_suite(specs, args.repeat, args.e2e_repeat, cfg)
+    _print_table(results)
+    _write_json(args.out, results)
+    print(f"results: {args.out}")
+
+    if args.save_baseline:
+        _write_json(args.baseline, results)
+        print(f"baseline saved: {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --save-baseline to record one")
+        return
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+    for r in regressions:
+        print(
+            f"REGRESSION [{r['case']}] {r['stage']}: "
+            f"{r['baseline_ms']:.3f} -> {r['current_ms']:.3f} ms (x{r['ratio']})"
+        )
+    if regressions:
+        sys.exit(1)
+    print("no regressions")
+
+
+if __name__ == "__main__":
+    main()
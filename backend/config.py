@@ -6,19 +6,71 @@ from dataclasses import dataclass
 @dataclass(frozen=True)
 class AppConfig:
     skills_yaml_path: str = "data/skills.yaml"
+    skills_snapshot_path: str = "outputs/cache/skills.taxonomy.pkl"
     stopwords_path: str = "data/stopwords.txt"
     fewshot_path: str = "data/fewshot_examples.json"
 
-    outputs_dir: str = "outputs"
-    exports_dir: str = "outputs/exports"
-    last_run_path: str = "outputs/last_run.json"
-    package_zip_path: str = "outputs/exports/package.zip"
+    runs_dir: str = "outputs/runs"
+    run_store_max_runs: int = 256
+    export_outputs: bool = False
 
     use_tfidf: bool = True
     use_bm25: bool = True
     use_embeddings: bool = False
     use_llm_jd_classifier: bool = False
     use_llm_editor: bool = False
+    collect_timings: bool = False
+    collect_metrics: bool = True
+    stage_workers: int = 4
+    stage_pool_workers: int = 32
+    batch_max_concurrency: int = 4
+
+    admission_max_in_flight: int = 8
+    admission_max_queue: int = 32
+    admission_queue_timeout_s: float = 10.0
+
+    jobs_db_path: str = "outputs/jobs.sqlite3"
+    job_workers: int = 0
+    job_visibility_timeout_s: float = 300.0
+    job_max_attempts: int = 3
+    job_result_ttl_hours: float = 24.0
+    job_poll_interval_s: float = 0.5
+
+    openai_base_url: str = ""
+    http_max_connections: int = 64
+    http_max_keepalive_connections: int = 32
+    http_keepalive_expiry_s: float = 30.0
+    http_connect_timeout_s: float = 5.0
+    http_read_timeout_s: float = 60.0
+    http_pool_timeout_s: float = 10.0
+    llm_max_retries: int = 2
+
+    use_index_cache: bool = True
+    index_cache_dir: str = "outputs/cache/indexes"
+    index_cache_memory_items: int = 64
+    index_cache_max_disk_mb: int = 512
+
+    embed_backend: str = "openai"  # "openai" or "local"
+    local_embed_dim: int = 128
+    local_embed_corpus_path: str = ""
+
+    use_embed_store: bool = True
+    embed_store_dir: str = "outputs/cache/embeddings"
+    embed_batch_size: int = 256
+    use_embed_batcher: bool = True
+    embed_batch_window_ms: float = 5.0
+    embed_batch_max_tokens: int = 50000
+
+    bypass_llm_cache: bool = False
+    llm_cache_dir: str = "outputs/cache/llm"
+    llm_cache_memory_items: int = 256
+    llm_cache_max_disk_mb: int = 256
+    llm_cache_ttl_hours: float = 168.0
+    llm_payload_token_budget: int = 6000
+    payload_profile_coverage: float = 0.9
+
+    profile_index_dir: str = "outputs/profile_index"
+    recruiter_top_n: int = 20
 
     chunk_chars: int = 430
     overlap_chars: int = 60
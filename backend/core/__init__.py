@@ -1,10 +1,21 @@
 from .preprocess import normalize_text, tokenize, join_tokens
 from .chunking import Chunk, chunk_profile
 from .skill_taxonomy import SkillTaxonomy, SkillEntry
+from .skill_matcher import SkillMatcher
 from .retrieval_tfidf import TfidfIndex, TfidfHit
 from .retrieval_bm25 import BM25Index, BM25Hit
 from .retrieval_embed import EmbedIndex, EmbedHit
 from .ranker import HybridRanker, RequirementMatch, MatchReport, ScoredChunk
 from .evidence import EvidenceItem, EvidenceMapBuilder
-from .validators import ValidationWarning, ValidationResult, validate_generation, enforce_grounding
-from .export import export_json, export_markdown, export_zip
+from .validators import ValidationWarning, ValidationResult, validate_generation, enforce_grounding, validate_bullet, validate_cover_letter, ground_bullet
+from .export import export_json, export_markdown, export_zip, markdown_documents, zip_bytes
+from .timing import StageTimer, StageTiming
+from .scheduler import Stage, StageGraph, StageScheduler
+from .index_cache import ProfileIndexCache, profile_cache_key
+from .llm_cache import LLMResponseCache, llm_cache_key
+from .embed_store import EmbeddingStore, embed_text_key
+from .embed_batcher import AsyncEmbedBatcher, EmbedBatcher
+from .embed_local import LocalEmbedder, background_corpus
+from .payload import PayloadLimits, PayloadStats, count_tokens
+from .artifacts import RunArtifactStore, new_run_id
+from .metrics import METRICS, MetricsRegistry, Counter, Histogram
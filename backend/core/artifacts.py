@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .export import markdown_documents, zip_bytes
+
+_RUN_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def new_run_id() -> str:
+    return uuid.uuid4().hex
+
+
+def valid_run_id(run_id: str) -> bool:
+    return bool(_RUN_ID.match(run_id or ""))
+
+
+def run_files(final_output: Dict[str, Any]) -> Dict[str, bytes]:
+    """The files of a run package: run.json plus the markdown documents."""
+    files = {"run.json": json.dumps(final_output, ensure_ascii=False, indent=2).encode("utf-8")}
+    for name, text in markdown_documents(final_output).items():
+        files[name] = text.encode("utf-8")
+    return files
+
+
+class RunArtifactStore:
+    """
+    Per-run results keyed by run ID.
+
+    Each finished run is kept in memory (the most recent max_runs); nothing
+    is rendered until it is asked for. package() builds the ZIP in memory on
+    first request. export() writes a run's files under root_dir/<run_id>/,
+    which is also where get() looks for runs that are no longer in memory
+    (or were produced by another worker process).
+    """
+
+    def __init__(self, root_dir: Optional[str], max_runs: int = 256):
+        self.root_dir = root_dir
+        self.max_runs = max(1, int(max_runs))
+        self._runs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._packages: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"runs": 0, "packages_built": 0, "exports": 0, "disk_loads": 0}
+
+    def _dir(self, run_id: str) -> Optional[str]:
+        if not self.root_dir or not valid_run_id(run_id):
+            return None
+        return os.path.join(self.root_dir, run_id)
+
+    @staticmethod
+    def _bounded_put(items: "OrderedDict[str, Any]", key: str, value: Any, limit: int) -> None:
+        items[key] = value
+        items.move_to_end(key)
+        while len(items) > limit:
+            items.popitem(last=False)
+
+    def put(self, run_id: str, final_output: Dict[str, Any]) -> None:
+        with self._lock:
+            self._bounded_put(self._runs, run_id, final_output, self.max_runs)
+            self.stats["runs"] += 1
+
+    def get(self, run_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            out = self._runs.get(run_id)
+            if out is not None:
+                self._runs.move_to_end(run_id)
+                return out
+
+        d = self._dir(run_id)
+        path = os.path.join(d, "run.json") if d else ""
+        if not path or not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            out = json.load(f)
+        with self._lock:
+            self._bounded_put(self._runs, run_id, out, self.max_runs)
+            self.stats["disk_loads"] += 1
+        return out
+
+    def package(self, run_id: str) -> Optional[bytes]:
+        """The run's ZIP package, built in memory on first request."""
+        with self._lock:
+            data = self._packages.get(run_id)
+        if data is not None:
+            return data
+
+        d = self._dir(run_id)
+        path = os.path.join(d, "package.zip") if d else ""
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                data = f.read()
+        else:
+            out = self.get(run_id)
+            if out is None:
+                return None
+            data = zip_bytes(run_files(out))
+            with self._lock:
+                self.stats["packages_built"] += 1
+
+        with self._lock:
+            # packages are small but not free; keep fewer of them than runs
+            self._bounded_put(self._packages, run_id, data, max(1, self.max_runs // 8))
+        return data
+
+    def export(self, run_id: str) -> Optional[str]:
+        """Writes run.json, the markdown files and package.zip to the run's own directory."""
+        d = self._dir(run_id)
+        out = self.get(run_id)
+        if d is None or out is None:
+            return None
+        files = run_files(out)
+        files["package.zip"] = zip_bytes(files)
+        os.makedirs(d, exist_ok=True)
+        for name, content in files.items():
+            tmp = os.path.join(d, f".{name}.tmp")
+            with open(tmp, "wb") as f:
+                f.write(content)
+            os.replace(tmp, os.path.join(d, name))
+        with self._lock:
+            self._bounded_put(self._packages, run_id, files["package.zip"], max(1, self.max_runs // 8))
+            self.stats["exports"] += 1
+        return d
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+import numpy as np
+
+
+def approx_tokens(text: str) -> int:
+    """Cheap upper-ish estimate (about 4 chars per token) used only for batch sizing."""
+    return len(text or "") // 4 + 1
+
+
+@dataclass
+class _Request:
+    texts: List[str]
+    future: Any  # concurrent.futures.Future, or asyncio.Future for AsyncEmbedBatcher
+    parts: Dict[int, np.ndarray] = field(default_factory=dict)
+    pending: int = 0
+
+
+@dataclass(frozen=True)
+class _Piece:
+    request: _Request
+    start: int
+    end: int
+    tokens: int
+
+
+class _Packer:
+    """Splits requests into pieces and packs queued pieces into upstream batches."""
+
+    def __init__(self, window_ms: float, max_batch: int, max_tokens: int):
+        self.window_s = max(0.0, float(window_ms)) / 1000.0
+        self.max_batch = max(1, int(max_batch))
+        self.max_tokens = max(1, int(max_tokens))
+        self.stats: Dict[str, int] = {"requests": 0, "texts": 0, "upstream_calls": 0, "errors": 0}
+
+    def _pieces(self, req: _Request) -> List[_Piece]:
+        pieces: List[_Piece] = []
+        start, tokens = 0, 0
+        for i, t in enumerate(req.texts):
+            n = approx_tokens(t)
+            if i > start and (i - start >= self.max_batch or tokens + n > self.max_tokens):
+                pieces.append(_Piece(req, start, i, tokens))
+                start, tokens = i, 0
+            tokens += n
+        pieces.append(_Piece(req, start, len(req.texts), tokens))
+        req.pending = len(pieces)
+        return pieces
+
+    def _take_batch(self, queue: Deque[_Piece]) -> List[_Piece]:
+        batch: List[_Piece] = []
+        items, tokens = 0, 0
+        while queue:
+            piece = queue[0]
+            size = piece.end - piece.start
+            if batch and (items + size > self.max_batch or tokens + piece.tokens > self.max_tokens):
+                break
+            batch.append(queue.popleft())
+            items += size
+            tokens += piece.tokens
+        return batch
+
+
+class EmbedBatcher(_Packer):
+    """
+    Process-wide micro-batcher in front of a synchronous embed_fn.
+
+    Callers from any thread (or event loop, via embed_async) enqueue their
+    texts. A dispatcher thread waits up to window_ms after the first pending
+    request, packs queued texts into upstream calls of at most max_batch items
+    and max_tokens estimated tokens, and hands each caller back its own rows.
+    Up to max_inflight upstream calls run at once.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], np.ndarray],
+        window_ms: float = 5.0,
+        max_batch: int = 256,
+        max_tokens: int = 50_000,
+        max_inflight: int = 4,
+    ):
+        super().__init__(window_ms, max_batch, max_tokens)
+        self.embed_fn = embed_fn
+        self._queue: Deque[_Piece] = deque()
+        self._cond = threading.Condition()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, int(max_inflight)), thread_name_prefix="embed-batch")
+        self._thread = threading.Thread(target=self._dispatch_loop, name="embed-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts: List[str]) -> Future:
+        fut: Future = Future()
+        texts = list(texts)
+        if not texts:
+            fut.set_result(np.zeros((0, 0), dtype=np.float32))
+            return fut
+
+        req = _Request(texts=texts, future=fut)
+        pieces = self._pieces(req)
+        with self._cond:
+            self._queue.extend(pieces)
+            self.stats["requests"] += 1
+            self.stats["texts"] += len(texts)
+            self._cond.notify()
+        return fut
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return self.submit(texts).result()
+
+    async def embed_async(self, texts: List[str]) -> np.ndarray:
+        return await asyncio.wrap_future(self.submit(texts))
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                deadline = time.monotonic() + self.window_s
+                while True:
+                    remaining = deadline - time.monotonic()
+                    queued = sum(p.end - p.start for p in self._queue)
+                    if remaining <= 0 or queued >= self.max_batch:
+                        break
+                    self._cond.wait(remaining)
+                batches: List[List[_Piece]] = []
+                while self._queue:
+                    batches.append(self._take_batch(self._queue))
+            for batch in batches:
+                self._pool.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch: List[_Piece]) -> None:
+        texts = [t for p in batch for t in p.request.texts[p.start : p.end]]
+        try:
+            vecs = np.asarray(self.embed_fn(texts), dtype=np.float32)
+            if vecs.shape[0] != len(texts):
+                raise ValueError(f"embed_fn returned {vecs.shape[0]} vectors for {len(texts)} texts")
+        except BaseException as e:
+            with self._cond:
+                self.stats["upstream_calls"] += 1
+                self.stats["errors"] += 1
+                for p in batch:
+                    if not p.request.future.done():
+                        p.request.future.set_exception(e)
+            return
+
+        with self._cond:
+            self.stats["upstream_calls"] += 1
+
+        offset = 0
+        for p in batch:
+            n = p.end - p.start
+            self._deliver(p, vecs[offset : offset + n])
+            offset += n
+
+    def _deliver(self, piece: _Piece, vecs: np.ndarray) -> None:
+        req = piece.request
+        with self._cond:
+            req.parts[piece.start] = vecs
+            req.pending -= 1
+            if req.pending == 0 and not req.future.done():
+                req.future.set_result(np.vstack([req.parts[k] for k in sorted(req.parts)]))
+
+
+
+class _LoopState:
+    def __init__(self, max_inflight: int) -> None:
+        self.queue: Deque[_Piece] = deque()
+        self.queued = 0
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.slots = asyncio.Semaphore(max_inflight)
+        self.tasks: Set[asyncio.Task] = set()
+
+
+class AsyncEmbedBatcher(_Packer):
+    """
+    EmbedBatcher for a coroutine embed_fn (e.g. on AsyncOpenAI), run on the
+    caller's event loop instead of a dispatcher thread. Batching works the
+    same way; each event loop gets its own queue, since requests and upstream
+    calls cannot cross loops.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], Awaitable[np.ndarray]],
+        window_ms: float = 5.0,
+        max_batch: int = 256,
+        max_tokens: int = 50_000,
+        max_inflight: int = 4,
+    ):
+        super().__init__(window_ms, max_batch, max_tokens)
+        self.embed_fn = embed_fn
+        self.max_inflight = max(1, int(max_inflight))
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+
+    async def embed_async(self, texts: List[str]) -> np.ndarray:
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            state = self._loops[loop] = _LoopState(self.max_inflight)
+        req = _Request(texts=texts, future=loop.create_future())
+        state.queue.extend(self._pieces(req))
+        state.queued += len(texts)
+        self.stats["requests"] += 1
+        self.stats["texts"] += len(texts)
+
+        if state.queued >= self.max_batch:
+            self._flush(state)
+        elif state.timer is None:
+            state.timer = loop.call_later(self.window_s, self._flush, state)
+        return await req.future
+
+    def _flush(self, state: _LoopState) -> None:
+        if state.timer is not None:
+            state.timer.cancel()
+            state.timer = None
+        while state.queue:
+            batch = self._take_batch(state.queue)
+            state.queued -= sum(p.end - p.start for p in batch)
+            task = asyncio.ensure_future(self._run_batch(state, batch))
+            state.tasks.add(task)
+            task.add_done_callback(state.tasks.discard)
+
+    async def _run_batch(self, state: _LoopState, batch: List[_Piece]) -> None:
+        texts = [t for p in batch for t in p.request.texts[p.start : p.end]]
+        try:
+            async with state.slots:
+                vecs = np.asarray(await self.embed_fn(texts), dtype=np.float32)
+            if vecs.shape[0] != len(texts):
+                raise ValueError(f"embed_fn returned {vecs.shape[0]} vectors for {len(texts)} texts")
+        except asyncio.CancelledError:
+            for p in batch:
+                p.request.future.cancel()
+            raise
+        except Exception as e:
+            self.stats["upstream_calls"] += 1
+            self.stats["errors"] += 1
+            for p in batch:
+                if not p.request.future.done():
+                    p.request.future.set_exception(e)
+            return
+
+        self.stats["upstream_calls"] += 1
+        offset = 0
+        for p in batch:
+            n = p.end - p.start
+            req = p.request
+            req.parts[p.start] = vecs[offset : offset + n]
+            req.pending -= 1
+            offset += n
+            if req.pending == 0 and not req.future.done():
+                req.future.set_result(np.vstack([req.parts[k] for k in sorted(req.parts)]))
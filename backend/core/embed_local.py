@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from typing import Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+
+from .preprocess import normalize_text
+from .skill_taxonomy import SkillTaxonomy
+
+
+def background_corpus(
+    taxonomy: SkillTaxonomy,
+    fewshot: Any = None,
+    extra_path: Optional[str] = None,
+) -> List[str]:
+    """
+    Documents the LSA projection is fitted on: one per taxonomy entry (name,
+    aliases and related skills together), each alias on its own, few-shot
+    example texts, and optionally one document per non-empty line of extra_path.
+    """
+    docs: List[str] = []
+    for canon in sorted(taxonomy.entries):
+        entry = taxonomy.entries[canon]
+        docs.append(" ".join([canon, *sorted(entry.aliases), *sorted(entry.related)]))
+        docs.extend(sorted(entry.aliases))
+
+    for ex in fewshot if isinstance(fewshot, list) else []:
+        if isinstance(ex, dict) and ex.get("text"):
+            docs.append(str(ex["text"]))
+
+    if extra_path and os.path.exists(extra_path):
+        with open(extra_path, "r", encoding="utf-8") as f:
+            docs.extend(ln.strip() for ln in f if ln.strip())
+
+    return [normalize_text(d) for d in docs if d.strip()]
+
+
+class LocalEmbedder:
+    """
+    In-process dense embeddings: hashed character n-grams, tf-idf weighted,
+    projected with a TruncatedSVD (LSA) fitted on a background corpus.
+
+    Only hash buckets that occur in the corpus can carry weight after the
+    projection, so the fitted components are stored for those columns only.
+    A larger corpus (local_embed_corpus_path) gives a richer semantic space.
+    """
+
+    def __init__(
+        self,
+        hasher: HashingVectorizer,
+        columns: np.ndarray,
+        tfidf: TfidfTransformer,
+        components: np.ndarray,
+        name: str,
+    ):
+        self.hasher = hasher
+        self.columns = columns
+        self.tfidf = tfidf
+        self.components = components
+        self.name = name
+
+    @property
+    def dim(self) -> int:
+        return int(self.components.shape[1])
+
+    @classmethod
+    def fit(
+        cls,
+        corpus: Iterable[str],
+        n_components: int = 128,
+        ngram_range: Tuple[int, int] = (3, 5),
+        n_features: int = 2**20,
+        random_state: int = 0,
+    ) -> "LocalEmbedder":
+        docs = [d for d in corpus if d]
+        if len(docs) < 2:
+            raise ValueError("local embedder needs at least two background documents")
+
+        hasher = HashingVectorizer(
+            analyzer="char_wb",
+            ngram_range=ngram_range,
+            n_features=n_features,
+            alternate_sign=False,
+            norm=None,
+        )
+        counts = hasher.transform(docs).tocsr()
+        columns = np.unique(counts.indices).astype(np.int64)
+        x = counts[:, columns]
+
+        tfidf = TfidfTransformer(sublinear_tf=True).fit(x)
+        k = max(1, min(int(n_components), len(docs) - 1, len(columns) - 1))
+        svd = TruncatedSVD(n_components=k, random_state=random_state).fit(tfidf.transform(x))
+
+        digest = hashlib.sha256("\n".join(docs).encode("utf-8")).hexdigest()[:10]
+        name = f"local-lsa{k}-{ngram_range[0]}{ngram_range[1]}-{digest}"
+        return cls(hasher, columns, tfidf, svd.components_.T.astype(np.float32), name)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        x = self.hasher.transform(texts).tocsr()[:, self.columns]
+        vecs = np.asarray(self.tfidf.transform(x) @ self.components, dtype=np.float32)
+        denom = np.linalg.norm(vecs, axis=1, keepdims=True) + 1e-12
+        return vecs / denom
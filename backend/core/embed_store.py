@@ -0,0 +1,327 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import unicodedata
+import uuid
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+STORE_FORMAT_VERSION = 2
+KEY_BYTES = 16
+
+# one record per row, sorted by key, so lookups are a binary search on the mapped file
+_INDEX_DTYPE = np.dtype([("key", f"S{KEY_BYTES}"), ("row", "<u4")])
+_EMPTY_INDEX = np.zeros(0, dtype=_INDEX_DTYPE)
+
+log = logging.getLogger(__name__)
+
+
+def embed_text_key(text: str) -> bytes:
+    """Hash of the text after NFC and whitespace normalization (case is kept)."""
+    norm = " ".join(unicodedata.normalize("NFC", text or "").split())
+    return hashlib.blake2b(norm.encode("utf-8"), digest_size=KEY_BYTES).digest()
+
+
+def _search(index: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """Row of each key in index, or -1."""
+    rows = np.full(len(keys), -1, dtype=np.int64)
+    if len(index) == 0 or len(keys) == 0:
+        return rows
+    sorted_keys = index["key"]
+    pos = np.searchsorted(sorted_keys, keys)
+    inside = pos < len(index)
+    found = np.zeros(len(keys), dtype=bool)
+    found[inside] = sorted_keys[pos[inside]] == keys[inside]
+    rows[found] = index["row"][pos[found]]
+    return rows
+
+
+class EmbeddingStore:
+    """
+    Persistent embedding cache for one model.
+
+    Vectors live in an append-only float32 file (vectors.f32) and the key
+    index in index.bin, a key-sorted array of (16-byte text hash, row)
+    records. Readers map both with np.memmap and look keys up with a binary
+    search, so worker processes share the OS page cache for the index as
+    well as the vectors and build no per-process table.
+
+    Appends take an exclusive file lock, write and fsync the vectors, then
+    write the merged index to a temporary file and rename it into place.
+    The index only ever names rows that are on disk, and a writer that dies
+    mid-append leaves at most vector rows past the indexed ones, which the
+    next append cuts off.
+    """
+
+    def __init__(self, dir_path: str, model: str):
+        self.dir_path = dir_path
+        self.model = model
+        self.dim: Optional[int] = None
+        self._index: np.ndarray = _EMPTY_INDEX
+        self._vectors: Optional[np.memmap] = None
+        self._stamp: Optional[Tuple[int, int, int]] = None
+        self._dim_warned = False
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "upstream_calls": 0, "appended": 0}
+
+        os.makedirs(dir_path, exist_ok=True)
+        self._index_path = os.path.join(dir_path, "index.bin")
+        self._vectors_path = os.path.join(dir_path, "vectors.f32")
+        self._meta_path = os.path.join(dir_path, "meta.json")
+        self._lock_path = os.path.join(dir_path, ".lock")
+        self._read_meta()
+
+    def _read_meta(self) -> None:
+        if not os.path.exists(self._meta_path):
+            return
+        with open(self._meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("model") != self.model:
+            raise ValueError(f"embedding store at {self.dir_path} does not match model '{self.model}'")
+        if meta.get("version") != STORE_FORMAT_VERSION:
+            # an older layout; it is only a cache, so read it as empty and let the
+            # first append (which truncates vectors.f32 to the index) start over
+            return
+        self.dim = int(meta["dim"])
+
+    def _write_meta(self, dim: int) -> None:
+        with contextlib.suppress(OSError):
+            os.remove(os.path.join(self.dir_path, "keys.bin"))  # key list of format version 1
+        tmp = self._meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": STORE_FORMAT_VERSION, "model": self.model, "dim": dim}, f)
+        os.replace(tmp, self._meta_path)
+        self.dim = dim
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        with open(self._lock_path, "a") as fh:
+            if fcntl is not None:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _refresh(self) -> None:
+        """Maps the current index, if it was replaced since the last call by this or another process."""
+        try:
+            st = os.stat(self._index_path)
+        except OSError:
+            return
+        stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if stamp == self._stamp:
+            return
+        if self.dim is None:
+            self._read_meta()
+
+        n = st.st_size // _INDEX_DTYPE.itemsize
+        if n == 0 or self.dim is None:
+            self._index, self._vectors = _EMPTY_INDEX, None
+        else:
+            self._index = np.memmap(self._index_path, dtype=_INDEX_DTYPE, mode="r", shape=(n,))
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(n, self.dim))
+        self._stamp = stamp
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._index)
+
+    def _dim_ok(self, vecs: np.ndarray) -> bool:
+        if self.dim is None or vecs.shape[1] == self.dim:
+            return True
+        if not self._dim_warned:
+            self._dim_warned = True
+            log.warning(
+                "embedding store at %s holds %d-dim vectors but got %d-dim ones; not caching",
+                self.dir_path,
+                self.dim,
+                vecs.shape[1],
+            )
+        return False
+
+    def lookup(self, keys: List[bytes]) -> Tuple[Optional[np.ndarray], List[int]]:
+        """Returns (vectors with zero rows for misses, positions of the misses)."""
+        with self._lock:
+            self._refresh()
+            index, vectors = self._index, self._vectors
+
+        rows = _search(index, np.array(keys, dtype=_INDEX_DTYPE["key"]))
+        missing = np.flatnonzero(rows < 0).tolist()
+        if self.dim is None:
+            return None, missing
+
+        out = np.zeros((len(keys), self.dim), dtype=np.float32)
+        found = np.flatnonzero(rows >= 0)
+        if len(found):
+            out[found] = vectors[rows[found]]
+        return out, missing
+
+    def append(self, keys: List[bytes], vectors: np.ndarray) -> None:
+        vecs = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vecs.ndim != 2 or vecs.shape[0] != len(keys):
+            raise ValueError("expected one vector per key")
+        if not keys:
+            return
+
+        with self._lock, self._file_lock():
+            if self.dim is None:
+                self._read_meta()
+            if self.dim is None:
+                self._write_meta(int(vecs.shape[1]))
+            if not self._dim_ok(vecs):
+                return
+
+            self._refresh()
+            index = self._index
+            n = len(index)
+            key_arr = np.array(keys, dtype=_INDEX_DTYPE["key"])
+            _, first = np.unique(key_arr, return_index=True)
+            fresh = np.sort(first[_search(index, key_arr[first]) < 0])
+            if not len(fresh):
+                return
+
+            # Drop vector rows left behind by a writer that died before replacing the index.
+            row_bytes = self.dim * 4
+            with open(self._vectors_path, "ab") as f:
+                if f.tell() != n * row_bytes:
+                    f.truncate(n * row_bytes)
+                f.write(vecs[fresh].tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+            added = np.zeros(len(fresh), dtype=_INDEX_DTYPE)
+            added["key"] = key_arr[fresh]
+            added["row"] = np.arange(n, n + len(fresh))
+            added.sort(order="key")
+            merged = np.insert(np.asarray(index), np.searchsorted(index["key"], added["key"]), added)
+
+            tmp = f"{self._index_path}.{uuid.uuid4().hex}.tmp"
+            try:
+                with open(tmp, "wb") as f:
+                    f.write(merged.tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self._index_path)
+            except OSError:
+                with contextlib.suppress(OSError):
+                    os.remove(tmp)
+                raise
+
+            self.stats["appended"] += len(fresh)
+            self._refresh()
+
+    def _split(self, texts: List[str]) -> Tuple[List[bytes], Optional[np.ndarray], List[str], List[bytes]]:
+        keys = [embed_text_key(t) for t in texts]
+        out, missing = self.lookup(keys)
+        miss_texts, miss_keys = _unique([texts[i] for i in missing], [keys[i] for i in missing])
+
+        with self._lock:
+            self.stats["hits"] += len(texts) - len(missing)
+            self.stats["misses"] += len(miss_keys)
+        return keys, out, miss_texts, miss_keys
+
+    def _assemble(
+        self,
+        keys: List[bytes],
+        out: Optional[np.ndarray],
+        miss_keys: List[bytes],
+        miss_vecs: np.ndarray,
+    ) -> np.ndarray:
+        if not miss_keys:
+            return out if out is not None else np.zeros((len(keys), self.dim or 0), dtype=np.float32)
+        by_key = {k: miss_vecs[j] for j, k in enumerate(miss_keys)}
+        if out is None:
+            out = np.zeros((len(keys), miss_vecs.shape[1]), dtype=np.float32)
+        for i, k in enumerate(keys):
+            if k in by_key:
+                out[i] = by_key[k]
+        return out
+
+    def wrap(
+        self,
+        embed_fn: Callable[[List[str]], np.ndarray],
+        batch_size: int = 256,
+    ) -> Callable[[List[str]], np.ndarray]:
+        """embed_fn that only sends cache misses upstream, deduplicated and in batches."""
+
+        def embed(batch_texts: List[str]) -> np.ndarray:
+            parts = []
+            for i in range(0, len(batch_texts), batch_size):
+                parts.append(np.asarray(embed_fn(batch_texts[i : i + batch_size]), dtype=np.float32))
+                with self._lock:
+                    self.stats["upstream_calls"] += 1
+            return np.vstack(parts) if parts else np.zeros((0, self.dim or 0), dtype=np.float32)
+
+        def cached_embed_fn(texts: List[str]) -> np.ndarray:
+            keys, out, miss_texts, miss_keys = self._split(texts)
+            miss_vecs = embed(miss_texts)
+            if miss_keys and not self._dim_ok(miss_vecs):
+                # the store belongs to another dim, so its hits are no use either
+                if out is not None and len(miss_keys) < len(set(keys)):
+                    miss_texts, miss_keys = _unique(texts, keys)
+                    miss_vecs = embed(miss_texts)
+                return self._assemble(keys, None, miss_keys, miss_vecs)
+            if miss_keys:
+                self.append(miss_keys, miss_vecs)
+            return self._assemble(keys, out, miss_keys, miss_vecs)
+
+        return cached_embed_fn
+
+    def wrap_async(
+        self,
+        embed_fn: Callable[[List[str]], Awaitable[np.ndarray]],
+        batch_size: int = 256,
+    ) -> Callable[[List[str]], Awaitable[np.ndarray]]:
+        async def embed(batch_texts: List[str]) -> np.ndarray:
+            batches = [batch_texts[i : i + batch_size] for i in range(0, len(batch_texts), batch_size)]
+            parts = [np.asarray(v, dtype=np.float32) for v in await asyncio.gather(*(embed_fn(b) for b in batches))]
+            with self._lock:
+                self.stats["upstream_calls"] += len(batches)
+            return np.vstack(parts) if parts else np.zeros((0, self.dim or 0), dtype=np.float32)
+
+        async def cached_embed_fn(texts: List[str]) -> np.ndarray:
+            keys, out, miss_texts, miss_keys = await asyncio.to_thread(self._split, texts)
+            miss_vecs = await embed(miss_texts)
+            if miss_keys and not self._dim_ok(miss_vecs):
+                if out is not None and len(miss_keys) < len(set(keys)):
+                    miss_texts, miss_keys = _unique(texts, keys)
+                    miss_vecs = await embed(miss_texts)
+                return self._assemble(keys, None, miss_keys, miss_vecs)
+            if miss_keys:
+                await asyncio.to_thread(self.append, miss_keys, miss_vecs)
+            return self._assemble(keys, out, miss_keys, miss_vecs)
+
+        return cached_embed_fn
+
+
+def _unique(texts: List[str], keys: List[bytes]) -> Tuple[List[str], List[bytes]]:
+    out_texts: List[str] = []
+    out_keys: List[bytes] = []
+    seen = set()
+    for t, k in zip(texts, keys):
+        if k not in seen:
+            seen.add(k)
+            out_texts.append(t)
+            out_keys.append(k)
+    return out_texts, out_keys
+
+
+def store_dir(root_dir: str, model: str) -> str:
+    return os.path.join(root_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", model))
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+import io
 import json
 import os
 import zipfile
-from typing import Any, Dict
+from typing import Any, Dict, Union
 
 
 def export_json(obj: Dict[str, Any], path: str) -> str:
@@ -13,9 +14,8 @@ def export_json(obj: Dict[str, Any], path: str) -> str:
     return path
 
 
-def export_markdown(final_output: Dict[str, Any], out_dir: str) -> Dict[str, str]:
-    os.makedirs(out_dir, exist_ok=True)
-
+def markdown_documents(final_output: Dict[str, Any]) -> Dict[str, str]:
+    """resume.md and cover_letter.md for a run, as file name -> text."""
     bullets = final_output.get("generation", {}).get("resume_bullets", [])
     cover = final_output.get("generation", {}).get("cover_letter", {}).get("text", "")
 
@@ -25,16 +25,28 @@ def export_markdown(final_output: Dict[str, Any], out_dir: str) -> Dict[str, str
         txt = str(b.get("text", "")).strip()
         if txt:
             resume_md.append(f"- {txt}")
-    resume_path = os.path.join(out_dir, "resume.md")
-    with open(resume_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(resume_md).strip() + "\n")
 
     cover_md = []
     cover_md.append("# Cover Letter\n")
     cover_md.append(str(cover).strip())
+
+    return {
+        "resume.md": "\n".join(resume_md).strip() + "\n",
+        "cover_letter.md": "\n".join(cover_md).strip() + "\n",
+    }
+
+
+def export_markdown(final_output: Dict[str, Any], out_dir: str) -> Dict[str, str]:
+    os.makedirs(out_dir, exist_ok=True)
+    docs = markdown_documents(final_output)
+
+    resume_path = os.path.join(out_dir, "resume.md")
+    with open(resume_path, "w", encoding="utf-8") as f:
+        f.write(docs["resume.md"])
+
     cover_path = os.path.join(out_dir, "cover_letter.md")
     with open(cover_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(cover_md).strip() + "\n")
+        f.write(docs["cover_letter.md"])
 
     return {"resume_md": resume_path, "cover_md": cover_path}
 
@@ -48,3 +60,12 @@ def export_zip(folder: str, zip_path: str) -> str:
                 rel = os.path.relpath(full, folder)
                 z.write(full, arcname=rel)
     return zip_path
+
+
+def zip_bytes(files: Dict[str, Union[str, bytes]]) -> bytes:
+    """Builds a deflated ZIP of name -> content in memory."""
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as z:
+        for name, content in files.items():
+            z.writestr(name, content)
+    return buf.getvalue()
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .chunking import Chunk
+
+CACHE_FORMAT_VERSION = 1
+
+
+def profile_cache_key(
+    profile_text: str,
+    chunk_chars: int,
+    overlap_chars: int,
+    stopwords: Iterable[str],
+) -> str:
+    """Content hash of everything that determines the chunks built from a profile."""
+    payload = {
+        "v": CACHE_FORMAT_VERSION,
+        "profile": profile_text or "",
+        "chunk_chars": int(chunk_chars),
+        "overlap_chars": int(overlap_chars),
+        "stopwords": sorted(stopwords or []),
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+def save_chunks(chunks: List[Chunk], dir_path: str) -> None:
+    with open(os.path.join(dir_path, "chunks.pkl"), "wb") as f:
+        pickle.dump(chunks, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_chunks(dir_path: str) -> List[Chunk]:
+    with open(os.path.join(dir_path, "chunks.pkl"), "rb") as f:
+        return pickle.load(f)
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for fn in files:
+            try:
+                total += os.path.getsize(os.path.join(root, fn))
+            except OSError:
+                pass
+    return total
+
+
+class ProfileIndexCache:
+    """
+    Two-tier cache of artifacts built from one profile (chunks, TF-IDF, BM25,
+    embedding vectors), addressed by profile_cache_key plus an artifact name.
+
+    The memory tier is an LRU bounded by entry count. The disk tier keeps one
+    directory per artifact under cache_dir/<key>/<artifact>/ and evicts the
+    least recently used profile directories once the total exceeds max_disk_bytes.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_memory_items: int = 64,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+    ):
+        self.cache_dir = cache_dir
+        self.max_memory_items = max(0, int(max_memory_items))
+        self.max_disk_bytes = max(0, int(max_disk_bytes))
+        self._mem: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None
+        self.stats: Dict[str, int] = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+    def _remember(self, mk: Tuple[str, str], obj: Any) -> None:
+        if self.max_memory_items <= 0:
+            return
+        with self._lock:
+            self._mem[mk] = obj
+            self._mem.move_to_end(mk)
+            while len(self._mem) > self.max_memory_items:
+                self._mem.popitem(last=False)
+
+    def _profile_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir or "", key)
+
+    def lookup(self, key: str, artifact: str, load: Callable[[str], Any]) -> Optional[Any]:
+        mk = (key, artifact)
+        with self._lock:
+            if mk in self._mem:
+                self._mem.move_to_end(mk)
+                self.stats["memory_hits"] += 1
+                return self._mem[mk]
+
+        if self.cache_dir:
+            path = os.path.join(self._profile_dir(key), artifact)
+            if os.path.isdir(path):
+                try:
+                    obj = load(path)
+                except Exception:
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    try:
+                        os.utime(self._profile_dir(key))
+                    except OSError:
+                        pass
+                    self._remember(mk, obj)
+                    with self._lock:
+                        self.stats["disk_hits"] += 1
+                    return obj
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def store(self, key: str, artifact: str, obj: Any, save: Callable[[Any, str], None]) -> None:
+        self._remember((key, artifact), obj)
+        if not self.cache_dir:
+            return
+
+        profile_dir = self._profile_dir(key)
+        final = os.path.join(profile_dir, artifact)
+        tmp = os.path.join(self.cache_dir, f".tmp-{uuid.uuid4().hex}")
+        try:
+            os.makedirs(tmp, exist_ok=True)
+            save(obj, tmp)
+            size = _dir_size(tmp)
+            os.makedirs(profile_dir, exist_ok=True)
+            os.replace(tmp, final)
+            os.utime(profile_dir)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            return
+
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += size
+            over = self._disk_bytes is None or self._disk_bytes > self.max_disk_bytes
+        if over:
+            self._evict_disk(keep=key)
+
+    def get_or_build(
+        self,
+        key: str,
+        artifact: str,
+        build: Callable[[], Any],
+        save: Callable[[Any, str], None],
+        load: Callable[[str], Any],
+    ) -> Any:
+        obj = self.lookup(key, artifact, load)
+        if obj is None:
+            obj = build()
+            self.store(key, artifact, obj, save)
+        return obj
+
+    def _evict_disk(self, keep: str) -> None:
+        if not self.cache_dir or self.max_disk_bytes <= 0:
+            return
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.startswith(".") or not os.path.isdir(path):
+                continue
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            entries.append((mtime, name, _dir_size(path)))
+
+        total = sum(size for _, _, size in entries)
+        for _, name, size in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            if name == keep:
+                continue
+            shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+            total -= size
+            with self._lock:
+                self.stats["evictions"] += 1
+
+        with self._lock:
+            self._disk_bytes = total
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+            self._disk_bytes = None
+        if self.cache_dir and os.path.isdir(self.cache_dir):
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import json
+from typing import Any, List, Optional, Tuple
+
+
+class GenerationStreamParser:
+    """
+    Incremental parser for a streamed generation object
+    ({"resume_bullets": [...], "cover_letter": {...}, "warnings": [...]}).
+
+    feed() takes raw text deltas and returns the items that closed in them:
+    ("bullet", index, obj) for each object in the top-level resume_bullets
+    array and ("cover_letter", None, obj) for the top-level cover_letter.
+    Indexes count only object items, as _clean_generation does. Each delta
+    is scanned once and only the text of the key or item still open is held
+    on to, so total work is linear in the response length. Once the stream
+    ends, text joins the deltas into the whole response for the normal
+    json.loads.
+    """
+
+    def __init__(self) -> None:
+        self._parts: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect_key = False
+        self._key: Optional[str] = None
+        self._in_item = False
+        # text of the open key or item: earlier deltas, plus the current one from _held_from
+        self._held: Optional[List[str]] = None
+        self._held_from = 0
+        self._bullets = 0
+
+    @property
+    def text(self) -> str:
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+    def _hold(self, i: int) -> None:
+        self._held = []
+        self._held_from = i
+
+    def _release(self, delta: str, i: int) -> str:
+        raw = "".join(self._held or []) + delta[self._held_from : i + 1]
+        self._held = None
+        return raw
+
+    def feed(self, delta: str) -> List[Tuple[str, Optional[int], Any]]:
+        self._parts.append(delta)
+        out: List[Tuple[str, Optional[int], Any]] = []
+        for i, ch in enumerate(delta):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expect_key:
+                        self._key = self._release(delta, i)[1:-1]
+                        self._expect_key = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect_key:
+                    self._hold(i)
+            elif ch in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    self._expect_key = ch == "{"
+                elif not self._in_item and ch == "{" and self._at_item():
+                    self._in_item = True
+                    self._hold(i)
+            elif ch in "}]":
+                if self._in_item and ch == "}" and self._at_item():
+                    item = self._decode(self._release(delta, i))
+                    self._in_item = False
+                    if isinstance(item, dict):
+                        if self._key == "resume_bullets":
+                            out.append(("bullet", self._bullets, item))
+                            self._bullets += 1
+                        else:
+                            out.append(("cover_letter", None, item))
+                self._depth -= 1
+            elif ch == "," and self._depth == 1:
+                self._expect_key = True
+                self._key = None
+        if self._held is not None:
+            self._held.append(delta[self._held_from :])
+            self._held_from = 0
+        return out
+
+    def _at_item(self) -> bool:
+        """Whether the object opened (or about to close) at the current depth is an item we emit."""
+        if self._key == "resume_bullets":
+            return self._depth == 3
+        return self._key == "cover_letter" and self._depth == 2
+
+    @staticmethod
+    def _decode(raw: str) -> Any:
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return None
@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from .metrics import LLM_ERRORS, LLM_SECONDS, LLM_TOKENS
+
+CACHE_FORMAT_VERSION = 1
+
+
+def llm_cache_key(
+    model: str,
+    temperature: float,
+    messages: List[Dict[str, str]],
+    response_format: Optional[Dict[str, Any]] = None,
+) -> str:
+    """Content hash of everything that determines a chat completion request."""
+    payload = {
+        "v": CACHE_FORMAT_VERSION,
+        "model": model,
+        "temperature": float(temperature),
+        "messages": messages,
+        "response_format": response_format,
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Two-tier cache of raw chat completion contents, addressed by llm_cache_key.
+
+    The memory tier is an LRU bounded by entry count. The disk tier stores one
+    small JSON file per key under cache_dir/<key[:2]>/<key>.json and evicts the
+    least recently used files once the total exceeds max_disk_bytes. Entries
+    older than ttl_seconds are treated as misses and removed (0 disables TTL).
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_memory_items: int = 256,
+        max_disk_bytes: int = 256 * 1024 * 1024,
+        ttl_seconds: float = 0.0,
+    ):
+        self.cache_dir = cache_dir
+        self.max_memory_items = max(0, int(max_memory_items))
+        self.max_disk_bytes = max(0, int(max_disk_bytes))
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self._mem: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None
+        self.stats: Dict[str, int] = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "stores": 0,
+            "evictions": 0,
+        }
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl_seconds > 0 and (time.time() - created) > self.ttl_seconds
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir or "", key[:2], f"{key}.json")
+
+    def _remember(self, key: str, created: float, content: str) -> None:
+        if self.max_memory_items <= 0:
+            return
+        with self._lock:
+            self._mem[key] = (created, content)
+            self._mem.move_to_end(key)
+            while len(self._mem) > self.max_memory_items:
+                self._mem.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._mem.get(key)
+            if item is not None:
+                self._mem.move_to_end(key)
+        if item is not None:
+            if not self._expired(item[0]):
+                self._count("memory_hits")
+                return item[1]
+            with self._lock:
+                self._mem.pop(key, None)
+            # the disk copy is as old, so it is removed below without counting twice
+            self._count("expired")
+
+        if self.cache_dir:
+            path = self._path(key)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+                created, content = float(entry["created"]), str(entry["content"])
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError, KeyError, TypeError):
+                self._remove(path)
+            else:
+                if self._expired(created):
+                    self._remove(path)
+                    if item is None:
+                        self._count("expired")
+                else:
+                    try:
+                        os.utime(path)
+                    except OSError:
+                        pass
+                    self._remember(key, created, content)
+                    self._count("disk_hits")
+                    return content
+
+        self._count("misses")
+        return None
+
+    def put(self, key: str, content: str) -> None:
+        created = time.time()
+        self._remember(key, created, content)
+        self._count("stores")
+        if not self.cache_dir:
+            return
+
+        path = self._path(key)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        raw = json.dumps({"created": created, "content": content}, ensure_ascii=False)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(raw)
+            try:
+                replaced = os.path.getsize(path)
+            except OSError:
+                replaced = 0
+            os.replace(tmp, path)
+        except OSError:
+            self._remove(tmp)
+            return
+
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += len(raw.encode("utf-8")) - replaced
+            over = self._disk_bytes is None or self._disk_bytes > self.max_disk_bytes
+        if over:
+            self._evict_disk()
+
+    def _remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict_disk(self) -> None:
+        if not self.cache_dir or not os.path.isdir(self.cache_dir):
+            return
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for fn in files:
+                path = os.path.join(root, fn)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, path, st.st_size))
+
+        total = sum(size for _, _, size in entries)
+        now = time.time()
+        for mtime, path, size in sorted(entries):
+            stale = self.ttl_seconds > 0 and (now - mtime) > self.ttl_seconds
+            if not stale and (self.max_disk_bytes <= 0 or total <= self.max_disk_bytes):
+                break
+            self._remove(path)
+            total -= size
+            self._count("evictions")
+
+        with self._lock:
+            self._disk_bytes = total
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+            self._disk_bytes = None
+        if self.cache_dir and os.path.isdir(self.cache_dir):
+            for root, _, files in os.walk(self.cache_dir):
+                for fn in files:
+                    self._remove(os.path.join(root, fn))
+
+
+def _cacheable(request: Dict[str, Any], content: Optional[str], finish_reason: Optional[str]) -> bool:
+    """
+    Only complete answers are stored: an empty, refused or truncated reply
+    (finish_reason other than "stop") would otherwise be replayed for the
+    whole TTL.
+    """
+    if not content or finish_reason != "stop":
+        return False
+    if (request.get("response_format") or {}).get("type") != "json_object":
+        return True
+    try:
+        json.loads(content)
+    except ValueError:
+        return False
+    return True
+
+
+def _request_key(request: Dict[str, Any]) -> str:
+    return llm_cache_key(
+        request["model"],
+        request.get("temperature", 1.0),
+        request["messages"],
+        request.get("response_format"),
+    )
+
+
+def _record_usage(agent: str, usage: Any) -> None:
+    if usage is None:
+        return
+    for kind in ("prompt_tokens", "completion_tokens"):
+        n = getattr(usage, kind, None)
+        if n:
+            LLM_TOKENS.inc(n, agent=agent, kind=kind.split("_")[0])
+
+
+def chat_content(
+    client: Any,
+    request: Dict[str, Any],
+    cache: Optional[LLMResponseCache] = None,
+    agent: str = "llm",
+) -> str:
+    """
+    Calls client.chat.completions.create(**request) and returns the message
+    content, serving repeats of the same request from cache when given one.
+    agent labels the call in the LLM metrics.
+    """
+    t0 = time.perf_counter()
+    key = _request_key(request) if cache is not None else ""
+    if cache is not None:
+        hit = cache.get(key)
+        if hit is not None:
+            LLM_SECONDS.observe(time.perf_counter() - t0, agent=agent, source="cache")
+            return hit
+
+    try:
+        resp = client.chat.completions.create(**request)
+    except Exception:
+        LLM_ERRORS.inc(agent=agent)
+        raise
+    LLM_SECONDS.observe(time.perf_counter() - t0, agent=agent, source="api")
+    _record_usage(agent, getattr(resp, "usage", None))
+    choice = resp.choices[0]
+    content = choice.message.content
+    if cache is not None and _cacheable(request, content, getattr(choice, "finish_reason", None)):
+        cache.put(key, content)
+    return content or "{}"
+
+
+async def chat_content_async(
+    client: Any,
+    request: Dict[str, Any],
+    cache: Optional[LLMResponseCache] = None,
+    agent: str = "llm",
+) -> str:
+    t0 = time.perf_counter()
+    key = _request_key(request) if cache is not None else ""
+    if cache is not None:
+        hit = await asyncio.to_thread(cache.get, key)
+        if hit is not None:
+            LLM_SECONDS.observe(time.perf_counter() - t0, agent=agent, source="cache")
+            return hit
+
+    try:
+        resp = await client.chat.completions.create(**request)
+    except Exception:
+        LLM_ERRORS.inc(agent=agent)
+        raise
+    LLM_SECONDS.observe(time.perf_counter() - t0, agent=agent, source="api")
+    _record_usage(agent, getattr(resp, "usage", None))
+    choice = resp.choices[0]
+    content = choice.message.content
+    if cache is not None and _cacheable(request, content, getattr(choice, "finish_reason", None)):
+        await asyncio.to_thread(cache.put, key, content)
+    return content or "{}"
+
+
+def _delta_text(chunk: Any) -> str:
+    choices = getattr(chunk, "choices", None) or []
+    if not choices:
+        return ""
+    delta = getattr(choices[0], "delta", None)
+    return getattr(delta, "content", None) or ""
+
+
+def _finish_reason(chunk: Any) -> Optional[str]:
+    choices = getattr(chunk, "choices", None) or []
+    return getattr(choices[0], "finish_reason", None) if choices else None
+
+
+async def chat_content_stream_async(
+    client: Any,
+    request: Dict[str, Any],
+    cache: Optional[LLMResponseCache] = None,
+    agent: str = "llm",
+) -> AsyncIterator[str]:
+    """
+    Streaming variant of chat_content_async: yields content deltas as they
+    arrive. A cache hit is yielded as a single delta; a completed stream is
+    stored like a regular response. Usage is requested in the final chunk so
+    streamed calls still count their tokens.
+    """
+    t0 = time.perf_counter()
+    key = _request_key(request) if cache is not None else ""
+    if cache is not None:
+        hit = await asyncio.to_thread(cache.get, key)
+        if hit is not None:
+            LLM_SECONDS.observe(time.perf_counter() - t0, agent=agent, source="cache")
+            yield hit
+            return
+
+    parts: List[str] = []
+    finish_reason: Optional[str] = None
+    try:
+        stream = await client.chat.completions.create(
+            **request, stream=True, stream_options={"include_usage": True}
+        )
+        async for chunk in stream:
+            _record_usage(agent, getattr(chunk, "usage", None))
+            finish_reason = _finish_reason(chunk) or finish_reason
+            delta = _delta_text(chunk)
+            if delta:
+                parts.append(delta)
+                yield delta
+    except Exception:
+        LLM_ERRORS.inc(agent=agent)
+        raise
+    LLM_SECONDS.observe(time.perf_counter() - t0, agent=agent, source="api")
+
+    content = "".join(parts)
+    if not parts:
+        yield "{}"
+    if cache is not None and _cacheable(request, content, finish_reason):
+        await asyncio.to_thread(cache.put, key, content)
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import weakref
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# seconds; covers in-process stages (ms) up to slow LLM calls
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+class _Shards:
+    """
+    One dict per writing thread. A thread only ever writes its own dict, so
+    the hot path takes no lock; the registry lock is only taken the first
+    time a thread writes and when a scrape collects the shard list. A scrape
+    folds the dicts of threads that have exited into a base dict with merge,
+    so short-lived threads do not pile up shards.
+    """
+
+    def __init__(self, merge: Callable[[Dict[Tuple[str, ...], Any], Dict[Tuple[str, ...], Any]], None]) -> None:
+        self._local = threading.local()
+        self._merge = merge
+        self._base: Dict[Tuple[str, ...], Any] = {}
+        self._live: List[Tuple["weakref.ref[threading.Thread]", Dict[Tuple[str, ...], Any]]] = []
+        self._lock = threading.Lock()
+
+    def mine(self) -> Dict[Tuple[str, ...], Any]:
+        d = getattr(self._local, "d", None)
+        if d is None:
+            d = {}
+            with self._lock:
+                self._live.append((weakref.ref(threading.current_thread()), d))
+            self._local.d = d
+        return d
+
+    def snapshot(self) -> List[Dict[Tuple[str, ...], Any]]:
+        with self._lock:
+            live = []
+            for ref, d in self._live:
+                thread = ref()
+                if thread is None or not thread.is_alive():
+                    # the thread is gone, so nothing writes d any more
+                    self._merge(self._base, d)
+                else:
+                    live.append((ref, d))
+            self._live = live
+            shards = [self._base] + [d for _, d in live]
+            # dict.copy() runs without releasing the GIL, so it sees a consistent dict
+            return [s.copy() for s in shards]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _number(v: float) -> str:
+    if math.isinf(v):
+        return "+Inf" if v > 0 else "-Inf"
+    if float(v).is_integer():
+        return str(int(v))
+    return repr(float(v))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._shards = _Shards(self._merge)
+
+    @staticmethod
+    def _merge(base: Dict[Tuple[str, ...], Any], shard: Dict[Tuple[str, ...], Any]) -> None:
+        for key, v in shard.items():
+            base[key] = base.get(key, 0.0) + v
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        d = self._shards.mine()
+        d[key] = d.get(key, 0.0) + amount
+
+    def values(self) -> Dict[Tuple[str, ...], float]:
+        out: Dict[Tuple[str, ...], float] = {}
+        for shard in self._shards.snapshot():
+            for key, v in shard.items():
+                out[key] = out.get(key, 0.0) + v
+        return out
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, v in sorted(self.values().items()):
+            lines.append(f"{self.name}{_labels(dict(zip(self.labelnames, key)))} {_number(v)}")
+        return lines
+
+
+class Histogram:
+    """
+    Per-shard bucket counts (non-cumulative, last slot is +Inf) plus the sum.
+    The count is derived from the buckets at scrape time, so it always agrees
+    with the +Inf bucket even if a write lands mid-scrape.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._shards = _Shards(self._merge)
+
+    def _merge(self, base: Dict[Tuple[str, ...], Any], shard: Dict[Tuple[str, ...], Any]) -> None:
+        for key, (counts, total) in shard.items():
+            m = base.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0])
+            for i, c in enumerate(counts):
+                m[0][i] += c
+            m[1] += total
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        d = self._shards.mine()
+        entry = d.get(key)
+        if entry is None:
+            entry = d[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+
+    def render(self) -> List[str]:
+        merged: Dict[Tuple[str, ...], List[Any]] = {}
+        for shard in self._shards.snapshot():
+            self._merge(merged, shard)
+
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in sorted(merged.items()):
+            labels = dict(zip(self.labelnames, key))
+            running = 0
+            for le, c in zip((*self.buckets, math.inf), counts):
+                running += c
+                lines.append(f"{self.name}_bucket{_labels({**labels, 'le': _number(le)})} {running}")
+            lines.append(f"{self.name}_sum{_labels(labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(labels)} {running}")
+        return lines
+
+
+class MetricsRegistry:
+    """Process-wide metrics plus callbacks that report gauges from existing stats at scrape time."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Any] = {}
+        self._gauges: List[Tuple[str, str, Callable[[], Iterable[Sample]]]] = []
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        with self._lock:
+            return self._metrics.setdefault(name, Counter(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        with self._lock:
+            return self._metrics.setdefault(name, Histogram(name, help, labelnames, buckets))
+
+    def gauge_callback(self, name: str, help: str, fn: Callable[[], Iterable[Sample]]) -> None:
+        """fn returns (suffix, labels, value) samples; suffix is appended to name (often "")."""
+        with self._lock:
+            self._gauges = [g for g in self._gauges if g[0] != name] + [(name, help, fn)]
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            gauges = list(self._gauges)
+        lines: List[str] = []
+        for m in metrics:
+            lines.extend(m.render())
+        for name, help, fn in gauges:
+            try:
+                samples = list(fn())
+            except Exception:
+                continue
+            by_name: Dict[str, List[Tuple[Dict[str, str], float]]] = {}
+            for suffix, labels, value in samples:
+                by_name.setdefault(name + suffix, []).append((labels, value))
+            for full, rows in by_name.items():
+                lines.append(f"# HELP {full} {help}")
+                lines.append(f"# TYPE {full} gauge")
+                for labels, value in rows:
+                    lines.append(f"{full}{_labels(labels)} {_number(float(value))}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+PIPELINE_SECONDS = METRICS.histogram(
+    "cv_pipeline_duration_seconds", "End-to-end pipeline latency.", ("entrypoint", "outcome")
+)
+STAGE_SECONDS = METRICS.histogram("cv_stage_duration_seconds", "Wall time per pipeline stage.", ("stage",))
+LLM_SECONDS = METRICS.histogram(
+    "cv_llm_call_duration_seconds", "LLM chat call latency, cache hits included.", ("agent", "source")
+)
+LLM_TOKENS = METRICS.counter("cv_llm_tokens_total", "Tokens reported by the LLM API.", ("agent", "kind"))
+LLM_ERRORS = METRICS.counter("cv_llm_errors_total", "LLM calls that raised.", ("agent",))
+LLM_FALLBACKS = METRICS.counter(
+    "cv_llm_fallbacks_total", "Times an agent kept its input because the LLM output was unusable.", ("agent", "reason")
+)
+VALIDATION_WARNINGS = METRICS.counter(
+    "cv_validation_warnings_total", "Validation warnings on finished runs.", ("code",)
+)
+EMBED_SECONDS = METRICS.histogram("cv_embed_call_duration_seconds", "Embedding backend call latency.", ("backend",))
+EMBED_TEXTS = METRICS.counter("cv_embed_texts_total", "Texts sent to the embedding backend.", ("backend",))
+REQUESTS = METRICS.counter(
+    "cv_requests_total",
+    "API pipeline requests by endpoint and feature flags.",
+    ("endpoint", "use_tfidf", "use_bm25", "use_embeddings", "use_llm_jd_classifier", "use_llm_editor"),
+)
+REQUEST_ERRORS = METRICS.counter("cv_request_errors_total", "API pipeline requests that failed.", ("endpoint", "error"))
+
+
+def stats_samples(stats: Optional[Dict[str, Any]], **labels: str) -> List[Sample]:
+    """Numeric fields of an existing stats dict as gauge samples, one per "_<field>" suffix."""
+    if not stats:
+        return []
+    return [
+        (f"_{k}", dict(labels), float(v))
+        for k, v in stats.items()
+        if isinstance(v, (int, float)) and not isinstance(v, bool)
+    ]
@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import math
+import os
+import shutil
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .chunking import chunk_profile
+from .preprocess import tokenize
+
+INDEX_FORMAT_VERSION = 1
+
+_ARRAYS = (
+    "term_offsets",
+    "post_chunk",
+    "post_score",
+    "term_prof_offsets",
+    "term_prof_ids",
+    "term_prof_max",
+    "profile_offsets",
+)
+
+
+@dataclass(frozen=True)
+class ProfileScore:
+    profile_id: str
+    score: float
+    requirement_scores: Dict[str, float]
+    chunk_hits: Dict[str, List[Tuple[str, float]]]
+
+
+@dataclass(frozen=True)
+class RankStats:
+    profiles_total: int
+    profiles_candidates: int
+    profiles_scored: int
+
+
+class MultiProfileIndex:
+    """
+    BM25 index over the chunks of many profiles, for ranking candidates against one JD.
+
+    Chunks of a profile are stored contiguously, and each term keeps two posting
+    lists on disk: per-chunk BM25 contributions (sorted by chunk) and the best
+    contribution per profile. The second list gives every profile a cheap upper
+    bound, which lets top_profiles fully score only the profiles that can still
+    reach the current top N (max-score pruning). Arrays are opened with mmap.
+    """
+
+    def __init__(self, dir_path: str, meta: Dict, arrays: Dict[str, np.ndarray]):
+        self.dir_path = dir_path
+        self.meta = meta
+        self.profile_ids: List[str] = meta["profile_ids"]
+        self.chunk_ids: List[str] = meta["chunk_ids"]
+        self.term_ids: Dict[str, int] = {t: i for i, t in enumerate(meta["terms"])}
+        for name in _ARRAYS:
+            setattr(self, name, arrays[name])
+
+    @classmethod
+    def build(
+        cls,
+        profiles: Iterable[Tuple[str, str]],
+        out_dir: str,
+        stopwords: Optional[Set[str]] = None,
+        chunk_chars: int = 430,
+        overlap_chars: int = 60,
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+    ) -> "MultiProfileIndex":
+        profile_ids: List[str] = []
+        chunk_ids: List[str] = []
+        profile_offsets: List[int] = [0]
+        doc_len: List[int] = []
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+
+        for pid, text in profiles:
+            profile_ids.append(str(pid))
+            for ch in chunk_profile(text, stopwords=stopwords, chunk_chars=chunk_chars, overlap_chars=overlap_chars):
+                c = len(chunk_ids)
+                chunk_ids.append(ch.chunk_id)
+                doc_len.append(len(ch.tokens))
+                for term, tf in Counter(ch.tokens).items():
+                    postings.setdefault(term, []).append((c, tf))
+            profile_offsets.append(len(chunk_ids))
+
+        n_chunks = len(chunk_ids)
+        avgdl = (sum(doc_len) / n_chunks) if n_chunks else 0.0
+        dl = np.asarray(doc_len, dtype=np.float64)
+        chunk_profile_idx = np.repeat(np.arange(len(profile_ids)), np.diff(profile_offsets))
+
+        # Same idf floor as rank_bm25.BM25Okapi so scores line up with BM25Index.
+        terms = sorted(postings)
+        idf = {t: math.log(n_chunks - len(postings[t]) + 0.5) - math.log(len(postings[t]) + 0.5) for t in terms}
+        eps = epsilon * (sum(idf.values()) / len(idf)) if idf else 0.0
+        idf = {t: (v if v >= 0 else eps) for t, v in idf.items()}
+
+        term_offsets = [0]
+        term_prof_offsets = [0]
+        post_chunk: List[np.ndarray] = []
+        post_score: List[np.ndarray] = []
+        prof_ids: List[np.ndarray] = []
+        prof_max: List[np.ndarray] = []
+
+        for t in terms:
+            arr = np.asarray(postings[t], dtype=np.int64)
+            chunks_t, tf = arr[:, 0], arr[:, 1].astype(np.float64)
+            norm = k1 * (1 - b + b * dl[chunks_t] / avgdl) if avgdl else k1
+            scores = idf[t] * (tf * (k1 + 1) / (tf + norm))
+
+            owners = chunk_profile_idx[chunks_t]
+            starts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]])
+
+            post_chunk.append(chunks_t.astype(np.int32))
+            post_score.append(scores.astype(np.float32))
+            prof_ids.append(owners[starts].astype(np.int32))
+            prof_max.append(np.maximum.reduceat(scores, starts).astype(np.float32))
+            term_offsets.append(term_offsets[-1] + len(chunks_t))
+            term_prof_offsets.append(term_prof_offsets[-1] + len(starts))
+
+        def cat(parts: List[np.ndarray], dtype) -> np.ndarray:
+            return np.concatenate(parts).astype(dtype) if parts else np.empty(0, dtype=dtype)
+
+        arrays = {
+            "term_offsets": np.asarray(term_offsets, dtype=np.int64),
+            "post_chunk": cat(post_chunk, np.int32),
+            "post_score": cat(post_score, np.float32),
+            "term_prof_offsets": np.asarray(term_prof_offsets, dtype=np.int64),
+            "term_prof_ids": cat(prof_ids, np.int32),
+            "term_prof_max": cat(prof_max, np.float32),
+            "profile_offsets": np.asarray(profile_offsets, dtype=np.int64),
+        }
+        meta = {
+            "version": INDEX_FORMAT_VERSION,
+            "k1": k1,
+            "b": b,
+            "epsilon": epsilon,
+            "avgdl": avgdl,
+            "chunk_chars": chunk_chars,
+            "overlap_chars": overlap_chars,
+            "profile_ids": profile_ids,
+            "chunk_ids": chunk_ids,
+            "terms": terms,
+        }
+
+        # Arrays go into a fresh subdirectory and meta.json, which names it, is
+        # swapped in last. A server that has the previous build mmapped keeps
+        # reading intact files instead of ones being truncated under it.
+        os.makedirs(out_dir, exist_ok=True)
+        arrays_dir = f"arrays-{uuid.uuid4().hex}"
+        os.makedirs(os.path.join(out_dir, arrays_dir))
+        for name, arr in arrays.items():
+            np.save(os.path.join(out_dir, arrays_dir, f"{name}.npy"), arr)
+        meta["arrays_dir"] = arrays_dir
+
+        previous = cls._arrays_dir(out_dir) if cls.exists(out_dir) else None
+        meta_path = os.path.join(out_dir, "meta.json")
+        tmp = f"{meta_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp, meta_path)
+        cls._remove_stale_builds(out_dir, keep={arrays_dir, previous})
+
+        return cls.load(out_dir)
+
+    @staticmethod
+    def exists(dir_path: str) -> bool:
+        return os.path.exists(os.path.join(dir_path, "meta.json"))
+
+    @staticmethod
+    def stamp(dir_path: str) -> Tuple[int, int]:
+        """Identity of the current build; changes whenever build swaps in a new meta.json."""
+        st = os.stat(os.path.join(dir_path, "meta.json"))
+        return st.st_ino, st.st_mtime_ns
+
+    @staticmethod
+    def _read_meta(dir_path: str) -> Dict:
+        with open(os.path.join(dir_path, "meta.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @classmethod
+    def _arrays_dir(cls, dir_path: str) -> str:
+        # Indexes written before arrays_dir existed keep their .npy files at the top level.
+        return cls._read_meta(dir_path).get("arrays_dir", "")
+
+    @staticmethod
+    def _remove_stale_builds(out_dir: str, keep: Set[Optional[str]]) -> None:
+        # The build just replaced is kept so a load that read the old meta.json
+        # can still open its arrays; anything older is unlinked (open mmaps stay valid).
+        for fn in os.listdir(out_dir):
+            path = os.path.join(out_dir, fn)
+            if fn.startswith("arrays-") and fn not in keep:
+                shutil.rmtree(path, ignore_errors=True)
+            elif "" not in keep and fn.endswith(".npy") and fn[: -len(".npy")] in _ARRAYS:
+                os.remove(path)
+
+    @classmethod
+    def load(cls, dir_path: str) -> "MultiProfileIndex":
+        meta = cls._read_meta(dir_path)
+        if meta.get("version") != INDEX_FORMAT_VERSION:
+            raise ValueError(f"unsupported profile index version in {dir_path}")
+        arrays_dir = os.path.join(dir_path, meta.get("arrays_dir", ""))
+        arrays = {name: np.load(os.path.join(arrays_dir, f"{name}.npy"), mmap_mode="r") for name in _ARRAYS}
+        return cls(dir_path, meta, arrays)
+
+    def _query_terms(self, text: str) -> List[Tuple[int, float]]:
+        counts = Counter(tokenize(text or ""))
+        return [(self.term_ids[t], float(n)) for t, n in counts.items() if t in self.term_ids]
+
+    def _upper_bounds(self, reqs: List[Tuple[str, float, List[Tuple[int, float]]]]) -> np.ndarray:
+        ub = np.zeros(len(self.profile_ids), dtype=np.float64)
+        for _, weight, terms in reqs:
+            for tid, cnt in terms:
+                lo, hi = int(self.term_prof_offsets[tid]), int(self.term_prof_offsets[tid + 1])
+                ub[self.term_prof_ids[lo:hi]] += weight * cnt * self.term_prof_max[lo:hi]
+        return ub
+
+    def _score_profile(
+        self,
+        p: int,
+        reqs: List[Tuple[str, float, List[Tuple[int, float]]]],
+        top_k_chunks: int,
+    ) -> ProfileScore:
+        c0, c1 = int(self.profile_offsets[p]), int(self.profile_offsets[p + 1])
+        total = 0.0
+        req_scores: Dict[str, float] = {}
+        chunk_hits: Dict[str, List[Tuple[str, float]]] = {}
+
+        for req, weight, terms in reqs:
+            s = np.zeros(c1 - c0, dtype=np.float64)
+            for tid, cnt in terms:
+                lo, hi = int(self.term_offsets[tid]), int(self.term_offsets[tid + 1])
+                chunks_t = self.post_chunk[lo:hi]
+                a = lo + int(np.searchsorted(chunks_t, c0, side="left"))
+                z = lo + int(np.searchsorted(chunks_t, c1, side="left"))
+                if a < z:
+                    s[np.asarray(self.post_chunk[a:z]) - c0] += cnt * np.asarray(self.post_score[a:z])
+
+            best = float(s.max()) if s.size else 0.0
+            req_scores[req] = best
+            total += weight * best
+
+            order = np.argsort(-s, kind="stable")[:top_k_chunks]
+            chunk_hits[req] = [(self.chunk_ids[c0 + int(i)], float(s[i])) for i in order if s[i] > 0.0]
+
+        return ProfileScore(
+            profile_id=self.profile_ids[p],
+            score=total,
+            requirement_scores=req_scores,
+            chunk_hits=chunk_hits,
+        )
+
+    def top_profiles(
+        self,
+        requirements: List[Tuple[str, float]],
+        top_n: int = 10,
+        top_k_chunks: int = 8,
+    ) -> Tuple[List[ProfileScore], RankStats]:
+        """
+        requirements: (requirement text, weight) pairs. A profile's score is the
+        weighted sum over requirements of its best chunk's BM25 score.
+        """
+        reqs = [(r, float(w), self._query_terms(r)) for r, w in requirements]
+        ub = self._upper_bounds(reqs)
+        candidates = np.flatnonzero(ub > 0.0)
+        order = candidates[np.argsort(-ub[candidates], kind="stable")]
+
+        heap: List[Tuple[float, int, ProfileScore]] = []
+        scored = 0
+        for p in order.tolist():
+            if len(heap) >= top_n and ub[p] < heap[0][0]:
+                break
+            ps = self._score_profile(p, reqs, top_k_chunks)
+            scored += 1
+            if len(heap) < top_n:
+                heapq.heappush(heap, (ps.score, -p, ps))
+            elif (ps.score, -p) > heap[0][:2]:
+                heapq.heapreplace(heap, (ps.score, -p, ps))
+
+        ranked = [ps for _, _, ps in sorted(heap, key=lambda x: (-x[0], -x[1]))]
+        stats = RankStats(
+            profiles_total=len(self.profile_ids),
+            profiles_candidates=int(candidates.size),
+            profiles_scored=scored,
+        )
+        return ranked, stats
+
+
+def _read_profiles(src_dir: str) -> Iterable[Tuple[str, str]]:
+    for fn in sorted(os.listdir(src_dir)):
+        stem, ext = os.path.splitext(fn)
+        if ext.lower() not in {".txt", ".md"}:
+            continue
+        with open(os.path.join(src_dir, fn), "r", encoding="utf-8") as f:
+            yield stem, f.read()
+
+
+def main() -> None:
+    from config import AppConfig
+
+    cfg = AppConfig()
+    ap = argparse.ArgumentParser(description="Build a multi-profile index from a folder of .txt/.md profiles.")
+    ap.add_argument("profiles_dir")
+    ap.add_argument("--out", default=cfg.profile_index_dir)
+    args = ap.parse_args()
+
+    from resources import get_stopwords
+
+    index = MultiProfileIndex.build(
+        _read_profiles(args.profiles_dir),
+        args.out,
+        stopwords=set(get_stopwords(cfg.stopwords_path)),
+        chunk_chars=cfg.chunk_chars,
+        overlap_chars=cfg.overlap_chars,
+    )
+    print(f"indexed {len(index.profile_ids)} profiles / {len(index.chunk_ids)} chunks -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
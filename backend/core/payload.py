@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .preprocess import tokenize
+
+MIN_CHUNK_CHARS = 160
+
+
+@lru_cache(maxsize=16)
+def _encoder(model: str):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str, model: str = "") -> int:
+    """Exact count with tiktoken when it is installed, otherwise about 4 chars per token."""
+    enc = _encoder(model)
+    if enc is None:
+        return len(text or "") // 4 + 1
+    return len(enc.encode(text or "", disallowed_special=()))
+
+
+@dataclass(frozen=True)
+class PayloadLimits:
+    token_budget: Optional[int] = None
+    profile_coverage: float = 0.9
+
+
+@dataclass
+class PayloadStats:
+    tokens_system: int = 0
+    tokens_user: int = 0
+    tokens_total: int = 0
+    chunks: int = 0
+    chunk_refs: int = 0
+    refs_dropped: int = 0
+    chunks_truncated: int = 0
+    profile_coverage: float = 0.0
+    profile_included: bool = False
+    fewshot_included: bool = False
+    over_budget: bool = False
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def chunk_table(evidence_map: Dict[str, Any]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """
+    Splits an evidence map into a chunk table (each chunk once, keyed by
+    chunk_id) and per-requirement evidence that references chunks by ID.
+    """
+    chunks: Dict[str, Dict[str, Any]] = {}
+    evidence: Dict[str, Dict[str, Any]] = {}
+    for req, item in (evidence_map or {}).items():
+        ids: List[str] = []
+        for ch in item.get("chunks", []) or []:
+            cid = str(ch.get("chunk_id", ""))
+            if not cid:
+                continue
+            ids.append(cid)
+            if cid not in chunks:
+                chunks[cid] = {
+                    "section": ch.get("section", ""),
+                    "text": ch.get("text", ""),
+                    "skills": ch.get("skills_found", []),
+                }
+        evidence[req] = {
+            "matched": bool(item.get("matched", False)),
+            "score": round(float(item.get("score", 0.0) or 0.0), 3),
+            "chunk_ids": ids,
+        }
+    return chunks, evidence
+
+
+def profile_coverage(profile_text: str, chunks: Dict[str, Dict[str, Any]]) -> float:
+    """Share of the profile's distinct terms that also appear in the chunk table."""
+    profile_terms = set(tokenize(profile_text or "", stopwords=set()))
+    if not profile_terms:
+        return 1.0
+    covered: Set[str] = set()
+    for ch in chunks.values():
+        covered.update(tokenize(ch.get("text", ""), stopwords=set()))
+    return len(profile_terms & covered) / len(profile_terms)
+
+
+def _drop_one_ref(evidence: Dict[str, Dict[str, Any]]) -> bool:
+    """Drops the weakest trailing chunk reference, never a requirement's last one."""
+    candidates = [(len(e["chunk_ids"]), -e["score"], req) for req, e in evidence.items() if len(e["chunk_ids"]) > 1]
+    if not candidates:
+        return False
+    _, _, req = max(candidates)
+    evidence[req]["chunk_ids"].pop()
+    return True
+
+
+def _referenced(evidence: Dict[str, Dict[str, Any]]) -> Set[str]:
+    return {cid for e in evidence.values() for cid in e["chunk_ids"]}
+
+
+def _truncate_longest(chunks: Dict[str, Dict[str, Any]]) -> bool:
+    cid = max(chunks, key=lambda k: len(chunks[k]["text"]), default=None)
+    if cid is None or len(chunks[cid]["text"]) <= MIN_CHUNK_CHARS:
+        return False
+    text = chunks[cid]["text"]
+    chunks[cid] = {**chunks[cid], "text": text[: max(MIN_CHUNK_CHARS, len(text) // 2)].rstrip() + " ..."}
+    return True
+
+
+def _fit(
+    system: str,
+    build: Callable[[], Dict[str, Any]],
+    state: Dict[str, Any],
+    evidence: Optional[Dict[str, Dict[str, Any]]],
+    chunks: Dict[str, Dict[str, Any]],
+    limits: PayloadLimits,
+    stats: PayloadStats,
+    model: str,
+) -> str:
+    """Shrinks the payload in order of least harm until it fits the budget."""
+    user = _dumps(build())
+    budget = limits.token_budget
+    sys_tokens = count_tokens(system, model)
+    if budget is None or sys_tokens + count_tokens(user, model) <= budget:
+        return user
+
+    def over() -> bool:
+        nonlocal user
+        user = _dumps(build())
+        return sys_tokens + count_tokens(user, model) > budget
+
+    for optional in ("profile_text", "fewshot_examples"):
+        if state.pop(optional, None) is not None and not over():
+            return user
+
+    while evidence is not None and _drop_one_ref(evidence):
+        stats.refs_dropped += 1
+        keep = _referenced(evidence)
+        for cid in [c for c in chunks if c not in keep]:
+            del chunks[cid]
+        if not over():
+            return user
+
+    while _truncate_longest(chunks):
+        stats.chunks_truncated += 1
+        if not over():
+            return user
+    return user
+
+
+def _finish(
+    stats: PayloadStats,
+    system: str,
+    user: str,
+    state: Dict[str, Any],
+    chunks: Dict[str, Dict[str, Any]],
+    evidence: Optional[Dict[str, Dict[str, Any]]],
+    limits: PayloadLimits,
+    model: str,
+) -> None:
+    stats.tokens_system = count_tokens(system, model)
+    stats.tokens_user = count_tokens(user, model)
+    stats.tokens_total = stats.tokens_system + stats.tokens_user
+    stats.chunks = len(chunks)
+    stats.chunk_refs = sum(len(e["chunk_ids"]) for e in evidence.values()) if evidence is not None else len(chunks)
+    stats.profile_included = "profile_text" in state
+    stats.fewshot_included = "fewshot_examples" in state
+    stats.over_budget = limits.token_budget is not None and stats.tokens_total > limits.token_budget
+
+
+def generation_payload(
+    system: str,
+    jd_struct: Dict[str, Any],
+    match_report: Dict[str, Any],
+    evidence_map: Dict[str, Any],
+    profile_text: str,
+    fewshot_examples: Optional[List[Dict[str, Any]]] = None,
+    limits: Optional[PayloadLimits] = None,
+    model: str = "",
+) -> Tuple[str, PayloadStats]:
+    """
+    User message for the generator: jd, match_report, a chunk table and
+    evidence by chunk ID. profile_text is only sent when the chunks cover less
+    than limits.profile_coverage of its terms.
+    """
+    limits = limits or PayloadLimits()
+    stats = PayloadStats()
+    chunks, evidence = chunk_table(evidence_map)
+    stats.profile_coverage = round(profile_coverage(profile_text, chunks), 3)
+
+    state: Dict[str, Any] = {}
+    if stats.profile_coverage < limits.profile_coverage:
+        state["profile_text"] = profile_text or ""
+    if fewshot_examples:
+        state["fewshot_examples"] = fewshot_examples
+
+    def build() -> Dict[str, Any]:
+        payload: Dict[str, Any] = {
+            "jd": jd_struct,
+            "match_report": match_report,
+            "chunks": chunks,
+            "evidence": evidence,
+        }
+        payload.update(state)
+        return payload
+
+    user = _fit(system, build, state, evidence, chunks, limits, stats, model)
+    _finish(stats, system, user, state, chunks, evidence, limits, model)
+    return user, stats
+
+
+def edit_payload(
+    system: str,
+    bullets: List[Dict[str, Any]],
+    evidence_map: Dict[str, Any],
+    limits: Optional[PayloadLimits] = None,
+    model: str = "",
+) -> Tuple[str, PayloadStats]:
+    """User message for the editor: the bullets to fix and only the chunks they cite."""
+    limits = limits or PayloadLimits()
+    stats = PayloadStats()
+    all_chunks, _ = chunk_table(evidence_map)
+
+    cited: List[str] = []
+    for b in bullets:
+        cited.extend(str(x) for x in b.get("evidence_chunks", []) or [])
+    chunks = {cid: all_chunks[cid] for cid in dict.fromkeys(cited) if cid in all_chunks}
+
+    state: Dict[str, Any] = {}
+
+    def build() -> Dict[str, Any]:
+        return {"bullets": bullets, "chunks": chunks}
+
+    user = _fit(system, build, state, None, chunks, limits, stats, model)
+    _finish(stats, system, user, state, chunks, None, limits, model)
+    return user, stats
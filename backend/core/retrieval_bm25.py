@@ -1,13 +1,16 @@
 from __future__ import annotations
 
+import os
+import pickle
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, List
 
 import numpy as np
 from rank_bm25 import BM25Okapi
 
 from .chunking import Chunk
 from .preprocess import tokenize
+from .topk import top_k_indices
 
 
 @dataclass(frozen=True)
@@ -28,16 +31,62 @@ class BM25Index:
         bm25 = BM25Okapi(corpus)
         return cls(bm25, chunks)
 
-    def query(self, query_text: str, top_k: int = 5) -> List[BM25Hit]:
-        q_tokens = tokenize(query_text or "")
-        if not q_tokens:
-            return []
-        scores = np.asarray(self.bm25.get_scores(q_tokens), dtype=float)
-        idxs = np.argsort(-scores)[:top_k]
+    def save(self, dir_path: str) -> None:
+        with open(os.path.join(dir_path, "bm25.pkl"), "wb") as f:
+            pickle.dump(self.bm25, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, dir_path: str, chunks: List[Chunk]) -> "BM25Index":
+        with open(os.path.join(dir_path, "bm25.pkl"), "rb") as f:
+            bm25 = pickle.load(f)
+        return cls(bm25, chunks)
+
+    def _term_scores(self, terms: List[str]) -> np.ndarray:
+        """
+        Per-term BM25 contributions, shape (len(terms), n_chunks), using the
+        same formula as BM25Okapi.get_scores so rows can simply be summed.
+        """
+        bm = self.bm25
+        doc_len = np.asarray(bm.doc_len, dtype=float)
+        norm = bm.k1 * (1 - bm.b + bm.b * doc_len / bm.avgdl)
+        out = np.zeros((len(terms), len(bm.doc_freqs)), dtype=float)
+        for row, term in enumerate(terms):
+            idf = bm.idf.get(term) or 0
+            if not idf:
+                continue
+            q_freq = np.array([(doc.get(term) or 0) for doc in bm.doc_freqs], dtype=float)
+            out[row] = idf * (q_freq * (bm.k1 + 1) / (q_freq + norm))
+        return out
+
+    def _hits(self, scores: np.ndarray, top_k: int) -> List[BM25Hit]:
         out: List[BM25Hit] = []
-        for i in idxs:
+        for i in top_k_indices(scores, top_k):
             sc = float(scores[int(i)])
             if sc <= 0.0:
                 continue
             out.append(BM25Hit(chunk_id=self.chunks[int(i)].chunk_id, score=sc))
         return out
+
+    def query(self, query_text: str, top_k: int = 5) -> List[BM25Hit]:
+        return self.query_many([query_text], top_k=top_k)[0]
+
+    def query_many(self, query_texts: List[str], top_k: int = 5) -> List[List[BM25Hit]]:
+        token_lists = [tokenize(q or "") for q in query_texts]
+
+        vocab: Dict[str, int] = {}
+        for toks in token_lists:
+            for t in toks:
+                vocab.setdefault(t, len(vocab))
+        if not vocab:
+            return [[] for _ in query_texts]
+
+        counts = np.zeros((len(query_texts), len(vocab)), dtype=float)
+        for row, toks in enumerate(token_lists):
+            for t in toks:
+                counts[row, vocab[t]] += 1.0
+
+        scores = counts @ self._term_scores(list(vocab.keys()))
+        return [
+            self._hits(scores[row], top_k) if toks else []
+            for row, toks in enumerate(token_lists)
+        ]
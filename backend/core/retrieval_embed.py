@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import os
 from dataclasses import dataclass
-from typing import Callable, List
+from typing import Callable, List, Tuple
 
 import numpy as np
 
@@ -27,15 +28,18 @@ class EmbedIndex:
         denom = np.linalg.norm(x, axis=1, keepdims=True) + 1e-12
         return x / denom
 
+    @staticmethod
+    def chunk_texts(chunks: List[Chunk]) -> List[str]:
+        return [normalize_text(c.text) for c in chunks]
+
+    @staticmethod
+    def prepare_queries(query_texts: List[str]) -> List[Tuple[int, str]]:
+        live = [(i, (q or "").strip()) for i, q in enumerate(query_texts)]
+        return [(i, normalize_text(q)) for i, q in live if q]
+
     @classmethod
-    def build(
-        cls,
-        chunks: List[Chunk],
-        embed_fn: Callable[[List[str]], np.ndarray],
-        normalize: bool = True,
-    ) -> "EmbedIndex":
-        texts = [normalize_text(c.text) for c in chunks]
-        vecs = embed_fn(texts).astype("float32")
+    def from_vectors(cls, chunks: List[Chunk], vectors: np.ndarray, normalize: bool = True) -> "EmbedIndex":
+        vecs = np.asarray(vectors).astype("float32")
         if normalize:
             vecs = cls.l2_normalize(vecs)
 
@@ -46,6 +50,23 @@ class EmbedIndex:
         index.add(vecs)
         return cls(chunks=chunks, vectors=vecs, index=index)
 
+    @classmethod
+    def build(
+        cls,
+        chunks: List[Chunk],
+        embed_fn: Callable[[List[str]], np.ndarray],
+        normalize: bool = True,
+    ) -> "EmbedIndex":
+        return cls.from_vectors(chunks, embed_fn(cls.chunk_texts(chunks)), normalize=normalize)
+
+    def save(self, dir_path: str) -> None:
+        np.save(os.path.join(dir_path, "vectors.npy"), self.vectors)
+
+    @classmethod
+    def load(cls, dir_path: str, chunks: List[Chunk]) -> "EmbedIndex":
+        vecs = np.load(os.path.join(dir_path, "vectors.npy"))
+        return cls.from_vectors(chunks, vecs, normalize=False)
+
     def query(
         self,
         query_text: str,
@@ -53,20 +74,46 @@ class EmbedIndex:
         top_k: int = 5,
         normalize: bool = True,
     ) -> List[EmbedHit]:
-        qtxt = (query_text or "").strip()
-        if not qtxt:
-            return []
-        q = embed_fn([normalize_text(qtxt)]).astype("float32")
+        return self.query_many([query_text], embed_fn=embed_fn, top_k=top_k, normalize=normalize)[0]
+
+    def query_many(
+        self,
+        query_texts: List[str],
+        embed_fn: Callable[[List[str]], np.ndarray],
+        top_k: int = 5,
+        normalize: bool = True,
+    ) -> List[List[EmbedHit]]:
+        live = self.prepare_queries(query_texts)
+        if not live:
+            return [[] for _ in query_texts]
+        q = embed_fn([qtxt for _, qtxt in live])
+        return self.search_many(len(query_texts), live, q, top_k=top_k, normalize=normalize)
+
+    def search_many(
+        self,
+        n_queries: int,
+        live: List[Tuple[int, str]],
+        query_vectors: np.ndarray,
+        top_k: int = 5,
+        normalize: bool = True,
+    ) -> List[List[EmbedHit]]:
+        out: List[List[EmbedHit]] = [[] for _ in range(n_queries)]
+        if not live:
+            return out
+
+        q = np.asarray(query_vectors).astype("float32")
         if normalize:
             q = self.l2_normalize(q)
 
         scores, idxs = self.index.search(q, top_k)
-        out: List[EmbedHit] = []
-        for sc, ix in zip(scores[0].tolist(), idxs[0].tolist()):
-            if ix < 0:
-                continue
-            scf = float(sc)
-            if scf <= 0.0:
-                continue
-            out.append(EmbedHit(chunk_id=self.chunks[int(ix)].chunk_id, score=scf))
+        for row, (i, _) in enumerate(live):
+            hits: List[EmbedHit] = []
+            for sc, ix in zip(scores[row].tolist(), idxs[row].tolist()):
+                if ix < 0:
+                    continue
+                scf = float(sc)
+                if scf <= 0.0:
+                    continue
+                hits.append(EmbedHit(chunk_id=self.chunks[int(ix)].chunk_id, score=scf))
+            out[i] = hits
         return out
@@ -1,14 +1,18 @@
 from __future__ import annotations
 
+import os
+import pickle
 from dataclasses import dataclass
 from typing import List
 
 import numpy as np
+import scipy.sparse as sp
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 
 from .chunking import Chunk
 from .preprocess import normalize_text
+from .topk import top_k_indices
 
 
 @dataclass(frozen=True)
@@ -32,20 +36,40 @@ class TfidfIndex:
         matrix = vectorizer.fit_transform(docs)
         return cls(vectorizer, matrix, chunks)
 
+    def save(self, dir_path: str) -> None:
+        with open(os.path.join(dir_path, "vectorizer.pkl"), "wb") as f:
+            pickle.dump(self.vectorizer, f, protocol=pickle.HIGHEST_PROTOCOL)
+        sp.save_npz(os.path.join(dir_path, "matrix.npz"), sp.csr_matrix(self.matrix))
 
-    def query(self, query_text: str, top_k: int = 5) -> List[TfidfHit]:
-        qtxt = (query_text or "").strip()
-        if not qtxt:
-            return []
-        q = self.vectorizer.transform([normalize_text(qtxt)])
-        sims = cosine_similarity(q, self.matrix).ravel()
-        if sims.size == 0:
-            return []
-        idxs = np.argsort(-sims)[:top_k]
+    @classmethod
+    def load(cls, dir_path: str, chunks: List[Chunk]) -> "TfidfIndex":
+        with open(os.path.join(dir_path, "vectorizer.pkl"), "rb") as f:
+            vectorizer = pickle.load(f)
+        matrix = sp.load_npz(os.path.join(dir_path, "matrix.npz"))
+        return cls(vectorizer, matrix, chunks)
+
+    def _hits(self, sims: np.ndarray, top_k: int) -> List[TfidfHit]:
         out: List[TfidfHit] = []
-        for i in idxs:
+        for i in top_k_indices(sims, top_k):
             sc = float(sims[int(i)])
             if sc <= 0.0:
                 continue
             out.append(TfidfHit(chunk_id=self.chunks[int(i)].chunk_id, score=sc))
         return out
+
+    def query(self, query_text: str, top_k: int = 5) -> List[TfidfHit]:
+        return self.query_many([query_text], top_k=top_k)[0]
+
+    def query_many(self, query_texts: List[str], top_k: int = 5) -> List[List[TfidfHit]]:
+        out: List[List[TfidfHit]] = [[] for _ in query_texts]
+        live = [(i, (q or "").strip()) for i, q in enumerate(query_texts)]
+        live = [(i, q) for i, q in live if q]
+        if not live:
+            return out
+        q = self.vectorizer.transform([normalize_text(qtxt) for _, qtxt in live])
+        sims = cosine_similarity(q, self.matrix)
+        if sims.shape[1] == 0:
+            return out
+        for row, (i, _) in enumerate(live):
+            out[i] = self._hits(np.asarray(sims[row]).ravel(), top_k)
+        return out
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .timing import StageTimer
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    fn: Callable[..., Any]
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class StageRun:
+    name: str
+    start_ms: float
+    wall_ms: float
+
+
+class StageGraph:
+    """
+    A DAG of named stages wired together by the values they consume and produce.
+
+    A stage is called with its inputs as positional arguments, in declaration
+    order. With one output its return value is stored under that name; with
+    several it must return a tuple of matching length. Every value is written
+    by exactly one stage, so results do not depend on scheduling order.
+    """
+
+    def __init__(self, stages: Sequence[Stage], initial: Sequence[str] = ()):
+        self.stages = list(stages)
+        self.producer: Dict[str, str] = {k: "" for k in initial}
+
+        names = set()
+        for st in self.stages:
+            if st.name in names:
+                raise ValueError(f"duplicate stage name: {st.name}")
+            names.add(st.name)
+            for out in st.outputs:
+                if out in self.producer:
+                    raise ValueError(f"value '{out}' produced by more than one stage")
+                self.producer[out] = st.name
+
+        for st in self.stages:
+            for inp in st.inputs:
+                if inp not in self.producer:
+                    raise ValueError(f"stage '{st.name}' needs '{inp}', which nothing produces")
+
+        self.deps: Dict[str, List[str]] = {
+            st.name: sorted({self.producer[i] for i in st.inputs if self.producer[i]}) for st in self.stages
+        }
+        self._check_acyclic()
+
+    def _check_acyclic(self) -> None:
+        state: Dict[str, int] = {}
+
+        def visit(name: str) -> None:
+            if state.get(name) == 1:
+                raise ValueError(f"stage graph has a cycle through '{name}'")
+            if state.get(name) == 2:
+                return
+            state[name] = 1
+            for d in self.deps[name]:
+                visit(d)
+            state[name] = 2
+
+        for st in self.stages:
+            visit(st.name)
+
+    def critical_path(self, runs: Dict[str, StageRun]) -> Tuple[List[str], float]:
+        """Longest wall-time chain through the stages that ran."""
+        best: Dict[str, Tuple[float, List[str]]] = {}
+
+        def longest(name: str) -> Tuple[float, List[str]]:
+            if name in best:
+                return best[name]
+            own = runs[name].wall_ms if name in runs else 0.0
+            chains = [longest(d) for d in self.deps[name]]
+            base = max(chains, key=lambda c: c[0]) if chains else (0.0, [])
+            best[name] = (base[0] + own, base[1] + [name])
+            return best[name]
+
+        if not self.stages:
+            return [], 0.0
+        total, path = max((longest(st.name) for st in self.stages), key=lambda c: c[0])
+        return path, total
+
+
+class StageScheduler:
+    """
+    Runs a StageGraph, starting each stage once its inputs exist. Up to
+    max_workers stages of this run are in flight at once, on executor (a
+    pool shared across runs); with max_workers 1 or no executor the stages
+    run inline on the calling thread.
+    """
+
+    def __init__(
+        self,
+        graph: StageGraph,
+        max_workers: int = 4,
+        timer: Optional[StageTimer] = None,
+        executor: Optional[Executor] = None,
+    ):
+        self.graph = graph
+        self.max_workers = max(1, int(max_workers))
+        self.executor = executor
+        self.timer = timer or StageTimer(enabled=False)
+        self.runs: Dict[str, StageRun] = {}
+        self._t0 = 0.0
+
+    def _call(self, st: Stage, values: Dict[str, Any]) -> Dict[str, Any]:
+        args = [values[i] for i in st.inputs]
+        t0 = time.perf_counter()
+        with self.timer.stage(st.name):
+            result = st.fn(*args)
+        t1 = time.perf_counter()
+        self.runs[st.name] = StageRun(
+            name=st.name,
+            start_ms=1000.0 * (t0 - self._t0),
+            wall_ms=1000.0 * (t1 - t0),
+        )
+
+        if len(st.outputs) == 0:
+            return {}
+        if len(st.outputs) == 1:
+            return {st.outputs[0]: result}
+        if not isinstance(result, tuple) or len(result) != len(st.outputs):
+            raise ValueError(f"stage '{st.name}' must return {len(st.outputs)} values")
+        return dict(zip(st.outputs, result))
+
+    def run(self, initial: Dict[str, Any]) -> Dict[str, Any]:
+        values: Dict[str, Any] = dict(initial)
+        self._t0 = time.perf_counter()
+
+        if self.max_workers == 1 or self.executor is None:
+            done: set = set()
+            pending = list(self.graph.stages)
+            while pending:
+                st = next(s for s in pending if all(d in done for d in self.graph.deps[s.name]))
+                values.update(self._call(st, values))
+                done.add(st.name)
+                pending.remove(st)
+            return values
+
+        done_names: set = set()
+        waiting = list(self.graph.stages)
+        running: Dict[Future, Stage] = {}
+
+        while waiting or running:
+            ready = [s for s in waiting if all(d in done_names for d in self.graph.deps[s.name])]
+            for st in ready[: self.max_workers - len(running)]:
+                waiting.remove(st)
+                running[self.executor.submit(self._call, st, values)] = st
+
+            finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for fut in sorted(finished, key=lambda f: running[f].name):
+                st = running.pop(fut)
+                try:
+                    values.update(fut.result())
+                except BaseException:
+                    for other in running:
+                        other.cancel()
+                    # the executor outlives this run, so wait for stages already started
+                    wait(list(running))
+                    raise
+                done_names.add(st.name)
+
+        return values
+
+    def critical_path(self) -> Dict[str, Any]:
+        path, total = self.graph.critical_path(self.runs)
+        return {"stages": path, "wall_ms": round(total, 3)}
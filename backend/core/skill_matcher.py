@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Dict, Iterable, List, Mapping, Set, Tuple
+
+
+class SkillMatcher:
+    """
+    Token-level Aho-Corasick automaton over normalized aliases.
+
+    An alias matches when its tokens appear as a contiguous run of tokens in the
+    normalized text, which is the same rule as the padded substring check
+    `f" {alias} " in f" {text} "` used before.
+    """
+
+    def __init__(
+        self,
+        goto: List[Dict[str, int]],
+        fail: List[int],
+        outputs: List[Tuple[str, ...]],
+    ):
+        self.goto = goto
+        self.fail = fail
+        self.outputs = outputs
+
+    @classmethod
+    def build(cls, alias_to_canonical: Mapping[str, str]) -> "SkillMatcher":
+        goto: List[Dict[str, int]] = [{}]
+        own: List[Set[str]] = [set()]
+
+        for alias_norm, canon in alias_to_canonical.items():
+            if not alias_norm:
+                continue
+            node = 0
+            for tok in alias_norm.split(" "):
+                nxt = goto[node].get(tok)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][tok] = nxt
+                    goto.append({})
+                    own.append(set())
+                node = nxt
+            own[node].add(canon)
+
+        fail = [0] * len(goto)
+        merged: List[Set[str]] = [set(s) for s in own]
+        queue: deque[int] = deque(goto[0].values())
+
+        while queue:
+            node = queue.popleft()
+            for tok, child in goto[node].items():
+                f = fail[node]
+                while f and tok not in goto[f]:
+                    f = fail[f]
+                fail[child] = goto[f].get(tok, 0)
+                merged[child] |= merged[fail[child]]
+                queue.append(child)
+
+        outputs = [tuple(sorted(s)) for s in merged]
+        return cls(goto=goto, fail=fail, outputs=outputs)
+
+    @property
+    def size(self) -> int:
+        return len(self.goto)
+
+    def find(self, tokens: Iterable[str]) -> Set[str]:
+        goto = self.goto
+        fail = self.fail
+        outputs = self.outputs
+        found: Set[str] = set()
+        node = 0
+        for tok in tokens:
+            while node and tok not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(tok, 0)
+            if outputs[node]:
+                found.update(outputs[node])
+        return found
+
+    def find_in_normalized(self, text_norm: str) -> Set[str]:
+        if not text_norm:
+            return set()
+        return self.find(text_norm.split(" "))
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, List, Set
+from typing import Any, Dict, List, Set
 
 import yaml
 
 from .preprocess import normalize_text
+from .skill_matcher import SkillMatcher
 
 
 @dataclass
@@ -23,11 +24,30 @@ class SkillTaxonomy:
             self.alias_to_canonical[normalize_text(canon)] = canon
             for a in entry.aliases:
                 self.alias_to_canonical[normalize_text(a)] = canon
+        self.matcher = SkillMatcher.build(self.alias_to_canonical)
+
+    @classmethod
+    def from_compiled(
+        cls,
+        entries: Dict[str, SkillEntry],
+        alias_to_canonical: Dict[str, str],
+        matcher: SkillMatcher,
+    ) -> "SkillTaxonomy":
+        obj = cls.__new__(cls)
+        obj.entries = entries
+        obj.alias_to_canonical = alias_to_canonical
+        obj.matcher = matcher
+        return obj
 
     @classmethod
     def from_yaml(cls, path: str) -> "SkillTaxonomy":
         with open(path, "r", encoding="utf-8") as f:
             raw = yaml.safe_load(f) or {}
+        return cls.from_dict(raw)
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> "SkillTaxonomy":
+        """Same layout as skills.yaml: canonical -> {aliases, related}."""
         entries: Dict[str, SkillEntry] = {}
         for canon, obj in raw.items():
             canon_norm = normalize_text(str(canon))
@@ -48,12 +68,4 @@ class SkillTaxonomy:
         return sorted(self.entries.keys())
 
     def extract_skills(self, text: str) -> Set[str]:
-        t = normalize_text(text)
-        found: Set[str] = set()
-        padded = f" {t} "
-        for alias_norm, canon in self.alias_to_canonical.items():
-            if not alias_norm:
-                continue
-            if f" {alias_norm} " in padded:
-                found.add(canon)
-        return found
+        return self.matcher.find_in_normalized(normalize_text(text))
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import hashlib
+import os
+import pickle
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from .skill_matcher import SkillMatcher
+from .skill_taxonomy import SkillEntry, SkillTaxonomy
+
+SNAPSHOT_VERSION = 1
+
+
+def _file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _source_meta(path: str) -> Dict[str, Any]:
+    st = os.stat(path)
+    return {"sha256": _file_sha256(path), "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+
+def _freshness(source: Dict[str, Any], yaml_path: str) -> Optional[Dict[str, Any]]:
+    """
+    None if the YAML changed since the snapshot. Otherwise the source stamp
+    to keep: the stored one, or, when only mtime/size moved (e.g. a fresh
+    checkout) but the hash still matches, a restamped copy.
+    """
+    st = os.stat(yaml_path)
+    if source.get("mtime_ns") == st.st_mtime_ns and source.get("size") == st.st_size:
+        return source
+    if source.get("sha256") != _file_sha256(yaml_path):
+        return None
+    return {**source, "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+
+def _to_payload(taxonomy: SkillTaxonomy, source: Dict[str, Any]) -> Dict[str, Any]:
+    m = taxonomy.matcher
+    return {
+        "version": SNAPSHOT_VERSION,
+        "source": source,
+        "entries": {
+            canon: (sorted(e.aliases), sorted(e.related)) for canon, e in taxonomy.entries.items()
+        },
+        "alias_to_canonical": taxonomy.alias_to_canonical,
+        "matcher": (m.goto, m.fail, m.outputs),
+    }
+
+
+def _from_payload(payload: Dict[str, Any]) -> SkillTaxonomy:
+    entries = {
+        canon: SkillEntry(canonical=canon, aliases=set(aliases), related=set(related))
+        for canon, (aliases, related) in payload["entries"].items()
+    }
+    goto, fail, outputs = payload["matcher"]
+    return SkillTaxonomy.from_compiled(
+        entries=entries,
+        alias_to_canonical=payload["alias_to_canonical"],
+        matcher=SkillMatcher(goto=goto, fail=fail, outputs=outputs),
+    )
+
+
+def _read_payload(snapshot_path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(snapshot_path):
+        return None
+    try:
+        with open(snapshot_path, "rb") as f:
+            payload = pickle.load(f)
+    except Exception:
+        return None
+    if not isinstance(payload, dict) or payload.get("version") != SNAPSHOT_VERSION:
+        return None
+    return payload
+
+
+def _write_payload(payload: Dict[str, Any], snapshot_path: str) -> None:
+    d = os.path.dirname(snapshot_path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    tmp = f"{snapshot_path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, snapshot_path)
+
+
+def compile_snapshot(yaml_path: str, snapshot_path: str) -> SkillTaxonomy:
+    source = _source_meta(yaml_path)
+    taxonomy = SkillTaxonomy.from_yaml(yaml_path)
+    _write_payload(_to_payload(taxonomy, source), snapshot_path)
+    return taxonomy
+
+
+def load_taxonomy(yaml_path: str, snapshot_path: Optional[str] = None) -> SkillTaxonomy:
+    """
+    Loads the taxonomy from its binary snapshot, recompiling it from YAML
+    when the snapshot is missing, from another format version, or stale.
+    """
+    if not snapshot_path:
+        return SkillTaxonomy.from_yaml(yaml_path)
+
+    payload = _read_payload(snapshot_path)
+    if payload is not None:
+        source = payload.get("source") or {}
+        fresh = _freshness(source, yaml_path)
+        if fresh is not None:
+            if fresh is not source:
+                # so the next load takes the mtime/size fast path instead of hashing again
+                payload["source"] = fresh
+                with contextlib.suppress(OSError):
+                    _write_payload(payload, snapshot_path)
+            return _from_payload(payload)
+
+    try:
+        return compile_snapshot(yaml_path, snapshot_path)
+    except OSError:
+        return SkillTaxonomy.from_yaml(yaml_path)
+
+
+def _time_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return 1000.0 * best
+
+
+def main() -> None:
+    from config import AppConfig
+
+    cfg = AppConfig()
+    ap = argparse.ArgumentParser(description="Compile the skills taxonomy into a binary snapshot.")
+    ap.add_argument("--yaml", default=cfg.skills_yaml_path)
+    ap.add_argument("--snapshot", default=cfg.skills_snapshot_path)
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    taxonomy = compile_snapshot(args.yaml, args.snapshot)
+    print(f"compiled {len(taxonomy.entries)} skills / {len(taxonomy.alias_to_canonical)} aliases -> {args.snapshot}")
+
+    t_yaml = _time_ms(lambda: SkillTaxonomy.from_yaml(args.yaml), args.repeat)
+    t_snap = _time_ms(lambda: load_taxonomy(args.yaml, args.snapshot), args.repeat)
+    print(f"yaml load:     {t_yaml:8.2f} ms")
+    print(f"snapshot load: {t_snap:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
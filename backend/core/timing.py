@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .metrics import STAGE_SECONDS
+
+
+@dataclass(frozen=True)
+class StageTiming:
+    name: str
+    wall_ms: float
+    cpu_ms: Optional[float]
+
+
+_NULL = nullcontext()
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class StageTimer:
+    """
+    Records wall-clock and thread CPU time per named pipeline stage.
+
+    A stage opened on an event loop thread may await, and the loop then runs
+    other coroutines on the same thread, so such stages report wall time
+    only (cpu_ms None). Work offloaded through wrap() is measured on the
+    executor thread and gets both.
+
+    With metrics set, each stage's wall time is also observed in the
+    process-wide stage histogram, whether or not timings are collected.
+    When neither is on, stage() hands back a shared no-op context manager,
+    so the instrumentation costs one attribute check per stage.
+    """
+
+    def __init__(self, enabled: bool = True, metrics: bool = False):
+        self.enabled = enabled
+        self.metrics = metrics
+        self.stages: List[StageTiming] = []
+        self.notes: Dict[str, Any] = {}
+        self._t0 = time.perf_counter() if enabled else 0.0
+
+    @property
+    def active(self) -> bool:
+        return self.enabled or self.metrics
+
+    def stage(self, name: str):
+        if not self.active:
+            return _NULL
+        return self._measure(name, cpu=not _on_event_loop())
+
+    @contextmanager
+    def _measure(self, name: str, cpu: bool = True) -> Iterator[None]:
+        w0 = time.perf_counter()
+        cpu = cpu and self.enabled
+        c0 = time.thread_time() if cpu else 0.0
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - w0
+            if self.metrics:
+                STAGE_SECONDS.observe(wall, stage=name)
+            if self.enabled:
+                self.stages.append(
+                    StageTiming(
+                        name=name,
+                        wall_ms=1000.0 * wall,
+                        cpu_ms=1000.0 * (time.thread_time() - c0) if cpu else None,
+                    )
+                )
+
+    def note(self, name: str, value: Any) -> None:
+        """Attaches a measurement that is not a duration (e.g. payload token counts)."""
+        if self.enabled:
+            self.notes[name] = value
+
+    def wrap(self, name: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+        """Times fn inside whichever thread ends up calling it (e.g. an executor)."""
+        if not self.active:
+            return fn
+
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            with self._measure(name):
+                return fn(*args, **kwargs)
+
+        return timed
+
+    def as_dict(self) -> Dict[str, Any]:
+        out = {
+            "stages": [
+                {
+                    "name": s.name,
+                    "wall_ms": round(s.wall_ms, 3),
+                    "cpu_ms": round(s.cpu_ms, 3) if s.cpu_ms is not None else None,
+                }
+                for s in self.stages
+            ],
+            "total_wall_ms": round(sum(s.wall_ms for s in self.stages), 3),
+            "total_cpu_ms": round(sum(s.cpu_ms for s in self.stages if s.cpu_ms is not None), 3),
+            "elapsed_ms": round(1000.0 * (time.perf_counter() - self._t0), 3),
+        }
+        if self.notes:
+            out["notes"] = dict(self.notes)
+        return out
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Set
+from typing import Any, Dict, List, Optional, Set
 
 from .skill_taxonomy import SkillTaxonomy
 from .preprocess import normalize_text
@@ -20,7 +20,7 @@ class ValidationResult:
     warnings: List[ValidationWarning]
 
 
-def _collect_evidence_chunk_ids(evidence_map: Dict[str, Any]) -> Set[str]:
+def collect_evidence_chunk_ids(evidence_map: Dict[str, Any]) -> Set[str]:
     ids: Set[str] = set()
     for _, item in evidence_map.items():
         chunks = item.get("chunks") if isinstance(item, dict) else getattr(item, "chunks", [])
@@ -31,53 +31,50 @@ def _collect_evidence_chunk_ids(evidence_map: Dict[str, Any]) -> Set[str]:
     return ids
 
 
-def validate_generation(
-    generation: Dict[str, Any],
-    evidence_map: Dict[str, Any],
+def validate_bullet(
+    bullet: Any,
+    index: int,
+    evidence_ids: Set[str],
     taxonomy: SkillTaxonomy,
     max_bullet_words: int = 28,
-) -> ValidationResult:
+) -> List[ValidationWarning]:
+    """The per-bullet checks of validate_generation, for resume_bullets[index]."""
     warnings: List[ValidationWarning] = []
-    evidence_ids = _collect_evidence_chunk_ids(evidence_map)
-
-    bullets = generation.get("resume_bullets", [])
-    if not isinstance(bullets, list):
-        warnings.append(ValidationWarning("FORMAT", "resume_bullets must be a list", "resume_bullets"))
-        return ValidationResult(ok=False, warnings=warnings)
-
-    for i, b in enumerate(bullets):
-        path = f"resume_bullets[{i}]"
-        if not isinstance(b, dict):
-            warnings.append(ValidationWarning("FORMAT", "bullet must be an object", path))
-            continue
-        text = str(b.get("text", "")).strip()
-        ev = b.get("evidence_chunks", [])
-        skills_used = b.get("skills_used", [])
-
-        if not text:
-            warnings.append(ValidationWarning("EMPTY", "bullet text is empty", f"{path}.text"))
-        else:
-            wc = len(text.split())
-            if wc > max_bullet_words:
-                warnings.append(ValidationWarning("LENGTH", f"bullet too long: {wc} words", f"{path}.text"))
-            if " i " in f" {normalize_text(text)} " or " my " in f" {normalize_text(text)} ":
-                warnings.append(ValidationWarning("STYLE", "first-person pronoun in resume bullet", f"{path}.text"))
-
-        if not isinstance(ev, list) or not ev:
-            warnings.append(ValidationWarning("GROUNDING", "missing evidence_chunks", f"{path}.evidence_chunks"))
-        else:
-            for j, cid in enumerate(ev):
-                if str(cid) not in evidence_ids:
-                    warnings.append(ValidationWarning("GROUNDING", "unknown chunk_id in evidence_chunks", f"{path}.evidence_chunks[{j}]"))
+    path = f"resume_bullets[{index}]"
+    if not isinstance(bullet, dict):
+        warnings.append(ValidationWarning("FORMAT", "bullet must be an object", path))
+        return warnings
+    text = str(bullet.get("text", "")).strip()
+    ev = bullet.get("evidence_chunks", [])
+    skills_used = bullet.get("skills_used", [])
+
+    if not text:
+        warnings.append(ValidationWarning("EMPTY", "bullet text is empty", f"{path}.text"))
+    else:
+        wc = len(text.split())
+        if wc > max_bullet_words:
+            warnings.append(ValidationWarning("LENGTH", f"bullet too long: {wc} words", f"{path}.text"))
+        if " i " in f" {normalize_text(text)} " or " my " in f" {normalize_text(text)} ":
+            warnings.append(ValidationWarning("STYLE", "first-person pronoun in resume bullet", f"{path}.text"))
+
+    if not isinstance(ev, list) or not ev:
+        warnings.append(ValidationWarning("GROUNDING", "missing evidence_chunks", f"{path}.evidence_chunks"))
+    else:
+        for j, cid in enumerate(ev):
+            if str(cid) not in evidence_ids:
+                warnings.append(ValidationWarning("GROUNDING", "unknown chunk_id in evidence_chunks", f"{path}.evidence_chunks[{j}]"))
+
+    if isinstance(skills_used, list):
+        for j, s in enumerate(skills_used):
+            if not taxonomy.is_known_skill(str(s)):
+                warnings.append(ValidationWarning("SKILL", "unknown skill in skills_used", f"{path}.skills_used[{j}]"))
+    else:
+        warnings.append(ValidationWarning("FORMAT", "skills_used must be a list", f"{path}.skills_used"))
+    return warnings
 
-        if isinstance(skills_used, list):
-            for j, s in enumerate(skills_used):
-                if not taxonomy.is_known_skill(str(s)):
-                    warnings.append(ValidationWarning("SKILL", "unknown skill in skills_used", f"{path}.skills_used[{j}]"))
-        else:
-            warnings.append(ValidationWarning("FORMAT", "skills_used must be a list", f"{path}.skills_used"))
 
-    cover = generation.get("cover_letter", {})
+def validate_cover_letter(cover: Any, evidence_ids: Set[str]) -> List[ValidationWarning]:
+    warnings: List[ValidationWarning] = []
     if isinstance(cover, dict):
         ev = cover.get("evidence_chunks", [])
         if not isinstance(ev, list) or not ev:
@@ -88,34 +85,62 @@ def validate_generation(
                     warnings.append(ValidationWarning("GROUNDING", "unknown chunk_id in cover_letter evidence", f"cover_letter.evidence_chunks[{j}]"))
     else:
         warnings.append(ValidationWarning("FORMAT", "cover_letter must be an object", "cover_letter"))
+    return warnings
+
+
+def validate_generation(
+    generation: Dict[str, Any],
+    evidence_map: Dict[str, Any],
+    taxonomy: SkillTaxonomy,
+    max_bullet_words: int = 28,
+) -> ValidationResult:
+    warnings: List[ValidationWarning] = []
+    evidence_ids = collect_evidence_chunk_ids(evidence_map)
+
+    bullets = generation.get("resume_bullets", [])
+    if not isinstance(bullets, list):
+        warnings.append(ValidationWarning("FORMAT", "resume_bullets must be a list", "resume_bullets"))
+        return ValidationResult(ok=False, warnings=warnings)
+
+    for i, b in enumerate(bullets):
+        warnings.extend(validate_bullet(b, i, evidence_ids, taxonomy, max_bullet_words))
+
+    warnings.extend(validate_cover_letter(generation.get("cover_letter", {}), evidence_ids))
 
     ok = all(w.code not in {"FORMAT"} for w in warnings)
     return ValidationResult(ok=ok, warnings=warnings)
 
 
+def ground_bullet(bullet: Any, evidence_ids: Set[str], taxonomy: SkillTaxonomy) -> Optional[Dict[str, Any]]:
+    """The bullet as enforce_grounding keeps it, or None if it would be dropped."""
+    if not isinstance(bullet, dict):
+        return None
+    text = str(bullet.get("text", "")).strip()
+    ev = bullet.get("evidence_chunks", [])
+    if not text or not isinstance(ev, list) or not ev:
+        return None
+    if any(str(cid) not in evidence_ids for cid in ev):
+        return None
+    skills_used = bullet.get("skills_used", [])
+    if isinstance(skills_used, list):
+        skills_used = [s for s in skills_used if taxonomy.is_known_skill(str(s))]
+    return {"text": text, "evidence_chunks": ev, "skills_used": skills_used}
+
+
 def enforce_grounding(
     generation: Dict[str, Any],
     evidence_map: Dict[str, Any],
     taxonomy: SkillTaxonomy,
 ) -> Dict[str, Any]:
-    evidence_ids = _collect_evidence_chunk_ids(evidence_map)
+    evidence_ids = collect_evidence_chunk_ids(evidence_map)
 
     bullets = generation.get("resume_bullets", [])
     if isinstance(bullets, list):
         cleaned: List[Dict[str, Any]] = []
         for b in bullets:
-            if not isinstance(b, dict):
-                continue
-            text = str(b.get("text", "")).strip()
-            ev = b.get("evidence_chunks", [])
-            if not text or not isinstance(ev, list) or not ev:
-                continue
-            if any(str(cid) not in evidence_ids for cid in ev):
-                continue
-            skills_used = b.get("skills_used", [])
-            if isinstance(skills_used, list):
-                skills_used = [s for s in skills_used if taxonomy.is_known_skill(str(s))]
-            cleaned.append({"text": text, "evidence_chunks": ev, "skills_used": skills_used})
+            kept = ground_bullet(b, evidence_ids, taxonomy)
+            if kept is not None:
+                cleaned.append(kept)
         generation["resume_bullets"] = cleaned
 
     cover = generation.get("cover_letter", {})
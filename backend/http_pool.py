@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import threading
+import weakref
+from typing import Any, Dict, List
+
+import httpx
+
+from config import AppConfig
+
+
+class _PoolCounters:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # connections already counted; weak so closed ones can be collected
+        self._seen: "weakref.WeakSet[Any]" = weakref.WeakSet()
+        self.counts: Dict[str, int] = {
+            "requests_total": 0,
+            "requests_in_flight": 0,
+            "max_in_flight": 0,
+            "errors_total": 0,
+            "connections_created": 0,
+        }
+
+    def started(self) -> None:
+        with self._lock:
+            self.counts["requests_total"] += 1
+            self.counts["requests_in_flight"] += 1
+            self.counts["max_in_flight"] = max(self.counts["max_in_flight"], self.counts["requests_in_flight"])
+
+    def finished(self, ok: bool) -> None:
+        with self._lock:
+            self.counts["requests_in_flight"] -= 1
+            if not ok:
+                self.counts["errors_total"] += 1
+
+    def observe(self, pool: Any) -> List[Any]:
+        """
+        Counts connections in the pool that were not there before. Called after
+        every request, so a connection is only missed if it is opened and
+        closed again before its own request finishes.
+        """
+        conns = list(getattr(pool, "connections", []) or [])
+        with self._lock:
+            for c in conns:
+                if c not in self._seen:
+                    self._seen.add(c)
+                    self.counts["connections_created"] += 1
+        return conns
+
+    def snapshot(self, pool: Any, limits: httpx.Limits) -> Dict[str, Any]:
+        conns = self.observe(pool)
+        with self._lock:
+            out: Dict[str, Any] = dict(self.counts)
+        out["connections_open"] = len(conns)
+        out["connections_idle"] = sum(1 for c in conns if c.is_idle())
+        out["max_connections"] = limits.max_connections
+        out["max_keepalive_connections"] = limits.max_keepalive_connections
+        return out
+
+
+class PooledTransport(httpx.HTTPTransport):
+    """httpx transport with keep-alive pooling that also keeps request/connection counters."""
+
+    def __init__(self, limits: httpx.Limits, **kwargs: Any):
+        super().__init__(limits=limits, **kwargs)
+        self.limits = limits
+        self.counters = _PoolCounters()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.counters.started()
+        ok = False
+        try:
+            response = super().handle_request(request)
+            ok = response.status_code < 500
+            return response
+        finally:
+            self.counters.finished(ok)
+            self.counters.observe(getattr(self, "_pool", None))
+
+    def stats(self) -> Dict[str, Any]:
+        return self.counters.snapshot(getattr(self, "_pool", None), self.limits)
+
+
+class AsyncPooledTransport(httpx.AsyncHTTPTransport):
+    def __init__(self, limits: httpx.Limits, **kwargs: Any):
+        super().__init__(limits=limits, **kwargs)
+        self.limits = limits
+        self.counters = _PoolCounters()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.counters.started()
+        ok = False
+        try:
+            response = await super().handle_async_request(request)
+            ok = response.status_code < 500
+            return response
+        finally:
+            self.counters.finished(ok)
+            self.counters.observe(getattr(self, "_pool", None))
+
+    def stats(self) -> Dict[str, Any]:
+        return self.counters.snapshot(getattr(self, "_pool", None), self.limits)
+
+
+def pool_limits(cfg: AppConfig) -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=cfg.http_max_connections,
+        max_keepalive_connections=cfg.http_max_keepalive_connections,
+        keepalive_expiry=cfg.http_keepalive_expiry_s,
+    )
+
+
+def pool_timeout(cfg: AppConfig) -> httpx.Timeout:
+    return httpx.Timeout(
+        connect=cfg.http_connect_timeout_s,
+        read=cfg.http_read_timeout_s,
+        write=cfg.http_read_timeout_s,
+        pool=cfg.http_pool_timeout_s,
+    )
+
+
+def build_http_client(transport: PooledTransport, cfg: AppConfig) -> httpx.Client:
+    return httpx.Client(transport=transport, timeout=pool_timeout(cfg), follow_redirects=True)
+
+
+def build_async_http_client(transport: AsyncPooledTransport, cfg: AppConfig) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=transport, timeout=pool_timeout(cfg), follow_redirects=True)
@@ -0,0 +1,402 @@
+"""
+Durable job queue for pipeline runs, stored in SQLite, and the local worker
+processes that drain it.
+
+    python -m job_queue --workers 4          # run workers next to the API
+    POST /jobs  ->  {"job_id": ...}
+    GET /jobs/{job_id}  ->  {"status": "queued" | "running" | "done" | "failed", ...}
+
+A claimed job is leased to its worker for visibility_timeout_s; the worker
+extends the lease while the pipeline runs. If the worker dies, the lease
+runs out and another worker picks the job up again. Failed attempts are
+retried with exponential backoff up to max_attempts. Finished jobs are
+kept for result_ttl_s.
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import json
+import logging
+import multiprocessing as mp
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from config import AppConfig
+
+log = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    lease_owner TEXT,
+    available_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    finished_at REAL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, available_at);
+CREATE INDEX IF NOT EXISTS jobs_expiry ON jobs (expires_at);
+"""
+
+
+class JobQueue:
+    """
+    SQLite-backed queue. Every call opens its own short-lived connection, so
+    one instance can be shared by threads and each worker process opens the
+    same file independently. Claims take a write lock (BEGIN IMMEDIATE), so
+    two workers never lease the same job.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        visibility_timeout_s: float = 300.0,
+        max_attempts: int = 3,
+        result_ttl_s: float = 24 * 3600.0,
+        retry_backoff_s: float = 2.0,
+    ):
+        self.db_path = db_path
+        self.visibility_timeout_s = float(visibility_timeout_s)
+        self.max_attempts = max(1, int(max_attempts))
+        self.result_ttl_s = float(result_ttl_s)
+        self.retry_backoff_s = float(retry_backoff_s)
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        db = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        try:
+            db.execute("PRAGMA busy_timeout=30000")
+            yield db
+        finally:
+            db.close()
+
+    def submit(self, payload: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as db:
+            db.execute(
+                "INSERT INTO jobs (id, status, payload, max_attempts, available_at, created_at, updated_at) "
+                "VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, json.dumps(payload, ensure_ascii=False), self.max_attempts, now, now, now),
+            )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as db:
+            row = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None or (row["expires_at"] is not None and row["expires_at"] <= time.time()):
+            return None
+        out: Dict[str, Any] = {
+            "job_id": row["id"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "max_attempts": row["max_attempts"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "finished_at": row["finished_at"],
+        }
+        if row["result"] is not None:
+            out["result"] = json.loads(row["result"])
+        if row["error"] is not None:
+            out["error"] = row["error"]
+        return out
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Leases the oldest ready job: queued and due, or running with an
+        expired lease. A job whose lease expired on its last attempt is
+        marked failed instead.
+        """
+        now = time.time()
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    row = db.execute(
+                        "SELECT id, status, payload, attempts, max_attempts FROM jobs "
+                        "WHERE status IN ('queued', 'running') AND available_at <= ? "
+                        "ORDER BY created_at LIMIT 1",
+                        (now,),
+                    ).fetchone()
+                    if row is None:
+                        db.execute("COMMIT")
+                        return None
+                    if row["status"] == "running" and row["attempts"] >= row["max_attempts"]:
+                        self._finish(db, row["id"], "failed", None, "lease expired on the last attempt", now)
+                        continue
+                    db.execute(
+                        "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_owner = ?, "
+                        "available_at = ?, updated_at = ? WHERE id = ?",
+                        (worker_id, now + self.visibility_timeout_s, now, row["id"]),
+                    )
+                    db.execute("COMMIT")
+                    return {"job_id": row["id"], "payload": json.loads(row["payload"]), "attempt": row["attempts"] + 1}
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Extends the lease; False if the job is no longer this worker's."""
+        now = time.time()
+        with self._connect() as db:
+            cur = db.execute(
+                "UPDATE jobs SET available_at = ?, updated_at = ? "
+                "WHERE id = ? AND status = 'running' AND lease_owner = ?",
+                (now + self.visibility_timeout_s, now, job_id, worker_id),
+            )
+        return cur.rowcount == 1
+
+    def _finish(
+        self,
+        db: sqlite3.Connection,
+        job_id: str,
+        status: str,
+        result: Optional[str],
+        error: Optional[str],
+        now: float,
+    ) -> None:
+        db.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, lease_owner = NULL, "
+            "updated_at = ?, finished_at = ?, expires_at = ? WHERE id = ?",
+            (status, result, error, now, now, now + self.result_ttl_s, job_id),
+        )
+
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        """Stores the result; raises TypeError/ValueError, before touching the job, if it is not JSON."""
+        body = json.dumps(result, ensure_ascii=False)
+        now = time.time()
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            owner = db.execute("SELECT lease_owner FROM jobs WHERE id = ? AND status = 'running'", (job_id,)).fetchone()
+            if owner is None or owner["lease_owner"] != worker_id:
+                db.execute("ROLLBACK")
+                return False
+            self._finish(db, job_id, "done", body, None, now)
+            db.execute("COMMIT")
+        return True
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry: bool = True) -> str:
+        """
+        Schedules a retry with backoff, or marks the job failed once it is out
+        of attempts (or retry is False); returns the new status.
+        """
+        now = time.time()
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute(
+                "SELECT attempts, max_attempts, lease_owner FROM jobs WHERE id = ? AND status = 'running'", (job_id,)
+            ).fetchone()
+            if row is None or row["lease_owner"] != worker_id:
+                db.execute("ROLLBACK")
+                return "lost"
+            if not retry or row["attempts"] >= row["max_attempts"]:
+                self._finish(db, job_id, "failed", None, error, now)
+                status = "failed"
+            else:
+                delay = self.retry_backoff_s * (2 ** (row["attempts"] - 1))
+                db.execute(
+                    "UPDATE jobs SET status = 'queued', error = ?, lease_owner = NULL, available_at = ?, "
+                    "updated_at = ? WHERE id = ?",
+                    (error, now + delay, now, job_id),
+                )
+                status = "queued"
+            db.execute("COMMIT")
+        return status
+
+    def purge_expired(self) -> int:
+        with self._connect() as db:
+            cur = db.execute("DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+        return cur.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT status, COUNT(*) AS n FROM jobs WHERE expires_at IS NULL OR expires_at > ? GROUP BY status",
+                (now,),
+            ).fetchall()
+            oldest = db.execute("SELECT MIN(created_at) AS t FROM jobs WHERE status = 'queued'").fetchone()
+        out: Dict[str, Any] = {s: 0 for s in ("queued", "running", "done", "failed")}
+        out.update({r["status"]: r["n"] for r in rows})
+        out["oldest_queued_age_s"] = round(now - oldest["t"], 3) if oldest and oldest["t"] else 0.0
+        return out
+
+
+def job_queue(cfg: AppConfig) -> JobQueue:
+    return JobQueue(
+        cfg.jobs_db_path,
+        visibility_timeout_s=cfg.job_visibility_timeout_s,
+        max_attempts=cfg.job_max_attempts,
+        result_ttl_s=cfg.job_result_ttl_hours * 3600.0,
+    )
+
+
+def job_payload(job_description: str, profile_text: str, cfg: AppConfig) -> Dict[str, Any]:
+    return {"job_description": job_description, "profile_text": profile_text, "config": dataclasses.asdict(cfg)}
+
+
+def _payload_cfg(payload: Dict[str, Any]) -> AppConfig:
+    known = {f.name for f in dataclasses.fields(AppConfig)}
+    overrides = {k: v for k, v in (payload.get("config") or {}).items() if k in known}
+    # jobs run off the request path, so their outputs always go to the shared runs
+    # directory where GET /runs/{id} can find them from any process
+    return dataclasses.replace(AppConfig(**overrides), export_outputs=True)
+
+
+class _Lease:
+    """Keeps extending a job's lease from a background thread while the pipeline runs."""
+
+    def __init__(self, queue: JobQueue, job_id: str, worker_id: str):
+        self.queue = queue
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name=f"lease-{job_id[:8]}", daemon=True)
+
+    def _loop(self) -> None:
+        interval = max(1.0, self.queue.visibility_timeout_s / 3)
+        while not self._stop.wait(interval):
+            if not self.queue.heartbeat(self.job_id, self.worker_id):
+                return
+
+    def __enter__(self) -> "_Lease":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def run_worker(
+    cfg: Optional[AppConfig] = None,
+    worker_id: Optional[str] = None,
+    stop: Optional[Any] = None,
+    max_jobs: Optional[int] = None,
+) -> int:
+    """Claims and runs jobs until stop is set (or max_jobs ran); returns the number of jobs handled."""
+    from orchestrator import run_pipeline
+
+    cfg = cfg or AppConfig()
+    queue = job_queue(cfg)
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    handled = 0
+    last_purge = 0.0
+    while (stop is None or not stop.is_set()) and (max_jobs is None or handled < max_jobs):
+        if time.time() - last_purge > 60.0:
+            queue.purge_expired()
+            last_purge = time.time()
+
+        job = queue.claim(worker_id)
+        if job is None:
+            if stop is not None:
+                stop.wait(cfg.job_poll_interval_s)
+            else:
+                time.sleep(cfg.job_poll_interval_s)
+            continue
+
+        payload = job["payload"]
+        try:
+            with _Lease(queue, job["job_id"], worker_id):
+                result = run_pipeline(payload["job_description"], payload["profile_text"], cfg=_payload_cfg(payload))
+        except Exception as e:
+            _settle(queue.fail, job["job_id"], worker_id, f"{type(e).__name__}: {e}")
+        else:
+            try:
+                queue.complete(job["job_id"], worker_id, result)
+            except (TypeError, ValueError) as e:
+                # the same result would come back on every retry
+                _settle(queue.fail, job["job_id"], worker_id, f"result is not JSON-serializable: {e}", retry=False)
+            except Exception:
+                log.exception("could not store the result of job %s", job["job_id"])
+        handled += 1
+    return handled
+
+
+def _settle(fail: Any, job_id: str, worker_id: str, error: str, retry: bool = True) -> None:
+    """
+    Records a failed attempt. If even that fails (e.g. the database stays
+    locked), the error is logged and the worker moves on; the lease runs out
+    and the job is retried like one whose worker died.
+    """
+    try:
+        fail(job_id, worker_id, error, retry=retry)
+    except Exception:
+        log.exception("could not record the failure of job %s", job_id)
+
+
+def _worker_main(stop: Any) -> None:
+    run_worker(stop=stop)
+
+
+class WorkerPool:
+    """
+    Local worker processes draining the queue. They are spawned, so each one
+    gets a clean interpreter and its own resources, and pipelines run on
+    all cores instead of sharing one API process.
+    """
+
+    def __init__(self, n: int):
+        self.n = max(0, int(n))
+        self._ctx = mp.get_context("spawn")
+        self._stop = self._ctx.Event()
+        self.procs: List[Any] = []
+
+    def start(self) -> "WorkerPool":
+        for i in range(self.n):
+            p = self._ctx.Process(target=_worker_main, args=(self._stop,), name=f"job-worker-{i}", daemon=True)
+            p.start()
+            self.procs.append(p)
+        return self
+
+    def stop(self, timeout_s: float = 10.0) -> None:
+        """Lets each worker finish its current job, then terminates stragglers."""
+        self._stop.set()
+        deadline = time.time() + timeout_s
+        for p in self.procs:
+            p.join(max(0.0, deadline - time.time()))
+            if p.is_alive():
+                p.terminate()
+        self.procs = []
+
+    def join(self) -> None:
+        for p in self.procs:
+            p.join()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Run local workers for the pipeline job queue.")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+
+    pool = WorkerPool(args.workers).start()
+    print(f"{pool.n} job workers on {AppConfig().jobs_db_path} (Ctrl+C to stop)")
+    try:
+        pool.join()
+    except KeyboardInterrupt:
+        pool.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,48 +1,64 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import contextlib
+import functools
 import os
 import re
-from typing import Any, Dict, List, Optional, Set, Tuple
+import time
+from dataclasses import dataclass, replace
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
 
-from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 from config import AppConfig
-from core.chunking import chunk_profile
+from resources import (
+    get_artifact_store,
+    get_async_embed_batcher,
+    get_async_openai_client,
+    get_embed_batcher,
+    get_embed_store,
+    get_fewshot,
+    get_index_cache,
+    get_llm_cache,
+    get_local_embedder,
+    get_openai_client,
+    get_profile_index,
+    get_stage_executor,
+    get_stopwords,
+    get_taxonomy,
+)
+from core.chunking import Chunk, chunk_profile
+from core.multi_profile_index import MultiProfileIndex
+from core.llm_cache import LLMResponseCache
+from core.payload import PayloadLimits
+from core.index_cache import ProfileIndexCache, load_chunks, profile_cache_key, save_chunks
 from core.skill_taxonomy import SkillTaxonomy
 from core.retrieval_tfidf import TfidfIndex
 from core.retrieval_bm25 import BM25Index
 from core.retrieval_embed import EmbedIndex
 from core.ranker import HybridRanker, RequirementMatch
 from core.evidence import EvidenceMapBuilder
-from core.validators import validate_generation, enforce_grounding
-from core.export import export_json, export_markdown, export_zip
+from core.scheduler import Stage, StageGraph, StageScheduler
+from core.timing import StageTimer
+from core.validators import (
+    ValidationResult,
+    ValidationWarning,
+    collect_evidence_chunk_ids,
+    enforce_grounding,
+    ground_bullet,
+    validate_bullet,
+    validate_cover_letter,
+    validate_generation,
+)
+from core.artifacts import new_run_id
+from core.metrics import EMBED_SECONDS, EMBED_TEXTS, PIPELINE_SECONDS, VALIDATION_WARNINGS
 from core.normalize import normalize_generation_payload
 
 from agents.jd_parser_rules import parse_jd_rules
-from agents.jd_classifier_llm import classify_jd_with_llm
-from agents.generator_llm import generate_with_llm
-from agents.editor_llm import edit_with_llm
-
-
-def _read_lines(path: str) -> Set[str]:
-    if not os.path.exists(path):
-        return set()
-    with open(path, "r", encoding="utf-8") as f:
-        return set(ln.strip() for ln in f.readlines() if ln.strip())
-
-
-def _read_json(path: str) -> Any:
-    if not os.path.exists(path):
-        return None
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-
-def _ensure_dirs(cfg: AppConfig) -> None:
-    os.makedirs(cfg.outputs_dir, exist_ok=True)
-    os.makedirs(cfg.exports_dir, exist_ok=True)
+from agents.jd_classifier_llm import classify_jd_with_llm, classify_jd_with_llm_async
+from agents.generator_llm import generate_stream_with_llm_async, generate_with_llm, generate_with_llm_async
+from agents.editor_llm import EDITABLE_CODES, edit_with_llm, edit_with_llm_async
 
 
 def _requirement_list(jd_struct: Dict[str, Any]) -> List[str]:
@@ -54,9 +70,19 @@ def _requirement_list(jd_struct: Dict[str, Any]) -> List[str]:
     return [r for r in reqs if r.strip()]
 
 
-def _openai_client() -> OpenAI:
-    load_dotenv()
-    return OpenAI()
+def _openai_client(cfg: Optional[AppConfig] = None) -> OpenAI:
+    return get_openai_client(cfg)
+
+
+def _observed_embed(embed_fn, backend: str):
+    """Counts the texts and times each call to the embedding backend."""
+    def observed(texts: List[str]):
+        t0 = time.perf_counter()
+        out = embed_fn(texts)
+        EMBED_SECONDS.observe(time.perf_counter() - t0, backend=backend)
+        EMBED_TEXTS.inc(len(texts), backend=backend)
+        return out
+    return observed
 
 
 def _embed_fn_factory(client: OpenAI, model: str):
@@ -65,6 +91,18 @@ def _embed_fn_factory(client: OpenAI, model: str):
         vecs = [d.embedding for d in resp.data]
         import numpy as np
         return np.array(vecs, dtype="float32")
+    return _observed_embed(embed_fn, "openai")
+
+
+def _embed_fn_factory_async(client: AsyncOpenAI, model: str):
+    async def embed_fn(texts: List[str]):
+        t0 = time.perf_counter()
+        resp = await client.embeddings.create(model=model, input=texts)
+        EMBED_SECONDS.observe(time.perf_counter() - t0, backend="openai")
+        EMBED_TEXTS.inc(len(texts), backend="openai")
+        vecs = [d.embedding for d in resp.data]
+        import numpy as np
+        return np.array(vecs, dtype="float32")
     return embed_fn
 
 
@@ -127,43 +165,34 @@ def _adaptive_threshold(cfg: AppConfig, w_bm25: float, w_tfidf: float, w_embed:
     return float(cfg.match_threshold)
 
 
-def run_pipeline(
-    jd_text: str,
-    profile_text: str,
-    cfg: Optional[AppConfig] = None,
-) -> Dict[str, Any]:
-    cfg = cfg or AppConfig()
-    _ensure_dirs(cfg)
+def _models() -> Dict[str, str]:
+    return {
+        "classify": os.getenv("OPENAI_MODEL_CLASSIFY", "gpt-4o-mini"),
+        "generate": os.getenv("OPENAI_MODEL_GENERATE", "gpt-4o-mini"),
+        "edit": os.getenv("OPENAI_MODEL_EDIT", "gpt-4o-mini"),
+        "embed": os.getenv("OPENAI_EMBED_MODEL", "text-embedding-3-small"),
+    }
 
-    taxonomy = SkillTaxonomy.from_yaml(cfg.skills_yaml_path)
-    stopwords = _read_lines(cfg.stopwords_path)
-    fewshot = _read_json(cfg.fewshot_path) or []
 
-    client = _openai_client()
+def _payload_limits(cfg: AppConfig) -> PayloadLimits:
+    return PayloadLimits(
+        token_budget=cfg.llm_payload_token_budget or None,
+        profile_coverage=cfg.payload_profile_coverage,
+    )
 
-    model_classify = os.getenv("OPENAI_MODEL_CLASSIFY", "gpt-4o-mini")
-    model_generate = os.getenv("OPENAI_MODEL_GENERATE", "gpt-4o-mini")
-    model_edit = os.getenv("OPENAI_MODEL_EDIT", "gpt-4o-mini")
-    embed_model = os.getenv("OPENAI_EMBED_MODEL", "text-embedding-3-small")
 
-    
-    extracted_company, extracted_role = _extract_company_role(jd_text or "")
+def _rules_jd_struct(extracted: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "must_have_skills": extracted.get("must_have_skills", []),
+        "nice_to_have_skills": extracted.get("nice_to_have_skills", []),
+        "responsibilities": extracted.get("responsibilities", []),
+        "keywords": extracted.get("keywords", []),
+    }
 
-    
-    extracted = parse_jd_rules(jd_text or "", taxonomy)
 
-    
-    if cfg.use_llm_jd_classifier:
-        jd_struct = classify_jd_with_llm(jd_text or "", extracted, model=model_classify, client=client)
-    else:
-        jd_struct = {
-            "must_have_skills": extracted.get("must_have_skills", []),
-            "nice_to_have_skills": extracted.get("nice_to_have_skills", []),
-            "responsibilities": extracted.get("responsibilities", []),
-            "keywords": extracted.get("keywords", []),
-        }
+def _apply_company_role(jd_struct: Dict[str, Any], company_role: Tuple[str, str]) -> Dict[str, Any]:
+    extracted_company, extracted_role = company_role
 
-    
     jd_struct.setdefault("company_name", "")
     jd_struct.setdefault("role_title", "")
 
@@ -171,30 +200,87 @@ def run_pipeline(
         jd_struct["company_name"] = extracted_company
     if extracted_role:
         jd_struct["role_title"] = extracted_role
+    return jd_struct
 
-    
-    chunks = chunk_profile(
+
+def _chunk(profile_text: str, stopwords: Any, cfg: AppConfig) -> List[Chunk]:
+    return chunk_profile(
         profile_text or "",
         stopwords=stopwords,
         chunk_chars=cfg.chunk_chars,
         overlap_chars=cfg.overlap_chars,
     )
 
-    
-    tfidf_index = TfidfIndex.build(chunks) if cfg.use_tfidf else None
-    bm25_index = BM25Index.build(chunks) if cfg.use_bm25 else None
 
-    embed_index = None
-    embed_fn = None
-    if cfg.use_embeddings:
-        embed_fn = _embed_fn_factory(client, embed_model)
-        embed_index = EmbedIndex.build(chunks, embed_fn=embed_fn, normalize=True)
+def _profile_key(profile_text: str, stopwords: Any, cfg: AppConfig) -> str:
+    return profile_cache_key(profile_text or "", cfg.chunk_chars, cfg.overlap_chars, stopwords or [])
 
-    
+
+def _cached(
+    cache: Optional[ProfileIndexCache],
+    key: str,
+    artifact: str,
+    build: Callable[[], Any],
+    load: Callable[[str], Any],
+) -> Any:
+    if cache is None:
+        return build()
+    return cache.get_or_build(key, artifact, build, save=lambda obj, d: obj.save(d), load=load)
+
+
+def _chunks_for(
+    profile_text: str,
+    stopwords: Any,
+    cfg: AppConfig,
+    cache: Optional[ProfileIndexCache],
+    key: str,
+) -> List[Chunk]:
+    if cache is None:
+        return _chunk(profile_text, stopwords, cfg)
+    return cache.get_or_build(
+        key,
+        "chunks",
+        lambda: _chunk(profile_text, stopwords, cfg),
+        save=save_chunks,
+        load=load_chunks,
+    )
+
+
+def _tfidf_for(chunks: List[Chunk], cache: Optional[ProfileIndexCache], key: str) -> TfidfIndex:
+    return _cached(cache, key, "tfidf", lambda: TfidfIndex.build(chunks), lambda d: TfidfIndex.load(d, chunks))
+
+
+def _bm25_for(chunks: List[Chunk], cache: Optional[ProfileIndexCache], key: str) -> BM25Index:
+    return _cached(cache, key, "bm25", lambda: BM25Index.build(chunks), lambda d: BM25Index.load(d, chunks))
+
+
+def _embed_artifact(model: str) -> str:
+    return "embed-" + re.sub(r"[^A-Za-z0-9_.-]+", "_", model)
+
+
+def _build_lexical_indexes(
+    chunks: List[Chunk],
+    cfg: AppConfig,
+    timer: StageTimer,
+    cache: Optional[ProfileIndexCache] = None,
+    key: str = "",
+) -> Tuple[Optional[TfidfIndex], Optional[BM25Index]]:
+    tfidf_index = None
+    bm25_index = None
+    if cfg.use_tfidf:
+        with timer.stage("tfidf_build"):
+            tfidf_index = _tfidf_for(chunks, cache, key)
+    if cfg.use_bm25:
+        with timer.stage("bm25_build"):
+            bm25_index = _bm25_for(chunks, cache, key)
+    return tfidf_index, bm25_index
+
+
+def _make_ranker(cfg: AppConfig) -> HybridRanker:
     w_bm25, w_tfidf, w_embed = _adaptive_weights(cfg)
     match_threshold = _adaptive_threshold(cfg, w_bm25, w_tfidf, w_embed)
 
-    ranker = HybridRanker(
+    return HybridRanker(
         w_bm25=w_bm25,
         w_tfidf=w_tfidf,
         w_embed=w_embed,
@@ -204,35 +290,53 @@ def run_pipeline(
     )
 
 
-    requirements = _requirement_list(jd_struct)
+def _lexical_hits(
+    requirements: List[str],
+    tfidf_index: Optional[TfidfIndex],
+    bm25_index: Optional[BM25Index],
+    cfg: AppConfig,
+    timer: StageTimer,
+) -> Tuple[List[List[Any]], List[List[Any]]]:
+    tfidf_all: List[List[Any]] = [[] for _ in requirements]
+    bm25_all: List[List[Any]] = [[] for _ in requirements]
+    if tfidf_index:
+        with timer.stage("tfidf_query"):
+            tfidf_all = tfidf_index.query_many(requirements, top_k=cfg.top_k_retrieval)
+    if bm25_index:
+        with timer.stage("bm25_query"):
+            bm25_all = bm25_index.query_many(requirements, top_k=cfg.top_k_retrieval)
+    return tfidf_all, bm25_all
+
+
+def _rank_requirements(
+    ranker: HybridRanker,
+    requirements: List[str],
+    tfidf_all: List[List[Any]],
+    bm25_all: List[List[Any]],
+    embed_all: List[List[Any]],
+) -> List[RequirementMatch]:
     matches: List[RequirementMatch] = []
-
-    for req in requirements:
-        hits_tfidf: List[Tuple[str, float]] = []
-        hits_bm25: List[Tuple[str, float]] = []
-        hits_embed: List[Tuple[str, float]] = []
-
-        if tfidf_index:
-            for h in tfidf_index.query(req, top_k=cfg.top_k_retrieval):
-                hits_tfidf.append((h.chunk_id, float(h.score)))
-
-        if bm25_index:
-            for h in bm25_index.query(req, top_k=cfg.top_k_retrieval):
-                hits_bm25.append((h.chunk_id, float(h.score)))
-
-        if embed_index and embed_fn:
-            for h in embed_index.query(req, embed_fn=embed_fn, top_k=cfg.top_k_retrieval):
-                hits_embed.append((h.chunk_id, float(h.score)))
+    for req, h_tfidf, h_bm25, h_embed in zip(requirements, tfidf_all, bm25_all, embed_all):
+        hits_tfidf: List[Tuple[str, float]] = [(h.chunk_id, float(h.score)) for h in h_tfidf]
+        hits_bm25: List[Tuple[str, float]] = [(h.chunk_id, float(h.score)) for h in h_bm25]
+        hits_embed: List[Tuple[str, float]] = [(h.chunk_id, float(h.score)) for h in h_embed]
 
         matches.append(ranker.rank_requirement(req, hits_tfidf, hits_bm25, hits_embed))
+    return matches
 
+
+def _match_report(
+    ranker: HybridRanker,
+    matches: List[RequirementMatch],
+    jd_struct: Dict[str, Any],
+) -> Dict[str, Any]:
     report = ranker.build_report(
         matches,
         must_have=jd_struct.get("must_have_skills", []) or [],
         nice_to_have=jd_struct.get("nice_to_have_skills", []) or [],
     )
 
-    match_report = {
+    return {
         "match_score_must": report.match_score_must,
         "match_score_nice": report.match_score_nice,
         "match_score_overall": report.match_score_overall,
@@ -240,7 +344,12 @@ def run_pipeline(
         "missing_requirements": report.missing_requirements,
     }
 
-    
+
+def _evidence_map(
+    taxonomy: SkillTaxonomy,
+    matches: List[RequirementMatch],
+    chunks: List[Chunk],
+) -> Dict[str, Any]:
     evidence_builder = EvidenceMapBuilder(taxonomy)
     evidence_map_items = evidence_builder.build(matches, chunks)
 
@@ -252,18 +361,15 @@ def run_pipeline(
             "score": v.score,
             "chunks": v.chunks,
         }
+    return evidence_map
 
-   
-    generation_raw = generate_with_llm(
-        jd_struct=jd_struct,
-        match_report=match_report,
-        evidence_map=evidence_map,
-        user_profile_text=profile_text or "",
-        model=model_generate,
-        client=client,
-        fewshot_examples=fewshot if isinstance(fewshot, list) else None,
-    )
 
+def _check_generation(
+    generation_raw: Dict[str, Any],
+    evidence_map: Dict[str, Any],
+    taxonomy: SkillTaxonomy,
+    cfg: AppConfig,
+) -> Tuple[Dict[str, Any], ValidationResult]:
     generation = normalize_generation_payload(generation_raw)
 
     validation = validate_generation(
@@ -274,42 +380,824 @@ def run_pipeline(
     )
 
     generation = enforce_grounding(generation, evidence_map, taxonomy)
+    return generation, validation
 
-    
-    if cfg.use_llm_editor:
-        warn_list = [{"code": w.code, "message": w.message, "path": w.path} for w in validation.warnings]
 
-        edited_raw = edit_with_llm(
-            generation=generation,
-            validation_warnings=warn_list,
-            evidence_map=evidence_map,
-            model=model_edit,
-            client=client,
-        )
+def _warning_dicts(warnings: List[ValidationWarning]) -> List[Dict[str, Any]]:
+    return [{"code": w.code, "message": w.message, "path": w.path} for w in warnings]
 
-        generation = normalize_generation_payload(edited_raw)
 
-        validation = validate_generation(
-            generation=generation,
-            evidence_map=evidence_map,
-            taxonomy=taxonomy,
-            max_bullet_words=cfg.max_bullet_words,
-        )
-        generation = enforce_grounding(generation, evidence_map, taxonomy)
+def _warning_list(validation: ValidationResult) -> List[Dict[str, Any]]:
+    return _warning_dicts(validation.warnings)
 
-    final_output = {
+
+def _edit_warnings(
+    generation: Dict[str, Any],
+    validation: ValidationResult,
+    evidence_map: Dict[str, Any],
+    taxonomy: SkillTaxonomy,
+    cfg: AppConfig,
+) -> List[Dict[str, Any]]:
+    """
+    Warnings for the editor, with paths into the grounded generation it edits.
+    validation describes the draft before enforce_grounding dropped bullets,
+    so its indexes can be off; re-checking is only needed if it has anything
+    the editor could fix.
+    """
+    if not any(w.code in EDITABLE_CODES for w in validation.warnings):
+        return []
+    regrounded = validate_generation(
+        generation=generation,
+        evidence_map=evidence_map,
+        taxonomy=taxonomy,
+        max_bullet_words=cfg.max_bullet_words,
+    )
+    return _warning_list(regrounded)
+
+
+def _final_output(
+    jd_struct: Dict[str, Any],
+    match_report: Dict[str, Any],
+    evidence_map: Dict[str, Any],
+    generation: Dict[str, Any],
+    validation: ValidationResult,
+) -> Dict[str, Any]:
+    return {
         "jd": jd_struct,
         "match_report": match_report,
         "evidence_map": evidence_map,
         "generation": generation,
         "validation": {
             "ok": bool(validation.ok),
-            "warnings": [{"code": w.code, "message": w.message, "path": w.path} for w in validation.warnings],
+            "warnings": _warning_list(validation),
+        },
+    }
+
+
+def _store_run(final_output: Dict[str, Any], cfg: AppConfig) -> str:
+    """
+    Gives the run its own ID and keeps its output in the artifact store, from
+    which the package is rendered on demand. Nothing is written to disk here.
+    """
+    run_id = new_run_id()
+    final_output["run_id"] = run_id
+    for w in final_output["validation"]["warnings"]:
+        VALIDATION_WARNINGS.inc(code=w["code"])
+    get_artifact_store(cfg).put(run_id, final_output)
+    return run_id
+
+
+def _export(run_id: str, cfg: AppConfig) -> None:
+    get_artifact_store(cfg).export(run_id)
+
+
+def _timer(cfg: AppConfig) -> StageTimer:
+    return StageTimer(enabled=cfg.collect_timings, metrics=cfg.collect_metrics)
+
+
+@contextlib.contextmanager
+def _observe_pipeline(entrypoint: str) -> Iterator[None]:
+    """End-to-end latency; outcome is ok, error, or cancelled (e.g. a stream client went away)."""
+    t0 = time.perf_counter()
+    outcome = "cancelled"
+    try:
+        yield
+        outcome = "ok"
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        PIPELINE_SECONDS.observe(time.perf_counter() - t0, entrypoint=entrypoint, outcome=outcome)
+
+
+def _pipeline_stages(
+    cfg: AppConfig,
+    taxonomy: SkillTaxonomy,
+    stopwords: Any,
+    fewshot: Any,
+    client: OpenAI,
+    models: Dict[str, str],
+    index_cache: Optional[ProfileIndexCache] = None,
+    llm_cache: Optional[LLMResponseCache] = None,
+    timer: Optional[StageTimer] = None,
+) -> List[Stage]:
+    """
+    run_pipeline as a DAG. Inputs are the values each stage reads; the
+    scheduler runs every stage whose inputs are ready, so the JD branch
+    (parse, LLM classify) overlaps with chunking and index builds.
+    """
+    embed_fn = None
+    if cfg.use_embeddings and cfg.embed_backend == "local":
+        local_embedder = get_local_embedder(cfg)
+        models = {**models, "embed": local_embedder.name}
+        embed_fn = _observed_embed(local_embedder.embed, "local")
+    elif cfg.use_embeddings:
+        embed_fn = _embed_fn_factory(client, models["embed"])
+        embed_batcher = get_embed_batcher(cfg, client, models["embed"], embed_fn)
+        if embed_batcher is not None:
+            embed_fn = embed_batcher.embed
+        embed_store = get_embed_store(cfg, models["embed"])
+        if embed_store is not None:
+            embed_fn = embed_store.wrap(embed_fn, batch_size=cfg.embed_batch_size)
+
+    def no_hits(requirements: List[str]) -> List[List[Any]]:
+        return [[] for _ in requirements]
+
+    def jd_classify(jd_text: str, extracted: Dict[str, Any]) -> Dict[str, Any]:
+        if cfg.use_llm_jd_classifier:
+            return classify_jd_with_llm(
+                jd_text or "", extracted, model=models["classify"], client=client, cache=llm_cache
+            )
+        return _rules_jd_struct(extracted)
+
+    def ranking(requirements, tfidf_all, bm25_all, embed_all, jd_struct):
+        ranker = _make_ranker(cfg)
+        matches = _rank_requirements(ranker, requirements, tfidf_all, bm25_all, embed_all)
+        return matches, _match_report(ranker, matches, jd_struct)
+
+    timer = timer or StageTimer(enabled=False)
+    limits = _payload_limits(cfg)
+
+    def generate(jd_struct, match_report, evidence_map, profile_text):
+        stats: Dict[str, Any] = {}
+        out = generate_with_llm(
+            jd_struct=jd_struct,
+            match_report=match_report,
+            evidence_map=evidence_map,
+            user_profile_text=profile_text or "",
+            model=models["generate"],
+            client=client,
+            fewshot_examples=fewshot if isinstance(fewshot, list) else None,
+            cache=llm_cache,
+            limits=limits,
+            payload_stats=stats,
+        )
+        timer.note("payload_generate", stats)
+        return out
+
+    def edit(generation, validation, evidence_map):
+        stats: Dict[str, Any] = {}
+        out = edit_with_llm(
+            generation=generation,
+            validation_warnings=_edit_warnings(generation, validation, evidence_map, taxonomy, cfg),
+            evidence_map=evidence_map,
+            model=models["edit"],
+            client=client,
+            cache=llm_cache,
+            limits=limits,
+            payload_stats=stats,
+        )
+        timer.note("payload_edit", stats)
+        return out
+
+    def check(raw, evidence_map):
+        return _check_generation(raw, evidence_map, taxonomy, cfg)
+
+    stages = [
+        Stage("company_role", lambda jd_text: _extract_company_role(jd_text or ""), ("jd_text",), ("company_role",)),
+        Stage("jd_parse", lambda jd_text: parse_jd_rules(jd_text or "", taxonomy), ("jd_text",), ("extracted",)),
+        Stage(
+            "jd_classify" if cfg.use_llm_jd_classifier else "jd_struct",
+            jd_classify,
+            ("jd_text", "extracted"),
+            ("jd_raw",),
+        ),
+        Stage("jd_finalize", _apply_company_role, ("jd_raw", "company_role"), ("jd_struct",)),
+        Stage("requirements", _requirement_list, ("jd_struct",), ("requirements",)),
+        Stage(
+            "profile_key",
+            lambda profile_text: _profile_key(profile_text, stopwords, cfg),
+            ("profile_text",),
+            ("profile_key",),
+        ),
+        Stage(
+            "chunking",
+            lambda profile_text, key: _chunks_for(profile_text, stopwords, cfg, index_cache, key),
+            ("profile_text", "profile_key"),
+            ("chunks",),
+        ),
+    ]
+
+    if cfg.use_tfidf:
+        stages += [
+            Stage(
+                "tfidf_build",
+                lambda chunks, key: _tfidf_for(chunks, index_cache, key),
+                ("chunks", "profile_key"),
+                ("tfidf_index",),
+            ),
+            Stage(
+                "tfidf_query",
+                lambda idx, reqs: idx.query_many(reqs, top_k=cfg.top_k_retrieval),
+                ("tfidf_index", "requirements"),
+                ("tfidf_hits",),
+            ),
+        ]
+    else:
+        stages.append(Stage("tfidf_off", no_hits, ("requirements",), ("tfidf_hits",)))
+
+    if cfg.use_bm25:
+        stages += [
+            Stage(
+                "bm25_build",
+                lambda chunks, key: _bm25_for(chunks, index_cache, key),
+                ("chunks", "profile_key"),
+                ("bm25_index",),
+            ),
+            Stage(
+                "bm25_query",
+                lambda idx, reqs: idx.query_many(reqs, top_k=cfg.top_k_retrieval),
+                ("bm25_index", "requirements"),
+                ("bm25_hits",),
+            ),
+        ]
+    else:
+        stages.append(Stage("bm25_off", no_hits, ("requirements",), ("bm25_hits",)))
+
+    if embed_fn is not None:
+        stages += [
+            Stage(
+                "embed_build",
+                lambda chunks, key: _cached(
+                    index_cache,
+                    key,
+                    _embed_artifact(models["embed"]),
+                    lambda: EmbedIndex.build(chunks, embed_fn=embed_fn, normalize=True),
+                    lambda d: EmbedIndex.load(d, chunks),
+                ),
+                ("chunks", "profile_key"),
+                ("embed_index",),
+            ),
+            Stage(
+                "embed_query",
+                lambda idx, reqs: idx.query_many(reqs, embed_fn=embed_fn, top_k=cfg.top_k_retrieval),
+                ("embed_index", "requirements"),
+                ("embed_hits",),
+            ),
+        ]
+    else:
+        stages.append(Stage("embed_off", no_hits, ("requirements",), ("embed_hits",)))
+
+    stages += [
+        Stage(
+            "ranking",
+            ranking,
+            ("requirements", "tfidf_hits", "bm25_hits", "embed_hits", "jd_struct"),
+            ("matches", "match_report"),
+        ),
+        Stage(
+            "evidence",
+            lambda matches, chunks: _evidence_map(taxonomy, matches, chunks),
+            ("matches", "chunks"),
+            ("evidence_map",),
+        ),
+        Stage("generate", generate, ("jd_struct", "match_report", "evidence_map", "profile_text"), ("draft_raw",)),
+        Stage("validate", check, ("draft_raw", "evidence_map"), ("draft", "draft_validation")),
+    ]
+
+    result_keys = ("draft", "draft_validation")
+    if cfg.use_llm_editor:
+        stages += [
+            Stage("edit", edit, ("draft", "draft_validation", "evidence_map"), ("edited_raw",)),
+            Stage("validate_edit", check, ("edited_raw", "evidence_map"), ("edited", "edited_validation")),
+        ]
+        result_keys = ("edited", "edited_validation")
+
+    stages.append(
+        Stage(
+            "assemble",
+            _final_output,
+            ("jd_struct", "match_report", "evidence_map") + result_keys,
+            ("final_output",),
+        )
+    )
+    return stages
+
+
+def run_pipeline(
+    jd_text: str,
+    profile_text: str,
+    cfg: Optional[AppConfig] = None,
+) -> Dict[str, Any]:
+    cfg = cfg or AppConfig()
+    with _observe_pipeline("sync"):
+        timer = _timer(cfg)
+
+        with timer.stage("load_resources"):
+            taxonomy = get_taxonomy(cfg.skills_yaml_path, cfg.skills_snapshot_path)
+            stopwords = get_stopwords(cfg.stopwords_path)
+            fewshot = get_fewshot(cfg.fewshot_path) or []
+
+            client = _openai_client(cfg)
+            models = _models()
+            index_cache = get_index_cache(cfg)
+            llm_cache = get_llm_cache(cfg)
+
+        graph = StageGraph(
+            _pipeline_stages(cfg, taxonomy, stopwords, fewshot, client, models, index_cache, llm_cache, timer),
+            initial=("jd_text", "profile_text"),
+        )
+        scheduler = StageScheduler(
+            graph,
+            max_workers=cfg.stage_workers,
+            timer=timer,
+            executor=get_stage_executor(cfg) if cfg.stage_workers > 1 else None,
+        )
+        values = scheduler.run({"jd_text": jd_text, "profile_text": profile_text})
+        final_output = values["final_output"]
+
+        run_id = _store_run(final_output, cfg)
+        if cfg.export_outputs:
+            with timer.stage("export"):
+                _export(run_id, cfg)
+
+        if timer.enabled:
+            final_output["timings"] = timer.as_dict()
+            final_output["timings"]["critical_path"] = scheduler.critical_path()
+
+        return final_output
+
+
+def rank_profiles(
+    jd_text: str,
+    cfg: Optional[AppConfig] = None,
+    top_n: Optional[int] = None,
+    index: Optional[MultiProfileIndex] = None,
+) -> Dict[str, Any]:
+    """
+    Recruiter mode: rank the profiles of a MultiProfileIndex against one JD.
+    Only the top_n candidates are fully scored and get a match report.
+    """
+    cfg = cfg or AppConfig()
+    top_n = top_n or cfg.recruiter_top_n
+    index = index or get_profile_index(cfg.profile_index_dir)
+    taxonomy = get_taxonomy(cfg.skills_yaml_path, cfg.skills_snapshot_path)
+
+    extracted = parse_jd_rules(jd_text or "", taxonomy)
+    jd_struct = _apply_company_role(_rules_jd_struct(extracted), _extract_company_role(jd_text or ""))
+
+    must = set(jd_struct.get("must_have_skills", []) or [])
+    w_must = min(max(float(cfg.score_weight_must), 0.0), 1.0)
+    weighted = [(r, w_must if r in must else 1.0 - w_must) for r in _requirement_list(jd_struct)]
+
+    ranked, stats = index.top_profiles(weighted, top_n=top_n, top_k_chunks=cfg.top_k_retrieval)
+
+    ranker = _make_ranker(replace(cfg, use_bm25=True, use_tfidf=False, use_embeddings=False))
+    requirements = [r for r, _ in weighted]
+    no_hits: List[Tuple[str, float]] = []
+
+    candidates: List[Dict[str, Any]] = []
+    for ps in ranked:
+        matches = [ranker.rank_requirement(r, no_hits, ps.chunk_hits.get(r, []), no_hits) for r in requirements]
+        candidates.append(
+            {
+                "profile_id": ps.profile_id,
+                "score": ps.score,
+                "requirement_scores": ps.requirement_scores,
+                "match_report": _match_report(ranker, matches, jd_struct),
+            }
+        )
+
+    return {
+        "jd": jd_struct,
+        "candidates": candidates,
+        "stats": {
+            "profiles_total": stats.profiles_total,
+            "profiles_candidates": stats.profiles_candidates,
+            "profiles_scored": stats.profiles_scored,
         },
     }
 
-    export_json(final_output, cfg.last_run_path)
-    export_markdown({"generation": generation}, cfg.exports_dir)
-    export_zip(cfg.exports_dir, cfg.package_zip_path)
 
-    return final_output
+@dataclass
+class _ProfileIndexes:
+    chunks: List[Chunk]
+    tfidf_index: Optional[TfidfIndex]
+    bm25_index: Optional[BM25Index]
+    embed_index: Optional[EmbedIndex]
+
+
+def _warm_resources(cfg: AppConfig) -> None:
+    get_taxonomy(cfg.skills_yaml_path, cfg.skills_snapshot_path)
+    get_stopwords(cfg.stopwords_path)
+    get_fewshot(cfg.fewshot_path)
+    get_async_openai_client(cfg)
+    get_index_cache(cfg)
+    get_llm_cache(cfg)
+    if cfg.use_embeddings and cfg.embed_backend == "local":
+        get_local_embedder(cfg)
+
+
+class _AsyncPipeline:
+    """
+    Shared state for async runs: resources are resolved once, CPU-bound stages
+    go to the default executor, and LLM calls optionally share a semaphore so
+    batch runs can bound their fan-out.
+    """
+
+    def __init__(self, cfg: AppConfig, llm_concurrency: Optional[int] = None):
+        self.cfg = cfg
+        self.loop = asyncio.get_running_loop()
+        self.taxonomy = get_taxonomy(cfg.skills_yaml_path, cfg.skills_snapshot_path)
+        self.stopwords = get_stopwords(cfg.stopwords_path)
+        self.fewshot = get_fewshot(cfg.fewshot_path) or []
+        self.aclient = get_async_openai_client(cfg)
+        self.models = _models()
+        self.index_cache = get_index_cache(cfg)
+        self.llm_cache = get_llm_cache(cfg)
+        self.payload_limits = _payload_limits(cfg)
+        self.aembed_fn = None
+        if cfg.use_embeddings and cfg.embed_backend == "local":
+            local_embedder = get_local_embedder(cfg)
+            self.models["embed"] = local_embedder.name
+            local_embed_fn = _observed_embed(local_embedder.embed, "local")
+
+            async def local_embed(texts: List[str]):
+                return await self.loop.run_in_executor(None, local_embed_fn, texts)
+
+            self.aembed_fn = local_embed
+        elif cfg.use_embeddings:
+            self.aembed_fn = _embed_fn_factory_async(self.aclient, self.models["embed"])
+            embed_batcher = get_async_embed_batcher(cfg, self.aclient, self.models["embed"], self.aembed_fn)
+            if embed_batcher is not None:
+                self.aembed_fn = embed_batcher.embed_async
+            embed_store = get_embed_store(cfg, self.models["embed"])
+            if embed_store is not None:
+                self.aembed_fn = embed_store.wrap_async(self.aembed_fn, batch_size=cfg.embed_batch_size)
+        self._llm_slots = asyncio.Semaphore(llm_concurrency) if llm_concurrency else None
+
+    @classmethod
+    async def create(cls, cfg: AppConfig, llm_concurrency: Optional[int] = None) -> "_AsyncPipeline":
+        """
+        Loads the cold resources (taxonomy, few-shot, caches, the local embedder
+        fit) on a worker thread first, so a cold start does not stall the loop;
+        __init__ then only finds them in the registry.
+        """
+        await asyncio.to_thread(_warm_resources, cfg)
+        return cls(cfg, llm_concurrency)
+
+    def offload(self, timer: StageTimer, name: Optional[str], fn, *args):
+        if name:
+            fn = timer.wrap(name, fn)
+        return self.loop.run_in_executor(None, functools.partial(fn, *args))
+
+    def llm_slot(self):
+        return self._llm_slots if self._llm_slots is not None else contextlib.nullcontext()
+
+    async def prepare_profile(self, profile_text: str, timer: StageTimer) -> _ProfileIndexes:
+        cfg = self.cfg
+        cache = self.index_cache
+        profile_key = _profile_key(profile_text, self.stopwords, cfg)
+        chunks = await self.offload(timer, "chunking", _chunks_for, profile_text, self.stopwords, cfg, cache, profile_key)
+        tfidf_index, bm25_index = await self.offload(
+            timer, None, _build_lexical_indexes, chunks, cfg, timer, cache, profile_key
+        )
+
+        embed_index = None
+        if self.aembed_fn is not None:
+            artifact = _embed_artifact(self.models["embed"])
+            with timer.stage("embed_build"):
+                if cache is not None:
+                    embed_index = await self.offload(
+                        timer, None, cache.lookup, profile_key, artifact, lambda d: EmbedIndex.load(d, chunks)
+                    )
+                if embed_index is None:
+                    chunk_vecs = await self.aembed_fn(EmbedIndex.chunk_texts(chunks))
+                    embed_index = await self.offload(timer, None, EmbedIndex.from_vectors, chunks, chunk_vecs, True)
+                    if cache is not None:
+                        await self.offload(
+                            timer, None, cache.store, profile_key, artifact, embed_index, lambda o, d: o.save(d)
+                        )
+
+        return _ProfileIndexes(chunks, tfidf_index, bm25_index, embed_index)
+
+    async def parse_jd(self, jd_text: str, timer: StageTimer) -> Dict[str, Any]:
+        extracted = await self.offload(timer, "jd_parse", parse_jd_rules, jd_text or "", self.taxonomy)
+
+        if self.cfg.use_llm_jd_classifier:
+            async with self.llm_slot():
+                with timer.stage("jd_classify"):
+                    jd_struct = await classify_jd_with_llm_async(
+                        jd_text or "",
+                        extracted,
+                        model=self.models["classify"],
+                        client=self.aclient,
+                        cache=self.llm_cache,
+                    )
+        else:
+            jd_struct = _rules_jd_struct(extracted)
+
+        return _apply_company_role(jd_struct, _extract_company_role(jd_text or ""))
+
+    async def match(
+        self,
+        jd_struct: Dict[str, Any],
+        profile: _ProfileIndexes,
+        timer: StageTimer,
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        cfg = self.cfg
+        ranker = _make_ranker(cfg)
+
+        requirements = _requirement_list(jd_struct)
+        tfidf_all, bm25_all = await self.offload(
+            timer, None, _lexical_hits, requirements, profile.tfidf_index, profile.bm25_index, cfg, timer
+        )
+        embed_all: List[List[Any]] = [[] for _ in requirements]
+        if profile.embed_index and self.aembed_fn:
+            with timer.stage("embed_query"):
+                live = EmbedIndex.prepare_queries(requirements)
+                if live:
+                    q_vecs = await self.aembed_fn([qtxt for _, qtxt in live])
+                    embed_all = profile.embed_index.search_many(
+                        len(requirements), live, q_vecs, top_k=cfg.top_k_retrieval
+                    )
+
+        with timer.stage("ranking"):
+            matches = _rank_requirements(ranker, requirements, tfidf_all, bm25_all, embed_all)
+            match_report = _match_report(ranker, matches, jd_struct)
+        evidence_map = await self.offload(timer, "evidence", _evidence_map, self.taxonomy, matches, profile.chunks)
+        return match_report, evidence_map
+
+    async def draft(
+        self,
+        jd_struct: Dict[str, Any],
+        match_report: Dict[str, Any],
+        evidence_map: Dict[str, Any],
+        profile_text: str,
+        timer: StageTimer,
+    ) -> Tuple[Dict[str, Any], ValidationResult]:
+        stats: Dict[str, Any] = {}
+        async with self.llm_slot():
+            with timer.stage("generate"):
+                generation_raw = await generate_with_llm_async(
+                    jd_struct=jd_struct,
+                    match_report=match_report,
+                    evidence_map=evidence_map,
+                    user_profile_text=profile_text or "",
+                    model=self.models["generate"],
+                    client=self.aclient,
+                    fewshot_examples=self.fewshot if isinstance(self.fewshot, list) else None,
+                    cache=self.llm_cache,
+                    limits=self.payload_limits,
+                    payload_stats=stats,
+                )
+            timer.note("payload_generate", stats)
+
+        return await self.offload(
+            timer, "validate", _check_generation, generation_raw, evidence_map, self.taxonomy, self.cfg
+        )
+
+    async def draft_stream(
+        self,
+        jd_struct: Dict[str, Any],
+        match_report: Dict[str, Any],
+        evidence_map: Dict[str, Any],
+        profile_text: str,
+        timer: StageTimer,
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        draft() over a streamed completion. Yields ("bullet", {...}) as each
+        resume bullet closes and ("cover_letter", {...}) when the cover letter
+        does, each with its validation warnings and the grounded form the
+        final draft will contain (None / an empty cover letter if grounding
+        drops it). Ends with ("draft", (generation, validation)).
+        """
+        stats: Dict[str, Any] = {}
+        evidence_ids = collect_evidence_chunk_ids(evidence_map)
+        generation_raw: Dict[str, Any] = {}
+        t0 = time.perf_counter()
+        first = True
+        async with self.llm_slot():
+            with timer.stage("generate"):
+                async for kind, index, item in generate_stream_with_llm_async(
+                    jd_struct=jd_struct,
+                    match_report=match_report,
+                    evidence_map=evidence_map,
+                    user_profile_text=profile_text or "",
+                    model=self.models["generate"],
+                    client=self.aclient,
+                    fewshot_examples=self.fewshot if isinstance(self.fewshot, list) else None,
+                    cache=self.llm_cache,
+                    limits=self.payload_limits,
+                    payload_stats=stats,
+                ):
+                    if kind == "generation":
+                        generation_raw = item
+                        continue
+                    if first:
+                        timer.note("generate_first_item_ms", round(1000.0 * (time.perf_counter() - t0), 3))
+                        first = False
+                    if kind == "bullet":
+                        warnings = validate_bullet(item, index, evidence_ids, self.taxonomy, self.cfg.max_bullet_words)
+                        yield kind, {
+                            "index": index,
+                            "bullet": ground_bullet(item, evidence_ids, self.taxonomy),
+                            "warnings": _warning_dicts(warnings),
+                        }
+                    else:
+                        warnings = validate_cover_letter(item, evidence_ids)
+                        yield kind, {
+                            "cover_letter": item if not warnings else {"text": "", "evidence_chunks": []},
+                            "warnings": _warning_dicts(warnings),
+                        }
+            timer.note("payload_generate", stats)
+
+        yield "draft", await self.offload(
+            timer, "validate", _check_generation, generation_raw, evidence_map, self.taxonomy, self.cfg
+        )
+
+    async def edit(
+        self,
+        generation: Dict[str, Any],
+        validation: ValidationResult,
+        evidence_map: Dict[str, Any],
+        timer: StageTimer,
+    ) -> Tuple[Dict[str, Any], ValidationResult]:
+        stats: Dict[str, Any] = {}
+        async with self.llm_slot():
+            with timer.stage("edit"):
+                edited_raw = await edit_with_llm_async(
+                    generation=generation,
+                    validation_warnings=_edit_warnings(generation, validation, evidence_map, self.taxonomy, self.cfg),
+                    evidence_map=evidence_map,
+                    model=self.models["edit"],
+                    client=self.aclient,
+                    cache=self.llm_cache,
+                    limits=self.payload_limits,
+                    payload_stats=stats,
+                )
+            timer.note("payload_edit", stats)
+
+        return await self.offload(
+            timer, "validate_edit", _check_generation, edited_raw, evidence_map, self.taxonomy, self.cfg
+        )
+
+    async def generate(
+        self,
+        jd_struct: Dict[str, Any],
+        match_report: Dict[str, Any],
+        evidence_map: Dict[str, Any],
+        profile_text: str,
+        timer: StageTimer,
+    ) -> Tuple[Dict[str, Any], ValidationResult]:
+        generation, validation = await self.draft(jd_struct, match_report, evidence_map, profile_text, timer)
+        if self.cfg.use_llm_editor:
+            generation, validation = await self.edit(generation, validation, evidence_map, timer)
+        return generation, validation
+
+    async def run_jd(
+        self,
+        jd_text: str,
+        profile_text: str,
+        profile: _ProfileIndexes,
+        timer: StageTimer,
+        jd_struct: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        if jd_struct is None:
+            jd_struct = await self.parse_jd(jd_text, timer)
+        match_report, evidence_map = await self.match(jd_struct, profile, timer)
+        generation, validation = await self.generate(jd_struct, match_report, evidence_map, profile_text, timer)
+        return _final_output(jd_struct, match_report, evidence_map, generation, validation)
+
+
+async def run_pipeline_async(
+    jd_text: str,
+    profile_text: str,
+    cfg: Optional[AppConfig] = None,
+) -> Dict[str, Any]:
+    """
+    Same pipeline as run_pipeline, but LLM and embedding calls go through
+    AsyncOpenAI and CPU-bound stages run on the default executor, so a single
+    event loop can keep many requests in flight.
+    """
+    cfg = cfg or AppConfig()
+    with _observe_pipeline("async"):
+        timer = _timer(cfg)
+
+        with timer.stage("load_resources"):
+            pipeline = await _AsyncPipeline.create(cfg)
+
+        jd_struct, profile = await asyncio.gather(
+            pipeline.parse_jd(jd_text, timer),
+            pipeline.prepare_profile(profile_text, timer),
+        )
+        final_output = await pipeline.run_jd(jd_text, profile_text, profile, timer, jd_struct=jd_struct)
+
+        run_id = _store_run(final_output, cfg)
+        if cfg.export_outputs:
+            await pipeline.offload(timer, "export", _export, run_id, cfg)
+
+        if timer.enabled:
+            final_output["timings"] = timer.as_dict()
+
+        return final_output
+
+
+async def run_pipeline_stream(
+    jd_text: str,
+    profile_text: str,
+    cfg: Optional[AppConfig] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Runs the async pipeline and yields {"event", "data"} items as soon as each
+    stage result is ready: jd, match_report, evidence_map, then one bullet
+    event per resume bullet and a cover_letter event while the generation is
+    still streaming, draft, edited (only with the editor enabled),
+    validation, then done (with the run_id). The profile indexes are built
+    while the JD is parsed, so jd usually arrives first.
+    """
+    cfg = cfg or AppConfig()
+    with _observe_pipeline("stream"):
+        timer = _timer(cfg)
+
+        with timer.stage("load_resources"):
+            pipeline = await _AsyncPipeline.create(cfg)
+
+        profile_task = asyncio.ensure_future(pipeline.prepare_profile(profile_text, timer))
+        try:
+            jd_struct = await pipeline.parse_jd(jd_text, timer)
+            yield {"event": "jd", "data": jd_struct}
+
+            profile = await profile_task
+            match_report, evidence_map = await pipeline.match(jd_struct, profile, timer)
+            yield {"event": "match_report", "data": match_report}
+            yield {"event": "evidence_map", "data": evidence_map}
+        finally:
+            profile_task.cancel()
+
+        async for kind, data in pipeline.draft_stream(jd_struct, match_report, evidence_map, profile_text, timer):
+            if kind == "draft":
+                generation, validation = data
+            else:
+                yield {"event": kind, "data": data}
+        yield {"event": "draft", "data": generation}
+
+        if cfg.use_llm_editor:
+            generation, validation = await pipeline.edit(generation, validation, evidence_map, timer)
+            yield {"event": "edited", "data": generation}
+
+        final_output = _final_output(jd_struct, match_report, evidence_map, generation, validation)
+        yield {"event": "validation", "data": final_output["validation"]}
+
+        run_id = _store_run(final_output, cfg)
+        if cfg.export_outputs:
+            await pipeline.offload(timer, "export", _export, run_id, cfg)
+        done: Dict[str, Any] = {"run_id": run_id}
+        if timer.enabled:
+            done["timings"] = final_output["timings"] = timer.as_dict()
+        yield {"event": "done", "data": done}
+
+
+async def run_batch_async(
+    profile_text: str,
+    jd_texts: List[str],
+    cfg: Optional[AppConfig] = None,
+    max_concurrency: Optional[int] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Runs one profile against many job descriptions. Profile chunks and indexes
+    are built once; each JD is parsed, matched and generated concurrently with
+    at most max_concurrency LLM calls in flight. Yields one item per JD, in
+    completion order, as {"index", "result"} or {"index", "error"}.
+    Each result gets a run_id in the artifact store; batch results are never
+    exported to disk.
+    """
+    cfg = cfg or AppConfig()
+    limit = max_concurrency or cfg.batch_max_concurrency
+    pipeline = await _AsyncPipeline.create(cfg, llm_concurrency=limit)
+
+    profile_timer = _timer(cfg)
+    profile = await pipeline.prepare_profile(profile_text, profile_timer)
+
+    async def one(i: int, jd_text: str) -> Dict[str, Any]:
+        timer = _timer(cfg)
+        try:
+            with _observe_pipeline("batch"):
+                result = await pipeline.run_jd(jd_text, profile_text, profile, timer)
+        except Exception as e:
+            return {"index": i, "error": f"{type(e).__name__}: {e}"}
+        _store_run(result, cfg)
+        if timer.enabled:
+            result["timings"] = timer.as_dict()
+            result["timings"]["profile"] = profile_timer.as_dict()
+        return {"index": i, "result": result}
+
+    tasks = [asyncio.ensure_future(one(i, jd)) for i, jd in enumerate(jd_texts)]
+    try:
+        for fut in asyncio.as_completed(tasks):
+            yield await fut
+    finally:
+        for t in tasks:
+            t.cancel()
+
+
+def run_batch(
+    profile_text: str,
+    jd_texts: List[str],
+    cfg: Optional[AppConfig] = None,
+    max_concurrency: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    async def collect() -> List[Dict[str, Any]]:
+        return [item async for item in run_batch_async(profile_text, jd_texts, cfg, max_concurrency)]
+
+    return sorted(asyncio.run(collect()), key=lambda item: item["index"])
@@ -0,0 +1,375 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, FrozenSet, Hashable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from openai import AsyncOpenAI, OpenAI
+
+from admission import AdmissionController
+from config import AppConfig
+from job_queue import JobQueue, job_queue
+from core.artifacts import RunArtifactStore
+from core.embed_batcher import AsyncEmbedBatcher, EmbedBatcher
+from core.embed_local import LocalEmbedder, background_corpus
+from core.embed_store import EmbeddingStore, store_dir
+from core.index_cache import ProfileIndexCache
+from core.llm_cache import LLMResponseCache
+from core.multi_profile_index import MultiProfileIndex
+from core.skill_taxonomy import SkillTaxonomy
+from core.taxonomy_snapshot import load_taxonomy
+
+try:
+    import http_pool
+except ImportError:  # no httpx next to the openai SDK; clients fall back to the SDK's own pool
+    http_pool = None
+
+
+class ResourceRegistry:
+    """
+    Process-wide cache of static resources (taxonomy, stopwords, prompts, clients).
+
+    Each key is loaded at most once; concurrent callers asking for the same key
+    wait on a per-key lock while other keys load independently. Values are shared
+    between requests and must be treated as read-only.
+    """
+
+    def __init__(self) -> None:
+        self._items: Dict[Tuple[Hashable, ...], Any] = {}
+        self._key_locks: Dict[Tuple[Hashable, ...], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[Hashable, ...], loader: Callable[[], Any]) -> Any:
+        try:
+            return self._items[key]
+        except KeyError:
+            pass
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            if key in self._items:
+                return self._items[key]
+            value = loader()
+            self._items[key] = value
+            return value
+
+    def peek(self, key: Tuple[Hashable, ...]) -> Optional[Any]:
+        return self._items.get(key)
+
+    def values(self, kind: str) -> List[Any]:
+        """Every loaded value whose key starts with kind."""
+        with self._lock:
+            return [v for k, v in self._items.items() if k[0] == kind]
+
+    def discard(self, match: Callable[[Tuple[Hashable, ...]], bool]) -> None:
+        """Drop every loaded value whose key satisfies match."""
+        with self._lock:
+            for key in [k for k in self._items if match(k)]:
+                del self._items[key]
+
+    def invalidate(self, kind: Optional[str] = None) -> None:
+        with self._lock:
+            if kind is None:
+                self._items.clear()
+                return
+            for key in [k for k in self._items if k[0] == kind]:
+                del self._items[key]
+
+
+registry = ResourceRegistry()
+
+
+def _read_lines(path: str) -> FrozenSet[str]:
+    if not os.path.exists(path):
+        return frozenset()
+    with open(path, "r", encoding="utf-8") as f:
+        return frozenset(ln.strip() for ln in f.readlines() if ln.strip())
+
+
+def _read_json(path: str) -> Any:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _read_text(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read().strip()
+
+
+def _pool_settings(cfg: AppConfig) -> Tuple[Hashable, ...]:
+    return (
+        cfg.http_max_connections,
+        cfg.http_max_keepalive_connections,
+        cfg.http_keepalive_expiry_s,
+        cfg.http_connect_timeout_s,
+        cfg.http_read_timeout_s,
+        cfg.http_pool_timeout_s,
+    )
+
+
+def _client_settings(cfg: AppConfig) -> Tuple[Hashable, ...]:
+    return (cfg.openai_base_url, cfg.llm_max_retries, *_pool_settings(cfg))
+
+
+def _new_openai_client(cfg: AppConfig) -> OpenAI:
+    load_dotenv()
+    if http_pool is None:
+        return OpenAI(
+            base_url=cfg.openai_base_url or None,
+            timeout=cfg.http_read_timeout_s,
+            max_retries=cfg.llm_max_retries,
+        )
+    transport = registry.get(
+        ("http_transport", *_pool_settings(cfg)),
+        lambda: http_pool.PooledTransport(http_pool.pool_limits(cfg)),
+    )
+    return OpenAI(
+        base_url=cfg.openai_base_url or None,
+        http_client=http_pool.build_http_client(transport, cfg),
+        timeout=http_pool.pool_timeout(cfg),
+        max_retries=cfg.llm_max_retries,
+    )
+
+
+def _new_async_openai_client(cfg: AppConfig) -> AsyncOpenAI:
+    load_dotenv()
+    if http_pool is None:
+        return AsyncOpenAI(
+            base_url=cfg.openai_base_url or None,
+            timeout=cfg.http_read_timeout_s,
+            max_retries=cfg.llm_max_retries,
+        )
+    transport = registry.get(
+        ("async_http_transport", *_pool_settings(cfg)),
+        lambda: http_pool.AsyncPooledTransport(http_pool.pool_limits(cfg)),
+    )
+    return AsyncOpenAI(
+        base_url=cfg.openai_base_url or None,
+        http_client=http_pool.build_async_http_client(transport, cfg),
+        timeout=http_pool.pool_timeout(cfg),
+        max_retries=cfg.llm_max_retries,
+    )
+
+
+def get_taxonomy(yaml_path: str, snapshot_path: Optional[str] = None) -> SkillTaxonomy:
+    # Re-stat the YAML on every access so an edit is picked up without a restart.
+    st = os.stat(yaml_path)
+    key = ("taxonomy", yaml_path, snapshot_path, st.st_mtime_ns, st.st_size)
+    if registry.peek(key) is None:
+        registry.discard(lambda k: k[:3] == key[:3] and k != key)
+    return registry.get(key, lambda: load_taxonomy(yaml_path, snapshot_path))
+
+
+def get_stopwords(path: str) -> FrozenSet[str]:
+    return registry.get(("stopwords", path), lambda: _read_lines(path))
+
+
+def get_fewshot(path: str) -> Any:
+    return registry.get(("fewshot", path), lambda: _read_json(path))
+
+
+def get_prompt(path: str) -> str:
+    return registry.get(("prompt", path), lambda: _read_text(path))
+
+
+def get_openai_client(cfg: Optional[AppConfig] = None) -> OpenAI:
+    """
+    The process-wide OpenAI client for cfg's base URL, pool, timeouts and
+    retries. Callers with the same settings share one client and one pool.
+    """
+    override = registry.peek(("openai_client_override",))
+    if override is not None:
+        return override
+    cfg = cfg or AppConfig()
+    return registry.get(("openai_client", *_client_settings(cfg)), lambda: _new_openai_client(cfg))
+
+
+def get_async_openai_client(cfg: Optional[AppConfig] = None) -> AsyncOpenAI:
+    override = registry.peek(("async_openai_client_override",))
+    if override is not None:
+        return override
+    cfg = cfg or AppConfig()
+    return registry.get(("async_openai_client", *_client_settings(cfg)), lambda: _new_async_openai_client(cfg))
+
+
+def use_openai_clients(client: Any = None, async_client: Any = None) -> None:
+    """
+    Makes the given objects the process-wide clients, whatever the cfg, e.g. a
+    fake or replaying client in benchmarks. They only need the
+    chat.completions and embeddings methods the agents call.
+    """
+    for kind, value in (("openai_client_override", client), ("async_openai_client_override", async_client)):
+        if value is not None:
+            registry.invalidate(kind)
+            registry.get((kind,), lambda value=value: value)
+
+
+def _merge_pool_stats(stats: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if not stats:
+        return None
+    if len(stats) == 1:
+        return stats[0]
+    out: Dict[str, Any] = {}
+    for s in stats:
+        for k, v in s.items():
+            out[k] = out.get(k, 0) + v
+    out["pools"] = len(stats)
+    return out
+
+
+def http_pool_stats() -> Dict[str, Any]:
+    """
+    Counters of the shared HTTP pools, summed over pools with different
+    settings; a pool that was never created (or httpx missing) reports None.
+    """
+    return {
+        name: _merge_pool_stats([t.stats() for t in registry.values(kind)])
+        for name, kind in (("sync", "http_transport"), ("async", "async_http_transport"))
+    }
+
+
+def get_stage_executor(cfg: AppConfig) -> ThreadPoolExecutor:
+    """Thread pool the sync pipeline's stages run on, shared by every run in the process."""
+    return registry.get(
+        ("stage_executor", cfg.stage_pool_workers),
+        lambda: ThreadPoolExecutor(max_workers=max(1, cfg.stage_pool_workers), thread_name_prefix="stage"),
+    )
+
+
+def get_index_cache(cfg: AppConfig) -> Optional[ProfileIndexCache]:
+    if not cfg.use_index_cache:
+        return None
+    return registry.get(
+        ("index_cache", cfg.index_cache_dir, cfg.index_cache_memory_items, cfg.index_cache_max_disk_mb),
+        lambda: ProfileIndexCache(
+            cache_dir=cfg.index_cache_dir or None,
+            max_memory_items=cfg.index_cache_memory_items,
+            max_disk_bytes=cfg.index_cache_max_disk_mb * 1024 * 1024,
+        ),
+    )
+
+
+def _fit_local_embedder(cfg: AppConfig) -> LocalEmbedder:
+    taxonomy = get_taxonomy(cfg.skills_yaml_path, cfg.skills_snapshot_path)
+    corpus = background_corpus(taxonomy, get_fewshot(cfg.fewshot_path), cfg.local_embed_corpus_path or None)
+    return LocalEmbedder.fit(corpus, n_components=cfg.local_embed_dim)
+
+
+def get_local_embedder(cfg: AppConfig) -> LocalEmbedder:
+    return registry.get(
+        (
+            "local_embedder",
+            cfg.skills_yaml_path,
+            cfg.fewshot_path,
+            cfg.local_embed_corpus_path,
+            cfg.local_embed_dim,
+        ),
+        lambda: _fit_local_embedder(cfg),
+    )
+
+
+def get_embed_batcher(cfg: AppConfig, client: Any, model: str, embed_fn: Callable) -> Optional[EmbedBatcher]:
+    """One batcher per (client, model), shared by every pipeline in the process."""
+    if not cfg.use_embed_batcher:
+        return None
+    return registry.get(
+        ("embed_batcher", client, model, cfg.embed_batch_window_ms, cfg.embed_batch_size, cfg.embed_batch_max_tokens),
+        lambda: EmbedBatcher(
+            embed_fn,
+            window_ms=cfg.embed_batch_window_ms,
+            max_batch=cfg.embed_batch_size,
+            max_tokens=cfg.embed_batch_max_tokens,
+        ),
+    )
+
+
+def get_async_embed_batcher(
+    cfg: AppConfig, client: Any, model: str, embed_fn: Callable
+) -> Optional[AsyncEmbedBatcher]:
+    """Like get_embed_batcher, for a coroutine embed_fn on an async client."""
+    if not cfg.use_embed_batcher:
+        return None
+    return registry.get(
+        (
+            "async_embed_batcher",
+            client,
+            model,
+            cfg.embed_batch_window_ms,
+            cfg.embed_batch_size,
+            cfg.embed_batch_max_tokens,
+        ),
+        lambda: AsyncEmbedBatcher(
+            embed_fn,
+            window_ms=cfg.embed_batch_window_ms,
+            max_batch=cfg.embed_batch_size,
+            max_tokens=cfg.embed_batch_max_tokens,
+        ),
+    )
+
+
+def get_embed_store(cfg: AppConfig, model: str) -> Optional[EmbeddingStore]:
+    if not cfg.use_embed_store or not cfg.embed_store_dir:
+        return None
+    path = store_dir(cfg.embed_store_dir, model)
+    return registry.get(("embed_store", path, model), lambda: EmbeddingStore(path, model))
+
+
+def get_llm_cache(cfg: AppConfig) -> Optional[LLMResponseCache]:
+    if cfg.bypass_llm_cache:
+        return None
+    return registry.get(
+        (
+            "llm_cache",
+            cfg.llm_cache_dir,
+            cfg.llm_cache_memory_items,
+            cfg.llm_cache_max_disk_mb,
+            cfg.llm_cache_ttl_hours,
+        ),
+        lambda: LLMResponseCache(
+            cache_dir=cfg.llm_cache_dir or None,
+            max_memory_items=cfg.llm_cache_memory_items,
+            max_disk_bytes=cfg.llm_cache_max_disk_mb * 1024 * 1024,
+            ttl_seconds=cfg.llm_cache_ttl_hours * 3600.0,
+        ),
+    )
+
+
+def get_admission(cfg: AppConfig) -> AdmissionController:
+    """The worker's admission controller; only ever used from the API event loop."""
+    return registry.get(
+        ("admission", cfg.admission_max_in_flight, cfg.admission_max_queue, cfg.admission_queue_timeout_s),
+        lambda: AdmissionController(
+            cfg.admission_max_in_flight,
+            cfg.admission_max_queue,
+            cfg.admission_queue_timeout_s,
+        ),
+    )
+
+
+def get_job_queue(cfg: AppConfig) -> JobQueue:
+    return registry.get(
+        ("job_queue", cfg.jobs_db_path, cfg.job_visibility_timeout_s, cfg.job_max_attempts, cfg.job_result_ttl_hours),
+        lambda: job_queue(cfg),
+    )
+
+
+def get_artifact_store(cfg: AppConfig) -> RunArtifactStore:
+    return registry.get(
+        ("artifact_store", cfg.runs_dir, cfg.run_store_max_runs),
+        lambda: RunArtifactStore(cfg.runs_dir or None, max_runs=cfg.run_store_max_runs),
+    )
+
+
+def get_profile_index(dir_path: str) -> MultiProfileIndex:
+    # Keyed on meta.json's identity so a rebuild with the CLI is picked up by a running server.
+    key = ("profile_index", dir_path, MultiProfileIndex.stamp(dir_path))
+    if registry.peek(key) is None:
+        registry.discard(lambda k: k[0] == "profile_index" and k[1] == dir_path and k != key)
+    return registry.get(key, lambda: MultiProfileIndex.load(dir_path))
@@ -8,8 +8,13 @@ import { EvidencePanel } from "@/components/evidence-panel";
 import { GenerationResults } from "@/components/generation-results";
 import { MatchSummary } from "@/components/match-summary";
 import { RequestForm } from "@/components/request-form";
-import { runPipeline } from "@/lib/api";
-import { PipelineResponse, RunRequest } from "@/types/pipeline";
+import { runPackageUrl, streamPipeline } from "@/lib/api";
+import {
+  Generation,
+  PipelineResponse,
+  PipelineStreamEvent,
+  RunRequest,
+} from "@/types/pipeline";
 
 const sampleJob = `Company: ExampleCorp
 Role: Backend Engineer
@@ -35,9 +40,61 @@ const defaultForm: RunRequest = {
   use_llm_editor: true,
 };
 
+const emptyGeneration: Generation = {
+  resume_bullets: [],
+  cover_letter: { text: "", evidence_chunks: [] },
+};
+
+function applyStreamEvent(
+  prev: Partial<PipelineResponse> | null,
+  event: PipelineStreamEvent,
+): Partial<PipelineResponse> {
+  const next = { ...(prev || {}) };
+  switch (event.event) {
+    case "jd":
+      next.jd = event.data;
+      break;
+    case "match_report":
+      next.match_report = event.data;
+      break;
+    case "evidence_map":
+      next.evidence_map = event.data;
+      break;
+    case "bullet": {
+      // Partial draft while the generation streams; "draft" replaces it.
+      const gen = next.generation || emptyGeneration;
+      if (event.data.bullet) {
+        next.generation = {
+          ...gen,
+          resume_bullets: [...gen.resume_bullets, event.data.bullet],
+        };
+      }
+      break;
+    }
+    case "cover_letter":
+      next.generation = {
+        ...(next.generation || emptyGeneration),
+        cover_letter: event.data.cover_letter,
+      };
+      break;
+    case "draft":
+    case "edited":
+      next.generation = event.data;
+      break;
+    case "validation":
+      next.validation = event.data;
+      break;
+    case "done":
+      next.timings = event.data.timings;
+      next.run_id = event.data.run_id;
+      break;
+  }
+  return next;
+}
+
 export default function Home() {
   const [form, setForm] = useState<RunRequest>(defaultForm);
-  const [result, setResult] = useState<PipelineResponse | null>(null);
+  const [result, setResult] = useState<Partial<PipelineResponse> | null>(null);
   const [isLoading, setIsLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
@@ -58,8 +115,9 @@ export default function Home() {
         use_llm_jd_classifier: Boolean(form.use_llm_jd_classifier),
         use_llm_editor: Boolean(form.use_llm_editor),
       };
-      const data = await runPipeline(payload);
-      setResult(data);
+      await streamPipeline(payload, (event) => {
+        setResult((prev) => applyStreamEvent(prev, event));
+      });
     } catch (err) {
       const message =
         err instanceof Error ? err.message : "Failed to reach the backend.";
@@ -113,13 +171,13 @@ export default function Home() {
           />
           <MatchSummary
             report={result?.match_report}
-            company={result?.jd.company_name || form.company_name}
-            role={result?.jd.role_title || form.role_title}
-            mustHaveSkills={result?.jd.must_have_skills}
-            niceToHaveSkills={result?.jd.nice_to_have_skills}
-            responsibilities={result?.jd.responsibilities}
-            keywords={result?.jd.keywords}
-            isLoading={isLoading}
+            company={result?.jd?.company_name || form.company_name}
+            role={result?.jd?.role_title || form.role_title}
+            mustHaveSkills={result?.jd?.must_have_skills}
+            niceToHaveSkills={result?.jd?.nice_to_have_skills}
+            responsibilities={result?.jd?.responsibilities}
+            keywords={result?.jd?.keywords}
+            isLoading={isLoading && !result?.match_report}
           />
         </div>
 
@@ -128,13 +186,14 @@ export default function Home() {
         <div className="grid gap-6 lg:grid-cols-2">
           <GenerationResults
             generation={result?.generation || null}
-            validationWarnings={result?.validation.warnings}
-            validationOk={result?.validation.ok}
-            isLoading={isLoading}
+            validationWarnings={result?.validation?.warnings}
+            validationOk={result?.validation?.ok}
+            isLoading={isLoading && !result?.generation}
+            packageUrl={result?.run_id ? runPackageUrl(result.run_id) : null}
           />
           <EvidencePanel
             evidenceMap={result?.evidence_map || null}
-            isLoading={isLoading}
+            isLoading={isLoading && !result?.evidence_map}
           />
         </div>
       </div>
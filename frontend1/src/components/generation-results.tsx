@@ -19,6 +19,7 @@ type GenerationResultsProps = {
   validationWarnings?: ValidationWarning[];
   validationOk?: boolean;
   isLoading?: boolean;
+  packageUrl?: string | null;
 };
 
 export function GenerationResults({
@@ -26,6 +27,7 @@ export function GenerationResults({
   validationWarnings,
   validationOk,
   isLoading,
+  packageUrl,
 }: GenerationResultsProps) {
   const warnings = [
     ...(generation?.warnings || []),
@@ -76,6 +78,14 @@ export function GenerationResults({
               {validationOk ? "Validation OK" : "Validation issues"}
             </Badge>
           ) : null}
+          {packageUrl ? (
+            <a
+              href={packageUrl}
+              className="ml-auto text-sm font-medium text-primary underline-offset-4 hover:underline"
+            >
+              Download package
+            </a>
+          ) : null}
         </div>
         <CardDescription>
           Grounded resume bullets and a tailored cover letter.
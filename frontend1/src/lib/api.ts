@@ -1,10 +1,15 @@
-import { PipelineResponse, RunRequest } from "@/types/pipeline";
+import { PipelineResponse, PipelineStreamEvent, RunRequest } from "@/types/pipeline";
 
 const API_BASE =
   process.env.NEXT_PUBLIC_API_BASE?.replace(/\/$/, "") ||
   "http://localhost:8000";
 
 const RUN_ENDPOINT = `${API_BASE}/run`;
+const RUN_STREAM_ENDPOINT = `${API_BASE}/run_stream?format=ndjson`;
+
+export function runPackageUrl(runId: string): string {
+  return `${API_BASE}/runs/${encodeURIComponent(runId)}/package.zip`;
+}
 
 export async function runPipeline(payload: RunRequest): Promise<PipelineResponse> {
   const response = await fetch(RUN_ENDPOINT, {
@@ -23,3 +28,47 @@ export async function runPipeline(payload: RunRequest): Promise<PipelineResponse
   return (await response.json()) as PipelineResponse;
 }
 
+export async function streamPipeline(
+  payload: RunRequest,
+  onEvent: (event: PipelineStreamEvent) => void,
+): Promise<void> {
+  const response = await fetch(RUN_STREAM_ENDPOINT, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+    },
+    body: JSON.stringify(payload),
+  });
+
+  if (!response.ok || !response.body) {
+    const text = await response.text();
+    throw new Error(text || `Request failed with status ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  for (;;) {
+    const { done, value } = await reader.read();
+    buffer += decoder.decode(value, { stream: !done });
+
+    let newline = buffer.indexOf("\n");
+    while (newline >= 0) {
+      const line = buffer.slice(0, newline).trim();
+      buffer = buffer.slice(newline + 1);
+      if (line) {
+        const event = JSON.parse(line) as PipelineStreamEvent;
+        if (event.event === "error") {
+          throw new Error(event.data.message);
+        }
+        onEvent(event);
+      }
+      newline = buffer.indexOf("\n");
+    }
+
+    if (done) {
+      return;
+    }
+  }
+}
@@ -8,6 +8,9 @@ export type RunRequest = {
   use_embeddings?: boolean;
   use_llm_jd_classifier?: boolean;
   use_llm_editor?: boolean;
+  include_timings?: boolean;
+  bypass_llm_cache?: boolean;
+  export_outputs?: boolean;
 };
 
 export type MatchReport = {
@@ -57,6 +60,19 @@ export type ValidationWarning = {
   path: string;
 };
 
+export type StageTiming = {
+  name: string;
+  wall_ms: number;
+  cpu_ms: number | null;
+};
+
+export type PipelineTimings = {
+  stages: StageTiming[];
+  total_wall_ms: number;
+  total_cpu_ms: number;
+  elapsed_ms: number;
+};
+
 export type PipelineResponse = {
   jd: {
     company_name?: string;
@@ -74,5 +90,29 @@ export type PipelineResponse = {
     ok: boolean;
     warnings: ValidationWarning[];
   };
+  timings?: PipelineTimings;
+  run_id?: string;
 };
 
+
+export type PipelineStreamEvent =
+  | { event: "jd"; data: PipelineResponse["jd"] }
+  | { event: "match_report"; data: MatchReport }
+  | { event: "evidence_map"; data: Record<string, EvidenceItem> }
+  | {
+      event: "bullet";
+      data: {
+        index: number;
+        bullet: Generation["resume_bullets"][number] | null;
+        warnings: ValidationWarning[];
+      };
+    }
+  | {
+      event: "cover_letter";
+      data: { cover_letter: Generation["cover_letter"]; warnings: ValidationWarning[] };
+    }
+  | { event: "draft"; data: Generation }
+  | { event: "edited"; data: Generation }
+  | { event: "validation"; data: PipelineResponse["validation"] }
+  | { event: "done"; data: { run_id?: string; timings?: PipelineTimings } }
+  | { event: "error"; data: { message: string } };